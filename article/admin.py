@@ -1,6 +1,7 @@
 from django.contrib import admin
-from article.models import Article, Comment, CommentReaction
+from article.models import Article, Comment, CommentReaction, SummaryJob
 
 admin.site.register(Article)
 admin.site.register(Comment)
-admin.site.register(CommentReaction)
\ No newline at end of file
+admin.site.register(CommentReaction)
+admin.site.register(SummaryJob)
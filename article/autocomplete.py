@@ -0,0 +1,202 @@
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from article.models import Article
+from nuriggun.tasks import tasks
+
+
+SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text):
+    '''자동완성 비교용 제목 정규화 : NFKC + 소문자 + 공백 하나로'''
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return SPACE_RE.sub(" ", text).strip()
+
+
+class TitleIndex:
+    '''게시글 제목 접두어 검색용 정렬 배열 (워커 프로세스마다 메모리에 보관)
+
+    후보가 많은 짧은 접두어는 반응 수 상위 AUTOCOMPLETE_TOP_K개를 접두어별로 캐시하고,
+    반응 수가 바뀌면 그 게시글 제목의 접두어 목록만 제자리에서 고침.
+    반응 수에는 게시글의 change_count 를 버전으로 함께 저장해서, 늦게 도착했거나 다시 적용된 변경은 무시함.
+    '''
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()  # 동시에 하나만 다시 만듦
+        self.keys = []      # 정렬된 (정규화된 제목, 게시글 id)
+        self.entries = {}   # 게시글 id -> [정규화된 제목, 제목, 반응 수, 버전(change_count)]
+        self.top = {}       # 접두어 -> 반응 수 상위 게시글 id 목록
+        self.pending = None  # 다시 만드는 동안 들어온 변경 (만든 뒤 다시 적용, 버전이 있어서 두 번 더하지 않음)
+        self.built_at = None
+        self.refreshing = False
+
+    def build(self):
+        with self.build_lock:
+            with self.lock:
+                self.pending = []
+            try:
+                rows = Article.objects.values_list("id", "title", "reaction_total", "change_count")
+                entries = {
+                    pk: [normalize(title), title, reaction_total, version]
+                    for pk, title, reaction_total, version in rows.iterator()
+                }
+                keys = sorted((entry[0], pk) for pk, entry in entries.items())
+                with self.lock:
+                    pending, self.pending = self.pending, None
+                    self.entries = entries
+                    self.keys = keys
+                    self.top = {}
+                    self.built_at = time.monotonic()
+                    for method, args in pending:
+                        method(*args)
+            finally:
+                with self.lock:
+                    self.pending = None
+                    self.refreshing = False
+
+    def warm(self):
+        '''웹 워커가 뜰 때(nuriggun.wsgi) 백그라운드에서 미리 만듦 : 첫 요청이 만드는 시간을 기다리지 않도록'''
+        with self.lock:
+            if self.built_at is not None or self.refreshing:
+                return
+            self.refreshing = True
+        tasks.submit(self.build)
+
+    def ensure_built(self):
+        '''아직 없으면 만들어질 때까지 기다리고, 오래되면 백그라운드에서 다시 만듦
+
+        다른 워커의 변경을 반영하기 위한 갱신이라, 갱신하는 동안에는 기존 목록으로 응답함.
+        '''
+        if self.built_at is None:
+            # warm() 이 만드는 중이면 끝날 때까지 기다림
+            with self.build_lock:
+                built = self.built_at is not None
+            if not built:
+                self.build()
+            return
+        if time.monotonic() - self.built_at <= settings.AUTOCOMPLETE_REFRESH_SECONDS:
+            return
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        tasks.submit(self.build)
+
+    def upsert(self, pk, title, reaction_total=0, version=0):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((self.upsert, (pk, title, reaction_total, version)))
+            if self.built_at is None:
+                return
+            key = normalize(title)
+            entry = self.entries.get(pk)
+            if entry is not None and entry[0] == key:
+                entry[1] = title
+                self.set_score(pk, reaction_total, version)
+                return
+            if entry is not None and entry[3] > version:
+                # 저장한 인스턴스보다 새 반응 수를 이미 알고 있음
+                reaction_total, version = entry[2], entry[3]
+            self._remove_key(pk)
+            self.entries[pk] = [key, title, reaction_total, version]
+            insort(self.keys, (key, pk))
+            self._clear_top(key)
+
+    def remove(self, pk):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((self.remove, (pk,)))
+            self._remove_key(pk)
+            self.entries.pop(pk, None)
+
+    def set_score(self, pk, reaction_total, version):
+        '''반응 수를 절대값으로 반영 : 이미 알고 있는 버전보다 오래된 값이면 무시'''
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((self.set_score, (pk, reaction_total, version)))
+            entry = self.entries.get(pk)
+            if entry is None or entry[3] >= version:
+                return
+            entry[3] = version
+            if entry[2] != reaction_total:
+                decreased = reaction_total < entry[2]
+                entry[2] = reaction_total
+                self._update_top(entry[0], pk, decreased)
+
+    def _remove_key(self, pk):
+        entry = self.entries.get(pk)
+        if entry is None:
+            return
+        index = bisect_left(self.keys, (entry[0], pk))
+        if index < len(self.keys) and self.keys[index] == (entry[0], pk):
+            del self.keys[index]
+        self._clear_top(entry[0])
+
+    def _clear_top(self, key):
+        '''key로 시작하는 접두어의 상위 목록 캐시 삭제 (제목이 바뀌거나 게시글이 지워진 경우)'''
+        if self.top:
+            for length in range(1, len(key) + 1):
+                self.top.pop(key[:length], None)
+
+    def _rank(self, pk):
+        return self.entries[pk][2], pk
+
+    def _update_top(self, key, pk, decreased):
+        '''반응 수가 바뀐 게시글 제목의 접두어 상위 목록을 제자리에서 고침
+
+        목록 안의 게시글 반응 수가 줄면 목록 밖 후보가 더 높을 수 있으므로 그 접두어만 삭제.
+        '''
+        rank = self._rank(pk)
+        for length in range(1, len(key) + 1):
+            prefix = key[:length]
+            top = self.top.get(prefix)
+            if top is None:
+                continue
+            if pk in top:
+                if decreased:
+                    del self.top[prefix]
+                    continue
+                top.remove(pk)
+            elif rank < self._rank(top[-1]):
+                continue
+            index = next((index for index, other in enumerate(top) if self._rank(other) < rank), len(top))
+            top.insert(index, pk)
+            del top[settings.AUTOCOMPLETE_TOP_K:]
+
+    def _get_top(self, key):
+        start = bisect_left(self.keys, (key,))
+        end = bisect_left(self.keys, (key + "\U0010ffff",))
+        top = self.top.get(key)
+        if top is None:
+            top = heapq.nlargest(
+                settings.AUTOCOMPLETE_TOP_K,
+                (self.keys[index][1] for index in range(start, end)),
+                key=lambda pk: (self.entries[pk][2], pk),
+            )
+            # 후보가 적은 긴 접두어는 매번 계산해도 충분
+            if end - start > settings.AUTOCOMPLETE_TOP_K:
+                self.top[key] = top
+        return top
+
+    def suggest(self, prefix, limit=10):
+        '''접두어가 일치하는 제목 중 반응 수 상위 limit개 (최대 AUTOCOMPLETE_TOP_K개)'''
+        key = normalize(prefix)
+        if not key or limit < 1:
+            return []
+        self.ensure_built()
+        with self.lock:
+            return [
+                {"id": pk, "title": self.entries[pk][1], "reaction_total": self.entries[pk][2]}
+                for pk in self._get_top(key)[:limit]
+            ]
+
+
+title_index = TitleIndex()
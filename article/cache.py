@@ -0,0 +1,90 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+
+HOME_GENERATION_KEY = "home:generation"
+
+# 프로세스마다 마지막으로 확인한 세대 번호 : HOME_GENERATION_CHECK_SECONDS 동안은 공용 캐시를 다시 읽지 않음
+local_generation = {"value": None, "checked_at": 0.0}
+
+
+def get_home_cache():
+    return caches[settings.HOME_CACHE_ALIAS]
+
+
+def get_generation_cache():
+    '''세대 번호는 모든 워커가 같이 보도록 공용 캐시에 저장'''
+    return caches[settings.HOME_GENERATION_CACHE_ALIAS]
+
+
+def set_local_generation(generation):
+    local_generation["value"] = generation
+    local_generation["checked_at"] = time.monotonic()
+
+
+def get_home_generation():
+    '''현재 메인페이지 캐시 세대 번호'''
+    if (local_generation["value"] is not None
+            and time.monotonic() - local_generation["checked_at"] < settings.HOME_GENERATION_CHECK_SECONDS):
+        return local_generation["value"]
+    cache = get_generation_cache()
+    generation = cache.get(HOME_GENERATION_KEY)
+    if generation is None:
+        # 세대 값이 지워져도 예전 세대의 키와 겹치지 않도록 현재 시각으로 시작
+        cache.add(HOME_GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(HOME_GENERATION_KEY)
+    set_local_generation(generation)
+    return generation
+
+
+def bump_home_generation():
+    '''세대 번호를 올려서 기존 메인페이지 캐시를 한 번에 무효화
+
+    현재 시각(ms)보다 작아지지 않게 올려서, 세대 값이 지워지거나 되돌려져도 예전 세대의 키와 겹치지 않음.
+    '''
+    cache = get_generation_cache()
+    generation = max(int(time.time() * 1000), (cache.get(HOME_GENERATION_KEY) or 0) + 1)
+    cache.set(HOME_GENERATION_KEY, generation, None)
+    set_local_generation(generation)
+
+
+def invalidate_home_cache():
+    '''지금 한 번, 커밋 후 한 번 더 무효화 : 커밋 전에 다시 채워진 캐시도 버림'''
+    bump_home_generation()
+    transaction.on_commit(bump_home_generation)
+
+
+def get_home_cache_key(request):
+    url = request.build_absolute_uri()
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f"home:{get_home_generation()}:{digest}"
+
+
+def get_home_value(name, default):
+    '''세대 번호가 붙은 키로 메인페이지 값 하나를 캐시 (default : 캐시에 없을 때 값을 만드는 함수)'''
+    key = f"home:{get_home_generation()}:{name}"
+    return get_home_cache().get_or_set(key, default, settings.HOME_CACHE_TIMEOUT)
+
+
+def home_cache(view_method):
+    '''메인페이지 GET 응답을 세대 번호가 붙은 키로 캐시하는 데코레이터'''
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        cache = get_home_cache()
+        key = get_home_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.HOME_CACHE_TIMEOUT)
+        return response
+    return wrapper
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from article.models import Article
+from nuriggun.images import shutdown_executor, submit_image_variants
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = "변형 이미지(썸네일/webp)가 없는 게시글, 프로필 이미지의 변형 이미지를 만듭니다."
+
+    def handle(self, *args, **options):
+        count = 0
+        for model, field_name in ((Article, "image"), (User, "profile_img")):
+            rows = (
+                model.objects.exclude(**{field_name: ""})
+                .filter(**{f"{field_name}_width__isnull": True})
+                .values_list("pk", field_name)
+            )
+            for pk, name in rows.iterator():
+                submit_image_variants(model, pk, field_name, name)
+                count += 1
+        shutdown_executor()
+        self.stdout.write(self.style.SUCCESS(f"이미지 {count}개의 변형 이미지를 만들었습니다."))
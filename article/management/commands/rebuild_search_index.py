@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from article.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "게시글 검색 역색인을 처음부터 다시 만듭니다."
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"게시글 {count}개의 검색 색인을 다시 만들었습니다."))
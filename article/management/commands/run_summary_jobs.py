@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from article.models import SummaryJob
+from article.summary import get_due_filter, run_job, summary_queue
+
+
+class Command(BaseCommand):
+    help = "대기 중인 게시글 요약 작업을 실행합니다. (--once 가 없으면 계속 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="지금 실행할 때가 된 작업만 처리하고 종료")
+
+    def handle(self, *args, **options):
+        if not options["once"]:
+            summary_queue.start()
+            summary_queue.wakeup.set()
+            summary_queue.dispatcher.join()
+            return
+
+        count = 0
+        due = SummaryJob.objects.filter(get_due_filter(timezone.now())).values_list("pk", flat=True)
+        for article_id in list(due):
+            if run_job(article_id):
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f"요약 작업 {count}개를 실행했습니다."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from article.models import Article, Comment
+
+
+class Command(BaseCommand):
+    help = "게시글의 비정규화된 개수 컬럼을 실제 데이터 기준으로 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        for reaction in Article.REACTIONS:
+            through = getattr(Article, reaction).through
+            counts = (
+                through.objects.filter(article=OuterRef("pk"))
+                .values("article")
+                .annotate(count=Count("*"))
+                .values("count")
+            )
+            Article.objects.update(**{f"{reaction}_count": Coalesce(Subquery(counts), 0)})
+
+        comments = (
+            Comment.objects.filter(article=OuterRef("pk"))
+            .values("article")
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        Article.objects.update(comments_count=Coalesce(Subquery(comments), 0))
+
+        Article.objects.update(
+            reaction_total=F("great_count") + F("sad_count") + F("angry_count") + F("good_count") + F("subsequent_count")
+        )
+        self.stdout.write(self.style.SUCCESS("게시글 개수 컬럼을 다시 계산했습니다."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from article.views import HomeView
+from user.views import HomeUserListView
+
+
+class Command(BaseCommand):
+    help = "메인페이지 응답 캐시를 미리 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="localhost", help="캐시 키와 다음 페이지 링크에 쓰일 호스트")
+        parser.add_argument("--secure", action="store_true", help="https 요청으로 캐시")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        targets = [
+            (HomeView.as_view(), reverse("home_view") + f"?order={order}")
+            for order in ("sub", "main", "best")
+        ]
+        targets.append((HomeUserListView.as_view(), reverse("home_user_list_view")))
+
+        for view, url in targets:
+            request = factory.get(url, HTTP_HOST=options["host"], secure=options["secure"])
+            response = view(request)
+            self.stdout.write(f"{url} : {response.status_code}")
+        self.stdout.write(self.style.SUCCESS("메인페이지 캐시를 채웠습니다."))
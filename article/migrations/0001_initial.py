@@ -0,0 +1,187 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Article',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=50, verbose_name='제목')),
+                ('content', models.TextField(max_length=1650, verbose_name='내용')),
+                ('image', models.ImageField(upload_to='', verbose_name='게시글 이미지')),
+                ('image_content', models.TextField(blank=True, default='', null=True, verbose_name='사진 설명')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성시간')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정시간')),
+                ('summary', models.TextField(blank=True, verbose_name='요약')),
+                ('great_count', models.PositiveIntegerField(default=0)),
+                ('sad_count', models.PositiveIntegerField(default=0)),
+                ('angry_count', models.PositiveIntegerField(default=0)),
+                ('good_count', models.PositiveIntegerField(default=0)),
+                ('subsequent_count', models.PositiveIntegerField(default=0)),
+                ('reaction_total', models.PositiveIntegerField(default=0)),
+                ('comments_count', models.PositiveIntegerField(default=0)),
+                ('change_count', models.PositiveIntegerField(default=0)),
+                ('activity_at', models.DateTimeField(blank=True, null=True)),
+                ('image_width', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('image_height', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('image_thumbnail', models.ImageField(blank=True, editable=False, max_length=255, upload_to='')),
+                ('image_webp', models.ImageField(blank=True, editable=False, max_length=255, upload_to='')),
+                ('category', models.CharField(choices=[('it', 'it'), ('경제', 'economy'), ('문화', 'culture'), ('스포츠', 'sport'), ('날씨', 'weather'), ('세계', 'world')], max_length=10, verbose_name='카테고리')),
+                ('angry', models.ManyToManyField(blank=True, related_name='angry', to=settings.AUTH_USER_MODEL)),
+                ('good', models.ManyToManyField(blank=True, related_name='good', to=settings.AUTH_USER_MODEL)),
+                ('great', models.ManyToManyField(blank=True, related_name='great', to=settings.AUTH_USER_MODEL)),
+                ('sad', models.ManyToManyField(blank=True, related_name='sad', to=settings.AUTH_USER_MODEL)),
+                ('scrap', models.ManyToManyField(blank=True, related_name='scrap', to=settings.AUTH_USER_MODEL)),
+                ('subsequent', models.ManyToManyField(blank=True, related_name='subsequent', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'Article',
+            },
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment', models.TextField(verbose_name='댓글')),
+                ('comment_created_at', models.DateTimeField(auto_now_add=True)),
+                ('comment_updated_at', models.DateTimeField(auto_now=True)),
+                ('like_count', models.PositiveIntegerField(default=0)),
+                ('hate_count', models.PositiveIntegerField(default=0)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment', to='article.article')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'comment',
+                'ordering': ['-comment_created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleSearchDocument',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='article.article')),
+                ('checksum', models.CharField(max_length=64)),
+                ('title_length', models.PositiveIntegerField(default=0)),
+                ('content_length', models.PositiveIntegerField(default=0)),
+                ('summary_length', models.PositiveIntegerField(default=0)),
+                ('image_content_length', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'articlesearchdocument',
+            },
+        ),
+        migrations.CreateModel(
+            name='SummaryCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('summary', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'summarycache',
+                'indexes': [models.Index(fields=['last_used_at'], name='summary_cache_lru_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CommentReaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='article.comment')),
+                ('hate', models.ManyToManyField(blank=True, related_name='hate', to=settings.AUTH_USER_MODEL)),
+                ('like', models.ManyToManyField(blank=True, related_name='like', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'commentreaction',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(0, 'title'), (1, 'content'), (2, 'summary'), (3, 'image_content')])),
+                ('term', models.CharField(max_length=2)),
+                ('frequency', models.PositiveIntegerField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='article.article')),
+            ],
+            options={
+                'db_table': 'articlesearchterm',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleReaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('great', models.BooleanField(default=False)),
+                ('sad', models.BooleanField(default=False)),
+                ('angry', models.BooleanField(default=False)),
+                ('good', models.BooleanField(default=False)),
+                ('subsequent', models.BooleanField(default=False)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='article.article', verbose_name='해당 게시글')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'Articlereaction',
+            },
+        ),
+        migrations.CreateModel(
+            name='SummaryJob',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary_job', serialize=False, to='article.article')),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '요약 중'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=10)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_run_at', models.DateTimeField()),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'summaryjob',
+                'indexes': [models.Index(fields=['status', 'next_run_at'], name='summary_job_due_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyBestArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='게시 날짜')),
+                ('reaction_total', models.PositiveIntegerField(default=0)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_best', to='article.article')),
+            ],
+            options={
+                'db_table': 'dailybestarticle',
+                'indexes': [models.Index(fields=['date', '-reaction_total', '-article'], name='daily_best_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailybestarticle',
+            constraint=models.UniqueConstraint(fields=('date', 'article'), name='unique_daily_best_article'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', '-comment_created_at', '-id'], name='comment_article_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articlesearchterm',
+            index=models.Index(fields=['term', 'article'], name='search_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-comments_count', '-id'], name='article_comments_count_idx'),
+        ),
+    ]
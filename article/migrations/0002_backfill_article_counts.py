@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+REACTIONS = ("great", "sad", "angry", "good", "subsequent")
+
+
+def backfill_counts(apps, schema_editor):
+    '''기존 게시글의 반응/댓글 개수 컬럼 채우기 (sync_article_counts 명령과 같은 계산)'''
+    Article = apps.get_model("article", "Article")
+    Comment = apps.get_model("article", "Comment")
+    for reaction in REACTIONS:
+        through = Article._meta.get_field(reaction).remote_field.through
+        counts = (
+            through.objects.filter(article=OuterRef("pk"))
+            .values("article")
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        Article.objects.update(**{f"{reaction}_count": Coalesce(Subquery(counts), 0)})
+
+    comments = (
+        Comment.objects.filter(article=OuterRef("pk"))
+        .values("article")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Article.objects.update(comments_count=Coalesce(Subquery(comments), 0))
+    Article.objects.update(
+        reaction_total=F("great_count") + F("sad_count") + F("angry_count") + F("good_count") + F("subsequent_count")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("article", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
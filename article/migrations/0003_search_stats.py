@@ -0,0 +1,44 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:47
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+
+FIELDS = ("title", "content", "summary", "image_content")
+
+
+def fill_stats(apps, schema_editor):
+    '''기존 색인 문서로 검색 통계 행 채우기'''
+    ArticleSearchDocument = apps.get_model("article", "ArticleSearchDocument")
+    ArticleSearchStats = apps.get_model("article", "ArticleSearchStats")
+    stats = ArticleSearchDocument.objects.aggregate(
+        documents=Count("pk"),
+        **{f"{name}_length": Coalesce(Sum(f"{name}_length"), 0) for name in FIELDS},
+    )
+    ArticleSearchStats.objects.update_or_create(pk=1, defaults=stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0002_backfill_article_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documents', models.BigIntegerField(default=0)),
+                ('title_length', models.BigIntegerField(default=0)),
+                ('content_length', models.BigIntegerField(default=0)),
+                ('summary_length', models.BigIntegerField(default=0)),
+                ('image_content_length', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'articlesearchstats',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
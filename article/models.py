@@ -8,6 +8,10 @@ from django.urls import reverse  # 테스트 코드
 class Article(models.Model):
     class Meta:
         db_table = "Article"
+        indexes = [
+            # 메인페이지 "댓글 많은 순" 상위 N개를 인덱스로 조회
+            models.Index(fields=["-comments_count", "-id"], name="article_comments_count_idx"),
+        ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user")
     title = models.CharField(max_length=50, verbose_name="제목" )
@@ -23,6 +27,30 @@ class Article(models.Model):
     subsequent = models.ManyToManyField(User, blank=True, related_name="subsequent")
     summary = models.TextField(blank=True, verbose_name="요약")
 
+#------------------------- 반응/댓글 개수 (비정규화) -------------------------
+
+    # 목록마다 COUNT 쿼리를 날리지 않도록 반응/댓글 개수를 컬럼에 저장
+    REACTIONS = ("great", "sad", "angry", "good", "subsequent")
+
+    great_count = models.PositiveIntegerField(default=0)
+    sad_count = models.PositiveIntegerField(default=0)
+    angry_count = models.PositiveIntegerField(default=0)
+    good_count = models.PositiveIntegerField(default=0)
+    subsequent_count = models.PositiveIntegerField(default=0)
+    reaction_total = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    # 댓글/반응이 바뀔 때마다 증가 : 상세페이지, 댓글 목록 ETag 계산용
+    change_count = models.PositiveIntegerField(default=0)
+    activity_at = models.DateTimeField(null=True, blank=True)
+
+#------------------------- 변형 이미지 (업로드 후 프로세스 풀에서 생성) -------------------------
+
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_thumbnail = models.ImageField(max_length=255, blank=True, editable=False)
+    image_webp = models.ImageField(max_length=255, blank=True, editable=False)
+
     
 #------------------------- 카테고리 모델 -------------------------
     
@@ -56,6 +84,126 @@ class Article(models.Model):
         return str(self.title)
     
 
+#--------------------- 오늘의 HOT뉴스 순위표 ------------------
+
+class DailyBestArticle(models.Model):
+    '''한국 날짜별 게시글 반응 순위 : 반응할 때마다 갱신'''
+    class Meta:
+        db_table = "dailybestarticle"
+        constraints = [
+            models.UniqueConstraint(fields=["date", "article"], name="unique_daily_best_article")
+        ]
+        indexes = [
+            models.Index(fields=["date", "-reaction_total", "-article"], name="daily_best_rank_idx")
+        ]
+
+    date = models.DateField("게시 날짜")
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name="daily_best")
+    reaction_total = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} {self.article}"
+
+
+#--------------------- 검색 역색인 ------------------
+
+class ArticleSearchDocument(models.Model):
+    '''검색 대상 게시글의 필드별 토큰 수 (BM25 문서 길이)'''
+    class Meta:
+        db_table = "articlesearchdocument"
+
+    article = models.OneToOneField(Article, on_delete=models.CASCADE, primary_key=True, related_name="search_document")
+    checksum = models.CharField(max_length=64)
+    title_length = models.PositiveIntegerField(default=0)
+    content_length = models.PositiveIntegerField(default=0)
+    summary_length = models.PositiveIntegerField(default=0)
+    image_content_length = models.PositiveIntegerField(default=0)
+
+
+class ArticleSearchStats(models.Model):
+    '''검색 대상 전체 문서 수와 필드별 토큰 수 합계 (BM25 평균 길이) : 한 행만 사용, 색인할 때 함께 갱신'''
+    class Meta:
+        db_table = "articlesearchstats"
+
+    documents = models.BigIntegerField(default=0)
+    title_length = models.BigIntegerField(default=0)
+    content_length = models.BigIntegerField(default=0)
+    summary_length = models.BigIntegerField(default=0)
+    image_content_length = models.BigIntegerField(default=0)
+
+
+class ArticleSearchTerm(models.Model):
+    '''검색 역색인 : 글자 바이그램 -> 게시글/필드별 등장 횟수'''
+    class Meta:
+        db_table = "articlesearchterm"
+        indexes = [
+            models.Index(fields=["term", "article"], name="search_term_idx"),
+        ]
+
+    FIELDS = (
+        (0, 'title'),
+        (1, 'content'),
+        (2, 'summary'),
+        (3, 'image_content'),
+    )
+
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name="search_terms")
+    field = models.PositiveSmallIntegerField(choices=FIELDS)
+    term = models.CharField(max_length=2)
+    frequency = models.PositiveIntegerField()
+
+
+#--------------------- 요약 작업 큐 ------------------
+
+class SummaryJob(models.Model):
+    '''게시글 요약 작업 (게시글당 하나, 내용이 바뀌면 version 을 올려 다시 대기)'''
+    class Meta:
+        db_table = "summaryjob"
+        indexes = [
+            models.Index(fields=["status", "next_run_at"], name="summary_job_due_idx"),
+        ]
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "대기"),
+        (RUNNING, "요약 중"),
+        (DONE, "완료"),
+        (FAILED, "실패"),
+    )
+
+    article = models.OneToOneField(Article, on_delete=models.CASCADE, primary_key=True, related_name="summary_job")
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    version = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_run_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.article_id} {self.status}"
+
+
+class SummaryCache(models.Model):
+    '''정규화한 내용의 해시 -> 요약 (같은 내용은 LLM 을 다시 부르지 않음), 오래 안 쓴 것부터 삭제'''
+    class Meta:
+        db_table = "summarycache"
+        indexes = [
+            models.Index(fields=["last_used_at"], name="summary_cache_lru_idx"),
+        ]
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    summary = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.content_hash
+
+
 #--------------------- 게시글 반응 ------------------
 
 
@@ -82,6 +230,13 @@ class Comment(models.Model):
     class Meta:
         db_table = "comment"
         ordering = ["-comment_created_at"]  # 댓글 최신순 정렬
+        indexes = [
+            # 게시글별 댓글 커서 페이지네이션 (comment_created_at, id)
+            models.Index(fields=["article", "-comment_created_at", "-id"], name="comment_article_recent_idx"),
+        ]
+
+    # 댓글 목록에서 불러오는 필드 (CommentSerializer)
+    LIST_FIELDS = ("id", "user", "comment", "comment_created_at", "comment_updated_at", "like_count", "hate_count")
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name="comment")
@@ -0,0 +1,121 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorPagination(BasePagination):
+    '''커서(keyset) 페이지네이션 : COUNT 쿼리와 OFFSET 없이 (created_at, id) 기준으로 다음 페이지 조회'''
+    ordering = ("-created_at", "-id")
+    default_limit = 20
+    max_limit = 100
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "유효하지 않은 커서입니다."
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def get_ordering(self, request):
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.fields = self.get_ordering(request)
+
+        position = self.decode_cursor(request, queryset.model)
+        queryset = queryset.order_by(*self.fields)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        # 다음 페이지 존재 여부는 limit + 1 개를 가져와서 판단
+        results = list(queryset[:self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[:self.limit]
+        return self.page
+
+    def get_position_filter(self, position):
+        '''(a, b) < (x, y) 형태의 사전식 비교를 Q 객체로 변환'''
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.fields, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, obj):
+        position = []
+        for field in self.fields:
+            value = getattr(obj, field.lstrip("-"))
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, request, model):
+        '''커서를 정렬 필드 값 목록으로 변환 : 각 값은 필드 타입으로 검사해서 잘못된 커서는 404'''
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(position, list) or len(position) != len(self.fields):
+                raise ValueError(position)
+            return [
+                self.parse_value(model._meta.get_field(field.lstrip("-")), value)
+                for field, value in zip(self.fields, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_value(self, field, value):
+        if value is None or isinstance(value, (bool, list, dict)):
+            raise ValueError(value)
+        value = field.to_python(value)
+        field.run_validators(value)
+        # 데이터베이스마다 정수 범위 검사가 없을 수 있으므로 64비트 범위로 제한
+        if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(value)
+        return value
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
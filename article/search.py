@@ -0,0 +1,177 @@
+import hashlib
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from article.models import Article, ArticleSearchDocument, ArticleSearchStats, ArticleSearchTerm
+
+
+# BM25 파라미터와 필드별 가중치
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'content': 1.0,
+    'summary': 1.5,
+    'image_content': 0.5,
+}
+FIELD_CODES = {name: code for code, name in ArticleSearchTerm.FIELDS}
+FIELD_NAMES = dict(ArticleSearchTerm.FIELDS)
+
+WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+
+
+def tokenize(text):
+    '''한글/영문/숫자 단어를 글자 바이그램으로 분리 (한 글자 단어는 그대로)'''
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    terms = []
+    for word in WORD_RE.findall(text):
+        if len(word) == 1:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def get_checksum(article):
+    text = "\x00".join(getattr(article, name) or "" for name in FIELD_CODES)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def change_stats(documents, lengths):
+    '''전체 문서 수와 필드별 토큰 수 합계를 증감 (F 식이라 동시에 갱신해도 안전)'''
+    changes = {"documents": F("documents") + documents}
+    changes.update({field: F(field) + delta for field, delta in lengths.items() if delta})
+    if not ArticleSearchStats.objects.filter(pk=1).update(**changes):
+        ArticleSearchStats.objects.get_or_create(pk=1)
+        ArticleSearchStats.objects.filter(pk=1).update(**changes)
+
+
+def get_stats():
+    '''BM25 에 쓰는 전체 문서 수와 필드별 평균 길이 : 문서 테이블 전체를 읽지 않고 통계 행 하나만 조회'''
+    stats = ArticleSearchStats.objects.filter(pk=1).first() or ArticleSearchStats()
+    total = stats.documents
+    return {
+        "total": total,
+        **{f"avg_{name}": getattr(stats, f"{name}_length") / total if total > 0 else None for name in FIELD_CODES},
+    }
+
+
+def index_article(article):
+    '''게시글 하나의 역색인 갱신 (검색 대상 필드가 바뀌지 않았으면 건너뜀)'''
+    checksum = get_checksum(article)
+    document = ArticleSearchDocument.objects.filter(article_id=article.pk).first()
+    if document is not None and document.checksum == checksum:
+        return
+
+    rows = []
+    lengths = {}
+    for name, code in FIELD_CODES.items():
+        terms = tokenize(getattr(article, name))
+        lengths[f"{name}_length"] = len(terms)
+        rows += [
+            ArticleSearchTerm(article_id=article.pk, field=code, term=term, frequency=frequency)
+            for term, frequency in Counter(terms).items()
+        ]
+
+    with transaction.atomic():
+        # 통계는 잠근 기존 문서 길이와의 차이만큼 갱신
+        document = ArticleSearchDocument.objects.select_for_update().filter(article_id=article.pk).first()
+        ArticleSearchTerm.objects.filter(article_id=article.pk).delete()
+        ArticleSearchTerm.objects.bulk_create(rows, batch_size=500)
+        ArticleSearchDocument.objects.update_or_create(
+            article_id=article.pk, defaults={"checksum": checksum, **lengths})
+        change_stats(
+            0 if document is not None else 1,
+            {field: length - (getattr(document, field) if document is not None else 0) for field, length in lengths.items()},
+        )
+
+
+def rebuild_index(chunk_size=500):
+    '''전체 게시글 역색인 재생성'''
+    ArticleSearchTerm.objects.all().delete()
+    ArticleSearchDocument.objects.all().delete()
+    ArticleSearchStats.objects.all().delete()
+    count = 0
+    for article in Article.objects.order_by("pk").iterator(chunk_size=chunk_size):
+        index_article(article)
+        count += 1
+    return count
+
+
+def get_term_frequencies(terms):
+    '''검색어별 문서 빈도 : 한 글자 검색어는 그 글자로 시작하는 바이그램 중 흔한 것 SEARCH_PREFIX_TERMS개까지'''
+    term_filter = Q(term__in=terms)
+    for term in terms:
+        if len(term) == 1:
+            term_filter |= Q(term__startswith=term)
+    rows = (
+        ArticleSearchTerm.objects.filter(term_filter)
+        .values("term")
+        .annotate(df=Count("article", distinct=True))
+        .order_by("-df", "term")
+        .values_list("term", "df")
+    )
+    frequencies = {}
+    expanded = Counter()
+    for term, df in rows:
+        if term not in terms:
+            if expanded[term[0]] >= settings.SEARCH_PREFIX_TERMS:
+                continue
+            expanded[term[0]] += 1
+        frequencies[term] = df
+    return frequencies
+
+
+def search_articles(query, category=None, start_date=None, end_date=None, limit=20):
+    '''BM25 점수 순으로 게시글 id 목록 반환 (점수 합산/정렬/limit은 DB에서)'''
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+    document_frequency = get_term_frequencies(terms)
+    if not document_frequency:
+        return []
+
+    stats = get_stats()
+    total = stats["total"]
+    idf = Case(
+        *[
+            When(term=term, then=Value(math.log(1 + (total - df + 0.5) / (df + 0.5))))
+            for term, df in document_frequency.items()
+        ],
+        output_field=FloatField(),
+    )
+    # 필드 가중치 * tf * (K1 + 1) / (tf + K1 * (1 - B + B * 길이 / 평균 길이))
+    frequency = Cast("frequency", FloatField())
+    tf = Case(
+        *[
+            When(field=code, then=Value(FIELD_WEIGHTS[name] * (K1 + 1)) * frequency / (
+                frequency
+                + Value(K1 * (1 - B))
+                + Value(K1 * B / (stats[f"avg_{name}"] or 1))
+                * Coalesce(Cast(f"article__search_document__{name}_length", FloatField()), Value(0.0))
+            ))
+            for name, code in FIELD_CODES.items()
+        ],
+        output_field=FloatField(),
+    )
+
+    postings = ArticleSearchTerm.objects.filter(term__in=document_frequency)
+    if category:
+        postings = postings.filter(article__category=category)
+    if start_date:
+        postings = postings.filter(article__created_at__date__gte=start_date)
+    if end_date:
+        postings = postings.filter(article__created_at__date__lte=end_date)
+    ranked = (
+        postings.values("article_id")
+        .annotate(score=Sum(idf * tf))
+        .order_by("-score", "-article_id")[:limit]
+    )
+    return [row["article_id"] for row in ranked]
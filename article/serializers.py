@@ -4,40 +4,7 @@ from article.models import Article, Comment
 
 class HomeSerializer(serializers.ModelSerializer):
     '''메인페이지 용 게시글 시리얼라이저'''
-    comments_count = serializers.SerializerMethodField()
-    great_count = serializers.SerializerMethodField()
-    sad_count = serializers.SerializerMethodField()
-    angry_count = serializers.SerializerMethodField()
-    good_count = serializers.SerializerMethodField()
-    subsequent_count = serializers.SerializerMethodField()
-    reaction_count = serializers.SerializerMethodField()
-
-    def get_great_count(self, obj):
-        return obj.great.count()
-    
-    def get_sad_count(self, obj):
-        return obj.sad.count()
-    
-    def get_angry_count(self, obj):
-        return obj.angry.count()
-    
-    def get_good_count(self, obj):
-        return obj.good.count()
-    
-    def get_subsequent_count(self, obj):
-        return obj.subsequent.count()
-    
-    def get_reaction_count(self, obj):
-        return sum([
-            obj.great.count(),
-            obj.sad.count(),
-            obj.angry.count(),
-            obj.good.count(),
-            obj.subsequent.count()
-        ])
-    
-    def get_comments_count(self, obj):
-        return obj.comment.count()
+    reaction_count = serializers.IntegerField(source="reaction_total", read_only=True)
     
     class Meta:
         model = Article
@@ -51,28 +18,25 @@ class ArticleSerializer(serializers.ModelSerializer):
     updated_at = serializers.DateTimeField(
         format='%Y-%m-%d %H:%M:%S', read_only=True)
     reaction = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
+    summary_status = serializers.CharField(source="summary_job.status", read_only=True, default=None)
 
     def get_user(self, obj):
         return {'nickname': obj.user.nickname, 'pk': obj.user.pk, 'emial': obj.user.email}
 
     def get_reaction(self, obj):
         reaction_data = {
-            'great': obj.great.count(),
-            'sad': obj.sad.count(),
-            'angry': obj.angry.count(),
-            'good': obj.good.count(),
-            'subsequent': obj.subsequent.count()
+            'great': obj.great_count,
+            'sad': obj.sad_count,
+            'angry': obj.angry_count,
+            'good': obj.good_count,
+            'subsequent': obj.subsequent_count
         }
         return reaction_data
 
-    def get_comments_count(self, obj):
-        return obj.comment.count()
-
     class Meta:
         model = Article
         fields = ['id', 'title', 'content', 'user', 'created_at',
-                  'updated_at', 'reaction', 'category', 'image', 'image_content', 'comments_count', 'summary']
+                  'updated_at', 'reaction', 'category', 'image', 'image_content', 'comments_count', 'summary', 'summary_status']
 
 class ArticleCreateSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
@@ -106,18 +70,18 @@ class ArticleListSerializer(serializers.ModelSerializer):
 
     def get_reaction(self, obj):
         reaction_data = {
-            'great': obj.great.count(),
-            'sad': obj.sad.count(),
-            'angry': obj.angry.count(),
-            'good': obj.good.count(),
-            'subsequent': obj.subsequent.count()
+            'great': obj.great_count,
+            'sad': obj.sad_count,
+            'angry': obj.angry_count,
+            'good': obj.good_count,
+            'subsequent': obj.subsequent_count
         }
         return reaction_data
 
     class Meta:
         model = Article
-        fields = ["id", "title", "user", "image",
-                  "created_at", "category", "reaction", "summary"]
+        fields = ["id", "title", "user", "image", "image_thumbnail", "image_webp",
+                  "image_width", "image_height", "created_at", "category", "reaction", "summary"]
 
 class CommentSerializer(serializers.ModelSerializer):
     '''댓글 시리얼라이저'''
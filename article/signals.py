@@ -0,0 +1,78 @@
+from django.db.models import Case, F, When
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from article.models import Article, ArticleSearchDocument, Comment, DailyBestArticle
+from article.cache import invalidate_home_cache
+from article.search import FIELD_CODES, change_stats, index_article
+from nuriggun.images import keep_image_variants, mark_image_upload, schedule_image_variants
+from article.autocomplete import title_index
+
+
+@receiver(post_save, sender=Article)
+def article_daily_best_create(sender, instance, created, **kwargs):
+    '''새 게시글을 작성 날짜(한국 시간)의 순위표에 등록'''
+    if created:
+        DailyBestArticle.objects.create(
+            date=timezone.localdate(instance.created_at), article=instance)
+
+
+@receiver(post_save, sender=Article)
+def article_search_index(sender, instance, **kwargs):
+    '''게시글 작성/수정 시 검색 역색인 갱신 (삭제는 CASCADE로 함께 지워짐)'''
+    index_article(instance)
+
+
+@receiver(post_delete, sender=ArticleSearchDocument)
+def article_search_stats_remove(sender, instance, **kwargs):
+    '''게시글이 지워져서 색인 문서가 함께 삭제되면 검색 통계에서 제외'''
+    change_stats(-1, {f"{name}_length": -getattr(instance, f"{name}_length") for name in FIELD_CODES})
+
+
+@receiver(post_save, sender=Article)
+def article_autocomplete_upsert(sender, instance, **kwargs):
+    '''이 워커의 자동완성 제목 목록 갱신'''
+    title_index.upsert(instance.pk, instance.title, instance.reaction_total, instance.change_count)
+
+
+@receiver(post_delete, sender=Article)
+def article_autocomplete_remove(sender, instance, **kwargs):
+    title_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    '''댓글 작성/수정 시 게시글의 댓글 수와 변경 카운터 갱신'''
+    changes = {"change_count": F("change_count") + 1, "activity_at": timezone.now()}
+    if created:
+        changes["comments_count"] = F("comments_count") + 1
+    Article.objects.filter(pk=instance.article_id).update(**changes)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    '''댓글 삭제(연쇄 삭제 포함) 시 게시글의 댓글 수 감소, 변경 카운터 증가'''
+    Article.objects.filter(pk=instance.article_id).update(
+        comments_count=Case(When(comments_count__gt=0, then=F("comments_count") - 1), default=0),
+        change_count=F("change_count") + 1,
+        activity_at=timezone.now(),
+    )
+
+
+@receiver([post_save, post_delete], sender=Article)
+@receiver([post_save, post_delete], sender=Comment)
+def home_cache_invalidate(sender, **kwargs):
+    '''게시글/댓글이 바뀌면 메인페이지 캐시 무효화'''
+    invalidate_home_cache()
+
+
+@receiver(pre_save, sender=Article)
+def article_image_upload(sender, instance, update_fields=None, **kwargs):
+    mark_image_upload(instance, "image")
+    keep_image_variants(instance, "image", update_fields)
+
+
+@receiver(post_save, sender=Article)
+def article_image_variants(sender, instance, **kwargs):
+    '''새 이미지가 올라오면 커밋 후 썸네일/webp 생성'''
+    schedule_image_variants(instance, "image")
@@ -1,40 +1,262 @@
+import hashlib
+import logging
+import random
+import re
 import threading
+import unicodedata
+from datetime import timedelta
 
 import openai
-import os
-from dotenv import load_dotenv
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
-from article.models import Article
+from article.models import Article, SummaryCache, SummaryJob
+from article.textrank import summarize
+from nuriggun.tasks import tasks
 
 
-class SummaryThread(threading.Thread):
-    '''비동기전송 : 게시글 작성 시 요약 기능으로 인한 지연현상이 없어짐'''
-    def __init__(self, content):
-        self.content = content
-        threading.Thread.__init__(self)
+logger = logging.getLogger(__name__)
+
+PROMPT = "Summarize the content in Korean, but keep it simple so that it does not exceed max_tokens=500. No greetings or reporter information is required."
+
+SPACE_RE = re.compile(r"\s+")
+
+# 요약 엔진 : textrank 는 로컬 추출 요약만, llm 은 로컬 요약을 먼저 채우고 LLM 요약으로 교체
+TEXTRANK = "textrank"
+LLM = "llm"
+
+
+def request_summary(content):
+    '''LLM 요약 요청'''
+    response = openai.Completion.create(
+        engine=settings.SUMMARY_ENGINE,
+        prompt=PROMPT + content,
+        max_tokens=500,
+        temperature=0.3,
+        n=1,
+        stop=None,
+        api_key=settings.OPENAI_API_KEY,
+        api_base=settings.OPENAI_API_BASE,
+        request_timeout=settings.SUMMARY_TIMEOUT,
+    )
+    return response.choices[0].text.strip()
+
+
+def get_summary_engine(category):
+    return settings.SUMMARY_CATEGORY_ENGINES.get(category, settings.SUMMARY_DEFAULT_ENGINE)
+
+
+def get_content_hash(content):
+    '''요약 캐시 키 : 엔진, 프롬프트와 정규화한 내용(NFKC + 공백 하나로)의 해시'''
+    text = SPACE_RE.sub(" ", unicodedata.normalize("NFKC", content)).strip()
+    key = "\x00".join((settings.SUMMARY_ENGINE, PROMPT, text))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_summary(content):
+    '''같은 내용의 요약이 있으면 돌려주고 사용 시각 갱신'''
+    content_hash = get_content_hash(content)
+    cached = SummaryCache.objects.filter(content_hash=content_hash).values_list("summary", flat=True).first()
+    if cached is not None:
+        SummaryCache.objects.filter(content_hash=content_hash).update(
+            hit_count=F("hit_count") + 1, last_used_at=timezone.now())
+    return cached
+
+
+def set_cached_summary(content, summary):
+    '''요약 저장 후 최대 개수를 넘으면 오래 안 쓴 것부터 삭제'''
+    SummaryCache.objects.update_or_create(
+        content_hash=get_content_hash(content),
+        defaults={"summary": summary, "last_used_at": timezone.now()},
+    )
+    excess = SummaryCache.objects.count() - settings.SUMMARY_CACHE_MAX_ENTRIES
+    if excess > 0:
+        oldest = SummaryCache.objects.order_by("last_used_at").values_list("pk", flat=True)[:excess]
+        SummaryCache.objects.filter(pk__in=list(oldest)).delete()
+
+
+def get_due_filter(now):
+    '''실행할 때가 된 작업 : 대기 중이거나, 요약 중인 채로 멈춘(워커가 죽은) 작업'''
+    stale_before = now - timedelta(seconds=settings.SUMMARY_STALE_SECONDS)
+    return Q(status=SummaryJob.PENDING, next_run_at__lte=now) | Q(status=SummaryJob.RUNNING, updated_at__lt=stale_before)
+
+
+def get_backoff(attempts):
+    '''재시도 대기 시간 : 지수 백오프 + 지터'''
+    delay = min(settings.SUMMARY_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.SUMMARY_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def enqueue_summary(article):
+    '''요약을 바로 채우고(캐시 또는 로컬 추출 요약), LLM 엔진이면 작업 등록 후 커밋 뒤 워커에 알림'''
+    if not article.content:
+        return
+    engine = get_summary_engine(article.category)
+    cached = get_cached_summary(article.content) if engine == LLM else None
+    if cached is not None:
+        # 같은 내용을 요약한 적이 있으면 그대로 사용
+        summary, status = cached, SummaryJob.DONE
+    else:
+        summary = summarize(article.content, settings.SUMMARY_TEXTRANK_SENTENCES)
+        status = SummaryJob.PENDING if engine == LLM else SummaryJob.DONE
+
+    now = timezone.now()
+    updated = SummaryJob.objects.filter(pk=article.pk).update(
+        status=status, version=F("version") + 1, attempts=0,
+        next_run_at=now, last_error="", updated_at=now)
+    if not updated:
+        SummaryJob.objects.create(article=article, status=status, next_run_at=now)
+
+    article.summary = summary
+    article.save(update_fields=["summary"])
+    if status == SummaryJob.PENDING:
+        article_id = article.pk
+        transaction.on_commit(lambda: summary_queue.wake(article_id))
+
+
+def get_running(now):
+    '''모든 워커에서 요약 중인 작업 (멈춘 작업은 제외)'''
+    stale_before = now - timedelta(seconds=settings.SUMMARY_STALE_SECONDS)
+    return SummaryJob.objects.filter(status=SummaryJob.RUNNING, updated_at__gte=stale_before)
+
+
+def claim_job(article_id, now):
+    '''작업 가져오기 : 모든 워커를 합쳐 요약 중인 작업이 SUMMARY_MAX_CONCURRENCY 개 미만일 때만
+
+    요약 중인 행을 select_for_update 로 잠근 채 세므로((status, next_run_at) 인덱스 범위 잠금),
+    동시에 가져가려는 워커는 순서대로 세고 가져감.
+    '''
+    with transaction.atomic():
+        running = get_running(now).select_for_update().exclude(pk=article_id).values_list("pk", flat=True)
+        if len(running) >= settings.SUMMARY_MAX_CONCURRENCY:
+            return False
+        return bool(SummaryJob.objects.filter(get_due_filter(now), pk=article_id).update(
+            status=SummaryJob.RUNNING, attempts=F("attempts") + 1, updated_at=now))
+
+
+def run_job(article_id):
+    '''작업 하나 실행 : 다른 워커가 먼저 가져갔거나 동시 요약 수가 다 찼으면 False'''
+    if not claim_job(article_id, timezone.now()):
+        return False
+
+    job = SummaryJob.objects.select_related("article").get(pk=article_id)
+    content = job.article.content
+    # 대기하는 사이 같은 내용이 먼저 요약됐을 수 있음
+    answer = get_cached_summary(content)
+    if answer is None:
+        try:
+            answer = request_summary(content)
+        except Exception as error:
+            fail_job(job, error)
+            return True
+        set_cached_summary(content, answer)
+
+    with transaction.atomic():
+        # 요약하는 사이 내용이 바뀌었으면(version 증가) 결과를 버림 : 새 작업이 다시 요약함
+        current = SummaryJob.objects.select_for_update().filter(pk=article_id, version=job.version).first()
+        if current is None:
+            return True
+        article = Article.objects.select_for_update().get(pk=article_id)
+        article.summary = answer
+        article.change_count += 1
+        article.activity_at = timezone.now()
+        article.save(update_fields=["summary", "change_count", "activity_at"])
+        current.status = SummaryJob.DONE
+        current.last_error = ""
+        current.save()
+    return True
+
+
+def fail_job(job, error):
+    '''실패한 작업은 백오프 후 다시 대기, 최대 시도 횟수를 넘으면 실패 처리'''
+    logger.warning("게시글 %s 요약 실패 (%d회) : %s", job.pk, job.attempts, error)
+    now = timezone.now()
+    final = job.attempts >= settings.SUMMARY_MAX_ATTEMPTS
+    updated = SummaryJob.objects.filter(pk=job.pk, version=job.version).update(
+        status=SummaryJob.FAILED if final else SummaryJob.PENDING,
+        next_run_at=now + timedelta(seconds=0 if final else get_backoff(job.attempts)),
+        last_error=str(error)[:1000],
+        updated_at=now,
+    )
+    if updated and final:
+        # 상세페이지 ETag/Last-Modified 갱신 (summary_status 변경)
+        Article.objects.filter(pk=job.pk).update(change_count=F("change_count") + 1, activity_at=now)
+
+
+class SummaryQueue:
+    '''DB 요약 작업 큐 : 디스패처 스레드 하나가 공용 작업 실행기(nuriggun.tasks)에 SUMMARY_WORKERS 개까지 넣음
+
+    작업은 DB 에 남아 있으므로 프로세스가 재시작되어도 다음 디스패치 때 이어서 실행됨.
+    LLM 동시 요청 수(SUMMARY_MAX_CONCURRENCY)는 작업을 가져올 때 DB 에서 세므로 워커 수와 관계없이 전체 기준.
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.queued = set()
+        self.dispatcher = None
+
+    def start(self):
+        with self.lock:
+            if self.dispatcher is not None:
+                return
+            self.dispatcher = threading.Thread(target=self.run, name="summary-dispatcher", daemon=True)
+            self.dispatcher.start()
+
+    def wake(self, article_id=None):
+        if settings.TASK_EAGER:
+            # 테스트용 : 재시도까지 그 자리에서 실행
+            while run_job(article_id):
+                pass
+            return
+        self.start()
+        self.wakeup.set()
 
     def run(self):
-        summary(self.content)
-
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-
-def summary(content):
-    if content:
-        queryset = Article.objects.all()
-        if queryset.exists():
-            summary_content = queryset.order_by("-id").first()
-            response = openai.Completion.create(
-            engine='text-davinci-003',
-            prompt="Summarize the content in Korean, but keep it simple so that it does not exceed max_tokens=500. No greetings or reporter information is required."+content,
-            max_tokens=500,
-            temperature=0.3,
-            n=1,
-            stop=None,
+        while True:
+            self.wakeup.wait(settings.SUMMARY_POLL_SECONDS)
+            self.wakeup.clear()
+            try:
+                self.dispatch()
+            except Exception:
+                logger.exception("요약 작업 디스패치 실패")
+            finally:
+                connections.close_all()
+
+    def dispatch(self):
+        '''실행할 때가 된 작업을 빈 자리만큼만 넣음 (나머지는 DB 에서 대기)'''
+        with self.lock:
+            capacity = settings.SUMMARY_WORKERS - len(self.queued)
+            queued = set(self.queued)
+        if capacity <= 0:
+            return
+        now = timezone.now()
+        # 다른 워커까지 합쳐 동시 요약 수가 다 찼으면 다음 확인 때까지 대기
+        capacity = min(capacity, settings.SUMMARY_MAX_CONCURRENCY - get_running(now).count())
+        if capacity <= 0:
+            return
+        due = (
+            SummaryJob.objects.filter(get_due_filter(now))
+            .exclude(pk__in=queued)
+            .order_by("next_run_at")
+            .values_list("pk", flat=True)[:capacity]
         )
+        for article_id in due:
+            with self.lock:
+                self.queued.add(article_id)
+            tasks.submit(self.work, article_id)
+
+    def work(self, article_id):
+        ran = False
+        try:
+            ran = run_job(article_id)
+        finally:
+            with self.lock:
+                self.queued.discard(article_id)
+            if ran:
+                # 빈 자리가 생겼으니 다음 작업 확인 (못 가져갔으면 다음 확인 주기까지 대기)
+                self.wakeup.set()
 
-            answer = response.choices[0].text.strip()
 
-            summary_content.summary = answer
-            summary_content.save()
+summary_queue = SummaryQueue()
@@ -2,7 +2,11 @@ from django.urls import reverse
 from rest_framework.test import APITestCase,APIClient,force_authenticate,APIRequestFactory
 from django.test import TestCase,RequestFactory
 from rest_framework import status
-from .models import Article,Comment,CommentReaction, ArticleReaction
+from .models import Article,Comment,CommentReaction, ArticleReaction, DailyBestArticle, ArticleSearchTerm
+from .models import ArticleSearchDocument, ArticleSearchStats
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test.utils import CaptureQueriesContext
 from .views import HomeView
 from user.models import User
 from django.test.client import MULTIPART_CONTENT, encode_multipart, BOUNDARY
@@ -10,9 +14,32 @@ from PIL import Image
 import tempfile
 from django.core.files.uploadedfile import SimpleUploadedFile
 from faker import Faker
-from .serializers import ArticleSerializer
+from .serializers import ArticleSerializer, ArticleListSerializer
+from .cache import get_home_generation, HOME_GENERATION_KEY
+from django.core.cache import caches
+from django.conf import settings
+from .search import tokenize, search_articles, get_term_frequencies
+from .autocomplete import title_index
+from nuriggun.querybudget import get_repeated_queries
+from nuriggun.testing import QueryBudgetTestMixin
+from nuriggun.images import render_variants
+from .models import SummaryJob, SummaryCache
+from .summary import enqueue_summary, run_job
+from .textrank import split_sentences, summarize
+from django.db.models import F
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import base64
+import threading
+from django.test import override_settings
+from io import BytesIO
+from django.core.management import call_command
+from io import StringIO
+from importlib import import_module
+from django.apps import apps as django_apps
 from django.utils import timezone
 from datetime import timedelta
+from unittest import mock
 
 
 
@@ -664,4 +691,777 @@ class HomeViewTest(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(articles), 4)
 
-            
\ No newline at end of file
+            
+
+"""커서 페이지네이션 Test"""
+class ArticleCursorPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.articles = [
+            Article.objects.create(title=f"{i}번 게시글", content="내용", category="it", user=cls.user)
+            for i in range(5)
+        ]
+
+    def test_article_list_cursor(self):
+        '''limit 만큼 나눠서 모든 게시글을 중복 없이 최신순으로 조회'''
+        url = reverse("article_list", kwargs={"user_id": self.user.id}) + "?limit=2"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            ids += [article["id"] for article in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(ids, [article.id for article in reversed(self.articles)])
+
+    def test_category_cursor(self):
+        '''카테고리 게시글 목록 페이지네이션'''
+        url = reverse("category_view", kwargs={"category": "it"}) + "?limit=3"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_cursor(self):
+        '''잘못된 커서는 404'''
+        url = reverse("article_view") + "?cursor=invalid"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        '''형식은 맞지만 값이 필드 타입과 다른 커서도 404'''
+        url = reverse("article_list", kwargs={"user_id": self.user.id})
+        positions = [
+            ["not-a-date", 1],
+            ["2023-07-01T00:00:00+09:00", "abc"],
+            [None, 1],
+            [[1], {"id": 1}],
+            ["2023-07-01T00:00:00+09:00", 10 ** 30],
+        ]
+        for position in positions:
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(url + "?cursor=" + cursor)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
+
+"""반응 개수 컬럼 Test"""
+class ArticleReactionCountTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.article = Article.objects.create(title="test Title", content="test content", user=cls.user)
+
+    def test_reaction_toggle_updates_counts(self):
+        '''반응 등록/취소 시 반응 개수 컬럼 갱신'''
+        url = reverse("article_reaction", kwargs={"article_id": self.article.id})
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(url, {"reaction": "great"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.great_count, self.article.reaction_total), (1, 1))
+
+        response = self.client.post(url, {"reaction": "great"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.great_count, self.article.reaction_total), (0, 0))
+
+    def test_invalid_reaction(self):
+        '''유효하지 않은 반응 타입'''
+        url = reverse("article_reaction", kwargs={"article_id": self.article.id})
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(url, {"reaction": "love"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_article_counts(self):
+        '''sync_article_counts 커맨드로 개수 컬럼 재계산'''
+        self.article.sad.add(self.user)
+        self.article.good.add(self.user)
+        call_command("sync_article_counts", stdout=StringIO())
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.sad_count, self.article.good_count, self.article.reaction_total), (1, 1, 2))
+
+    def test_remove_reaction_before_backfill(self):
+        '''개수 컬럼이 채워지기 전의 반응을 취소해도 0 아래로 내려가지 않음'''
+        self.article.great.add(self.user)
+        url = reverse("article_reaction", kwargs={"article_id": self.article.id})
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(url, {"reaction": "great"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.great_count, self.article.reaction_total), (0, 0))
+
+    def test_backfill_migration(self):
+        '''기존 게시글 개수 컬럼을 채우는 데이터 마이그레이션'''
+        backfill = import_module("article.migrations.0002_backfill_article_counts")
+        self.article.sad.add(self.user)
+        Comment.objects.create(comment="comment", article=self.article, user=self.user)
+        Article.objects.update(comments_count=0)
+        backfill.backfill_counts(django_apps, None)
+        self.article.refresh_from_db()
+        self.assertEqual((self.article.sad_count, self.article.reaction_total, self.article.comments_count), (1, 1, 1))
+
+    def test_list_serializer_reads_columns(self):
+        '''반응 개수를 컬럼에서 읽어 추가 쿼리 없음'''
+        article = Article.objects.select_related("user").get(pk=self.article.pk)
+        with self.assertNumQueries(0):
+            data = ArticleListSerializer(article).data
+        self.assertEqual(data["reaction"]["great"], 0)
+
+
+"""오늘의 HOT뉴스 순위표 Test"""
+class DailyBestArticleTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.articles = [
+            Article.objects.create(title=f"{i}번 게시글", content="내용", user=cls.user)
+            for i in range(3)
+        ]
+
+    def test_article_registered_in_leaderboard(self):
+        '''게시글 작성 시 오늘 날짜 순위표에 등록'''
+        self.assertEqual(
+            DailyBestArticle.objects.filter(date=timezone.localdate()).count(), 3)
+
+    def test_best_uses_leaderboard(self):
+        '''반응이 가장 많은 오늘의 게시글 조회'''
+        self.client.force_authenticate(user=self.user)
+        url = reverse("article_reaction", kwargs={"article_id": self.articles[0].id})
+        self.client.post(url, {"reaction": "great"})
+        self.client.post(url, {"reaction": "sad"})
+
+        rank = DailyBestArticle.objects.get(article=self.articles[0])
+        self.assertEqual(rank.reaction_total, 2)
+
+        response = self.client.get(reverse('home_view') + '?order=best')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['id'], self.articles[0].id)
+        self.assertEqual(response.data['results'][0]['reaction_count'], 2)
+
+
+"""댓글 수 컬럼 Test"""
+class ArticleCommentsCountTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.article = Article.objects.create(title="test Title", content="test content", user=cls.user)
+
+    def test_comment_create_delete(self):
+        '''댓글 작성/삭제 시 댓글 수 컬럼 갱신'''
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse("comment_view", kwargs={"article_id": self.article.id}), {"comment": "test comment"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 1)
+
+        comment = Comment.objects.get(article=self.article)
+        self.client.delete(reverse("comment_view", kwargs={"comment_id": comment.id}))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 0)
+
+    def test_cascade_delete(self):
+        '''작성자 댓글 일괄 삭제 시에도 댓글 수 감소'''
+        for _ in range(3):
+            Comment.objects.create(comment="comment", article=self.article, user=self.user)
+        Comment.objects.filter(user=self.user).delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 0)
+
+    def test_home_main_order(self):
+        '''댓글 수 컬럼 기준 메인 게시글 정렬'''
+        other = Article.objects.create(title="other", content="content", user=self.user)
+        Comment.objects.create(comment="comment", article=other, user=self.user)
+        response = self.client.get(reverse('home_view') + '?order=main')
+        self.assertEqual(response.data['results'][0]['id'], other.id)
+        self.assertEqual(response.data['results'][0]['comments_count'], 1)
+
+
+"""메인페이지 캐시 Test"""
+class HomeCacheTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.article = Article.objects.create(title="test Title", content="test content", user=cls.user)
+
+    def test_cached_response_without_queries(self):
+        '''두 번째 요청은 DB 조회 없이 캐시에서 응답'''
+        url = reverse('home_view') + '?order=sub'
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.data, second.data)
+
+    def test_article_write_bumps_generation(self):
+        '''게시글 작성 시 세대 번호가 바뀌어 새 게시글이 보임'''
+        url = reverse('home_view') + '?order=sub'
+        self.client.get(url)
+        generation = get_home_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="new Title", content="new content", user=self.user)
+        self.assertGreater(get_home_generation(), generation)
+        response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['id'], article.id)
+
+    def test_generation_shared_between_workers(self):
+        '''다른 워커가 올린 세대 번호를 확인 간격이 지나면 반영'''
+        generation = get_home_generation()
+        caches[settings.HOME_GENERATION_CACHE_ALIAS].set(HOME_GENERATION_KEY, generation + 10, None)
+        self.assertEqual(get_home_generation(), generation)
+        with self.settings(HOME_GENERATION_CHECK_SECONDS=0):
+            self.assertEqual(get_home_generation(), generation + 10)
+
+    def test_warm_home_cache(self):
+        '''warm_home_cache 커맨드 실행 후 캐시 적중'''
+        call_command("warm_home_cache", "--host", "testserver", stdout=StringIO())
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home_view') + '?order=main')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+"""역색인 검색 Test"""
+class ArticleInvertedIndexSearchTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.title_match = Article.objects.create(
+            title="삼성전자 신제품 발표", content="오늘 새로운 제품이 공개되었다.", category="it", user=cls.user)
+        cls.content_match = Article.objects.create(
+            title="경제 소식", content="삼성 전자 주가가 올랐다.", category="경제", user=cls.user)
+        cls.other = Article.objects.create(
+            title="날씨 소식", content="내일은 비가 온다.", category="날씨", user=cls.user)
+
+    def test_tokenize(self):
+        '''글자 바이그램 토큰화'''
+        self.assertEqual(tokenize("삼성 전자"), ["삼성", "전자"])
+        self.assertEqual(tokenize("Test 비"), ["te", "es", "st", "비"])
+
+    def test_search_ranking(self):
+        '''제목에서 찾은 게시글이 먼저, 띄어쓰기가 달라도 검색'''
+        response = self.client.get(reverse('article_search') + "?search=삼성전자")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [data["id"] for data in response.data]
+        self.assertEqual(ids, [self.title_match.id, self.content_match.id])
+
+    def test_search_category_filter(self):
+        '''카테고리 필터'''
+        response = self.client.get(reverse('article_search') + "?search=삼성&category=경제")
+        self.assertEqual([data["id"] for data in response.data], [self.content_match.id])
+
+    def test_search_invalid_date(self):
+        '''잘못된 날짜 필터'''
+        response = self.client.get(reverse('article_search') + "?search=삼성&start_date=2023-13-40")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_updated_on_save(self):
+        '''게시글 수정 시 역색인 갱신'''
+        self.other.title = "삼성 날씨"
+        self.other.save()
+        response = self.client.get(reverse('article_search') + "?search=삼성&category=날씨")
+        self.assertEqual([data["id"] for data in response.data], [self.other.id])
+
+    def test_rebuild_search_index(self):
+        '''rebuild_search_index 커맨드'''
+        ArticleSearchTerm.objects.all().delete()
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertTrue(ArticleSearchTerm.objects.filter(article=self.other, term="날씨").exists())
+
+    def test_search_negative_limit(self):
+        '''limit이 0 이하면 1개'''
+        response = self.client.get(reverse('article_search') + "?search=삼성&limit=-5")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([data["id"] for data in response.data], [self.title_match.id])
+
+    def test_search_scored_in_database(self):
+        '''게시글별 색인 행을 가져오지 않고 DB에서 점수 합산/정렬'''
+        with self.assertNumQueries(3):
+            ids = search_articles("삼성전자", limit=1)
+        self.assertEqual(ids, [self.title_match.id])
+
+    def assertStatsMatchDocuments(self):
+        stats = ArticleSearchStats.objects.get(pk=1)
+        expected = ArticleSearchDocument.objects.aggregate(
+            documents=Count("pk"), **{f"{name}_length": Sum(f"{name}_length") for name in ("title", "content", "summary", "image_content")})
+        self.assertEqual({field: getattr(stats, field) for field in expected}, expected)
+
+    def test_search_stats_maintained(self):
+        '''문서 수/길이 통계는 색인할 때 함께 갱신 (검색마다 문서 테이블을 집계하지 않음)'''
+        self.assertStatsMatchDocuments()
+        self.other.content = "내일은 비가 많이 오고 바람이 분다."
+        self.other.save()
+        self.assertStatsMatchDocuments()
+        self.other.delete()
+        self.assertStatsMatchDocuments()
+        with CaptureQueriesContext(connection) as queries:
+            search_articles("삼성")
+        self.assertFalse([query for query in queries.captured_queries if "articlesearchdocument" in query["sql"] and "COUNT" in query["sql"]])
+
+    @override_settings(SEARCH_PREFIX_TERMS=1)
+    def test_single_character_expansion_capped(self):
+        '''한 글자 검색어는 그 글자로 시작하는 바이그램 중 흔한 것만 찾음'''
+        self.assertEqual(set(get_term_frequencies({"삼"})), {"삼성"})
+        for title in ("삼각형", "삼각김밥", "삼각 관계"):
+            Article.objects.create(title=title, content="내용", user=self.user)
+        self.assertEqual(set(get_term_frequencies({"삼"})), {"삼각"})
+
+
+"""제목 자동완성 Test"""
+class ArticleAutocompleteTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.popular = Article.objects.create(title="삼성전자 주가", content="내용", user=cls.user, reaction_total=5)
+        cls.plain = Article.objects.create(title="삼성  라이온즈", content="내용", user=cls.user)
+        cls.other = Article.objects.create(title="날씨 소식", content="내용", user=cls.user)
+
+    def setUp(self):
+        title_index.build()
+
+    def test_prefix_ranked_by_reactions(self):
+        '''접두어 일치 + 반응 수 순'''
+        response = self.client.get(reverse("article_autocomplete") + "?q=삼성")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([data["id"] for data in response.data], [self.popular.id, self.plain.id])
+
+    def test_normalized_prefix(self):
+        '''공백/대소문자 정규화'''
+        self.assertEqual(
+            [data["id"] for data in title_index.suggest("삼성 라이")], [self.plain.id])
+
+    def test_incremental_update(self):
+        '''게시글 작성/삭제 시 목록 갱신'''
+        article = Article.objects.create(title="삼성 새 소식", content="내용", user=self.user)
+        self.assertIn(article.id, [data["id"] for data in title_index.suggest("삼성 새")])
+        article.delete()
+        self.assertEqual(title_index.suggest("삼성 새"), [])
+
+    def test_prefix_top_cache(self):
+        '''짧은 접두어 상위 목록 캐시 + 반응 수 변경 시 캐시를 지우지 않고 제자리에서 갱신'''
+        with self.settings(AUTOCOMPLETE_TOP_K=1):
+            self.assertEqual([data["id"] for data in title_index.suggest("삼")], [self.popular.id])
+            self.assertIn("삼", title_index.top)
+            title_index.set_score(self.plain.id, 10, 1)
+            self.assertEqual(title_index.top["삼"], [self.plain.id])
+            self.assertEqual([data["id"] for data in title_index.suggest("삼", 5)], [self.plain.id])
+            # 상위 게시글의 반응 수가 줄어 목록 밖 후보보다 낮아지면 그 접두어만 다시 계산
+            title_index.set_score(self.plain.id, 0, 2)
+            self.assertNotIn("삼", title_index.top)
+            self.assertEqual([data["id"] for data in title_index.suggest("삼")], [self.popular.id])
+
+    def test_stale_score_ignored(self):
+        '''이미 반영한 버전보다 오래된 반응 수는 무시'''
+        title_index.set_score(self.plain.id, 10, 2)
+        title_index.set_score(self.plain.id, 1, 1)
+        title_index.upsert(self.plain.id, self.plain.title, 0, 0)
+        self.assertEqual([data["id"] for data in title_index.suggest("삼성")], [self.plain.id, self.popular.id])
+
+    def test_reaction_updates_index(self):
+        '''반응을 누르면 이 워커의 목록에 바로 반영'''
+        self.client.force_authenticate(self.user)
+        for reaction in ("great", "sad", "angry", "good", "subsequent", "great"):
+            self.client.post(reverse("article_reaction", args=[self.plain.id]), {"reaction": reaction})
+        self.assertEqual(title_index.entries[self.plain.id][2], 4)
+        self.assertEqual(title_index.entries[self.plain.id][3], 6)
+
+    def test_negative_limit(self):
+        '''limit이 0 이하면 1개'''
+        response = self.client.get(reverse("article_autocomplete") + "?q=삼성&limit=-1")
+        self.assertEqual([data["id"] for data in response.data], [self.popular.id])
+
+    def test_stale_index_refreshed_in_background(self):
+        '''목록이 오래되면 요청 안에서 다시 만들지 않고 백그라운드 작업으로 등록'''
+        title_index.built_at -= 601
+        with mock.patch("article.autocomplete.tasks.submit") as submit:
+            self.assertEqual(len(title_index.suggest("삼성")), 2)
+            title_index.suggest("삼성")
+        submit.assert_called_once_with(title_index.build)
+        title_index.refreshing = False
+
+    def test_changes_during_build_kept(self):
+        '''다시 만드는 동안 들어온 변경은 만든 뒤 다시 적용 (이미 읽은 반응 수는 두 번 더하지 않음)'''
+        values_list = Article.objects.values_list
+
+        def change_during_build(*args, **kwargs):
+            title_index.upsert(999999, "삼성 늦은 소식")
+            Article.objects.filter(pk=self.plain.pk).update(reaction_total=3, change_count=1)
+            title_index.set_score(self.plain.pk, 3, 1)
+            return values_list(*args, **kwargs)
+
+        with mock.patch.object(Article.objects, "values_list", side_effect=change_during_build):
+            title_index.build()
+        self.assertEqual([data["id"] for data in title_index.suggest("삼성 늦")], [999999])
+        self.assertEqual(title_index.entries[self.plain.pk][2], 3)
+
+    def test_warm_builds_in_background(self):
+        '''워커 시작 시 백그라운드에서 미리 만듦'''
+        title_index.built_at = None
+        with mock.patch("article.autocomplete.tasks.submit") as submit:
+            title_index.warm()
+            title_index.warm()
+        submit.assert_called_once_with(title_index.build)
+        title_index.build()
+
+
+"""쿼리 예산 / N+1 Test"""
+class ArticleQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.article = Article.objects.create(title="test Title", content="test content", category="it", user=cls.user)
+        Comment.objects.create(comment="comment", article=cls.article, user=cls.user)
+
+    def grow(self):
+        for i in range(3):
+            user = User.objects.create_user(f'{i}@budget.test', '1234', nickname=f'user{i}')
+            Article.objects.create(title=f"{i}번", content="content", category="it", user=user)
+            Comment.objects.create(comment="comment", article=self.article, user=user)
+
+    def test_query_shape(self):
+        '''파라미터만 다른 쿼리는 같은 모양'''
+        queries = [f'SELECT * FROM "user_user" WHERE "id" = {i}' for i in range(5)]
+        self.assertEqual(get_repeated_queries(queries, threshold=5)[0][1], 5)
+
+    def test_comment_list_budget(self):
+        '''댓글 목록 : 댓글이 늘어도 쿼리 수 일정'''
+        url = reverse('comment_view', kwargs={'article_id': self.article.id})
+        self.assertQueryBudget(url, grow=self.grow)
+
+    def test_article_list_budget(self):
+        '''카테고리 게시글 목록 : 게시글이 늘어도 쿼리 수 일정'''
+        url = reverse("category_view", kwargs={"category": "it"})
+        self.assertQueryBudget(url, grow=self.grow)
+
+    def test_home_budget(self):
+        '''메인페이지 게시글'''
+        self.assertQueryBudget(reverse('home_view') + '?order=main', grow=self.grow)
+
+
+"""댓글 커서 페이지네이션 Test"""
+class CommentPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234', nickname='writer')
+        cls.article = Article.objects.create(title="test Title", content="test content", user=cls.user)
+        cls.comment = [
+            Comment.objects.create(comment=f"comment {i}", article=cls.article, user=cls.user) for i in range(5)
+        ]
+
+    def test_get_comments_cursor(self):
+        '''최신순 커서 페이지네이션, 작성자 정보 포함'''
+        url = reverse('comment_view', kwargs={'article_id': self.article.id})
+        first = self.client.get(url, {"limit": 3})
+        self.assertEqual([comment["id"] for comment in first.data["results"]],
+                         [comment.id for comment in reversed(self.comment[2:])])
+        self.assertEqual(first.data["results"][0]["user"], {"nickname": self.user.nickname, "pk": self.user.pk, "profile_img": ""})
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual([comment["id"] for comment in second.data["results"]],
+                         [comment.id for comment in reversed(self.comment[:2])])
+        self.assertIsNone(second.data["next"])
+
+    def test_get_comments_not_found(self):
+        url = reverse('comment_view', kwargs={'article_id': self.article.id + 100})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+"""ETag / 조건부 GET Test"""
+class ArticleConditionalGetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+        cls.article = Article.objects.create(title="test Title", content="test content", user=cls.user)
+        cls.comment = Comment.objects.create(comment="comment", article=cls.article, user=cls.user)
+
+    def setUp(self):
+        self.detail_url = reverse('article_detail_view', kwargs={'article_id': self.article.id})
+        self.comment_url = reverse('comment_view', kwargs={'article_id': self.article.id})
+
+    def test_detail_not_modified(self):
+        '''같은 ETag 로 다시 요청하면 304'''
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_comment_list_not_modified(self):
+        '''댓글 목록도 304'''
+        etag = self.client.get(self.comment_url)["ETag"]
+        response = self.client.get(self.comment_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_on_comment(self):
+        '''댓글 작성/수정/삭제 시 ETag 변경'''
+        etags = {self.client.get(self.comment_url)["ETag"]}
+        comment = Comment.objects.create(comment="new", article=self.article, user=self.user)
+        etags.add(self.client.get(self.comment_url)["ETag"])
+        comment.comment = "edited"
+        comment.save()
+        etags.add(self.client.get(self.comment_url)["ETag"])
+        comment.delete()
+        etags.add(self.client.get(self.comment_url)["ETag"])
+        self.assertEqual(len(etags), 4)
+
+    def test_etag_changes_on_reaction(self):
+        '''반응 시 상세페이지 ETag 변경'''
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('article_reaction', kwargs={'article_id': self.article.id}), {"reaction": "great"})
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["reaction"]["great"], 1)
+
+    def test_query_string_in_etag(self):
+        '''쿼리스트링이 다르면 다른 ETag'''
+        self.assertNotEqual(
+            self.client.get(self.comment_url)["ETag"],
+            self.client.get(self.comment_url + "?page=2")["ETag"])
+
+
+"""변형 이미지 Test"""
+@override_settings(IMAGE_VARIANT_SYNC=True, MEDIA_ROOT=tempfile.mkdtemp())
+class ImageVariantTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+
+    def get_image(self, size=(2000, 1000)):
+        buffer = BytesIO()
+        Image.new("RGB", size, (255, 0, 0)).save(buffer, "png")
+        return SimpleUploadedFile("image.png", buffer.getvalue(), content_type="image/png")
+
+    def test_render_variants(self):
+        '''긴 변 기준으로 줄인 webp 생성'''
+        width, height, variants = render_variants(self.get_image(), {"thumbnail": 400}, 80)
+        self.assertEqual((width, height), (2000, 1000))
+        with Image.open(BytesIO(variants["thumbnail"])) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (400, 200))
+
+    def test_article_variants_after_commit(self):
+        '''게시글 작성 커밋 후 크기와 변형 이미지 저장'''
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="title", content="content", user=self.user, image=self.get_image())
+        article.refresh_from_db()
+        self.assertEqual((article.image_width, article.image_height), (2000, 1000))
+        self.assertTrue(article.image_thumbnail.name.endswith(".webp"))
+        self.assertNotEqual(article.image_thumbnail.name, article.image_webp.name)
+
+        data = ArticleListSerializer(article).data
+        self.assertEqual(data["image_thumbnail"], article.image_thumbnail.url)
+
+    def test_no_variants_without_upload(self):
+        '''이미지가 바뀌지 않은 저장은 다시 만들지 않음'''
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="title", content="content", user=self.user, image=self.get_image())
+        article.refresh_from_db()
+        thumbnail = article.image_thumbnail.name
+        with self.captureOnCommitCallbacks(execute=True):
+            article.title = "edited"
+            article.save()
+        article.refresh_from_db()
+        self.assertEqual(article.image_thumbnail.name, thumbnail)
+
+    def test_profile_img_variants(self):
+        '''프로필 이미지 변형'''
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_img = self.get_image((300, 300))
+            self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_img_width, 300)
+        self.assertTrue(self.user.profile_img_thumbnail.name.endswith(".webp"))
+
+
+"""요약 작업 큐 Test"""
+class FakeCompletionServer:
+    '''OpenAI Completion API 흉내 : statuses 순서대로 응답 코드를 돌려주고, 프롬프트 끝 5글자를 요약으로 돌려줌'''
+    def __init__(self):
+        self.statuses = []
+        self.prompts = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.prompts.append(body["prompt"])
+                code = server.statuses.pop(0) if server.statuses else 200
+                if code == 200:
+                    data = {"id": "cmpl", "object": "text_completion", "created": 0, "model": "fake",
+                            "choices": [{"text": f" 요약:{body['prompt'][-5:]}", "index": 0, "finish_reason": "stop"}]}
+                else:
+                    data = {"error": {"message": "server error", "type": "server_error"}}
+                payload = json.dumps(data).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@override_settings(TASK_EAGER=True, SUMMARY_RETRY_BASE_SECONDS=0, SUMMARY_MAX_ATTEMPTS=3, OPENAI_API_KEY="test")
+class SummaryJobTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+
+    def setUp(self):
+        self.server = FakeCompletionServer()
+        self.addCleanup(self.server.close)
+        settings = override_settings(OPENAI_API_BASE=self.server.url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_article(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="title", content=content, user=self.user)
+            enqueue_summary(article)
+        article.refresh_from_db()
+        return article
+
+    def test_summary_bound_to_article(self):
+        '''요약은 작업의 게시글에 저장 (가장 최근 글이 아님)'''
+        first = self.create_article("첫번째 게시글 하나")
+        second = self.create_article("두번째 게시글 둘")
+        self.assertEqual(first.summary, "요약:시글 하나")
+        self.assertEqual(second.summary, "요약:게시글 둘")
+        self.assertEqual(SummaryJob.objects.get(pk=first.pk).status, SummaryJob.DONE)
+        # 상세페이지 Last-Modified 갱신
+        self.assertIsNotNone(first.activity_at)
+
+    def test_retry_with_backoff(self):
+        '''실패하면 다시 시도'''
+        self.server.statuses = [500]
+        article = self.create_article("재시도 게시글")
+        job = SummaryJob.objects.get(pk=article.pk)
+        self.assertEqual((job.status, job.attempts), (SummaryJob.DONE, 2))
+        self.assertEqual(article.summary, "요약:도 게시글")
+
+    def test_failed_after_max_attempts(self):
+        '''최대 시도 횟수를 넘으면 실패 상태'''
+        self.server.statuses = [500, 500, 500]
+        article = self.create_article("실패 게시글")
+        self.assertIsNotNone(article.activity_at)
+        response = self.client.get(reverse('article_detail_view', kwargs={'article_id': article.id}))
+        self.assertEqual(response.data["summary_status"], SummaryJob.FAILED)
+        # LLM 이 실패해도 로컬 요약은 남아 있음
+        self.assertEqual(response.data["summary"], "실패 게시글")
+
+    def test_stale_result_discarded(self):
+        '''요약하는 사이 내용이 바뀌면 결과를 버림'''
+        article = Article.objects.create(title="title", content="예전 내용", user=self.user)
+        enqueue_summary(article)
+
+        def content_changed(content):
+            SummaryJob.objects.filter(pk=article.pk).update(version=F("version") + 1, status=SummaryJob.PENDING)
+            return "요약"
+
+        with mock.patch("article.summary.request_summary", side_effect=content_changed):
+            self.assertTrue(run_job(article.pk))
+        article.refresh_from_db()
+        self.assertEqual(article.summary, "예전 내용")
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).status, SummaryJob.PENDING)
+
+    @override_settings(SUMMARY_MAX_CONCURRENCY=1)
+    def test_concurrency_across_workers(self):
+        '''다른 워커에서 요약 중인 작업까지 합쳐 동시 요약 수 제한'''
+        running = Article.objects.create(title="title", content="다른 워커 내용", user=self.user)
+        article = Article.objects.create(title="title", content="대기 내용", user=self.user)
+        enqueue_summary(running)
+        enqueue_summary(article)
+        SummaryJob.objects.filter(pk=running.pk).update(status=SummaryJob.RUNNING, updated_at=timezone.now())
+
+        self.assertFalse(run_job(article.pk))
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).status, SummaryJob.PENDING)
+        # 멈춘 작업은 세지 않음
+        SummaryJob.objects.filter(pk=running.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertTrue(run_job(article.pk))
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).status, SummaryJob.DONE)
+
+    def test_patch_content_requeues(self):
+        '''내용을 수정하면 다시 요약'''
+        article = self.create_article("처음 게시글")
+        self.client.force_authenticate(user=self.user)
+        url = reverse('article_detail_view', kwargs={'article_id': article.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"title": "새 제목"})
+        self.assertEqual(len(self.server.prompts), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"content": "수정한 게시글"})
+        article.refresh_from_db()
+        self.assertEqual(article.summary, "요약:한 게시글")
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).version, 1)
+
+    def test_cache_hit_fills_summary(self):
+        '''같은 내용(공백 차이 무시)은 LLM 을 다시 부르지 않고 바로 채움'''
+        original = self.create_article("통신사 기사  원문")
+        article = Article.objects.create(title="title", content=" 통신사 기사\n원문 ", user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_summary(article)
+        self.assertEqual(Article.objects.get(pk=article.pk).summary, original.summary)
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).status, SummaryJob.DONE)
+        self.assertEqual(len(self.server.prompts), 1)
+        self.assertEqual(SummaryCache.objects.get().hit_count, 1)
+
+    @override_settings(SUMMARY_CACHE_MAX_ENTRIES=2)
+    def test_cache_eviction(self):
+        '''최대 개수를 넘으면 오래 안 쓴 요약부터 삭제'''
+        first = self.create_article("첫번째 내용")
+        self.create_article("두번째 내용")
+        SummaryCache.objects.update(last_used_at=timezone.now() - timedelta(minutes=1))
+        self.create_article("첫번째 내용")  # 첫번째는 다시 사용됨
+        self.create_article("세번째 내용")
+        self.assertEqual(SummaryCache.objects.count(), 2)
+        self.create_article("두번째 내용")
+        self.assertEqual(len(self.server.prompts), 4)
+        self.assertEqual(first.summary, "요약:번째 내용")
+
+    def test_local_summary_before_llm(self):
+        '''LLM 요약 전에 로컬 요약이 먼저 채워짐'''
+        article = Article.objects.create(title="title", content="첫 문장입니다. 둘째 문장입니다.", user=self.user)
+        enqueue_summary(article)
+        self.assertEqual(Article.objects.get(pk=article.pk).summary, "첫 문장입니다. 둘째 문장입니다.")
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).status, SummaryJob.PENDING)
+
+    @override_settings(SUMMARY_CATEGORY_ENGINES={"날씨": "textrank"})
+    def test_textrank_category(self):
+        '''textrank 카테고리는 LLM 을 부르지 않음'''
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="title", content="맑은 날씨. 내일은 비.", category="날씨", user=self.user)
+            enqueue_summary(article)
+        self.assertEqual(self.server.prompts, [])
+        self.assertEqual(SummaryJob.objects.get(pk=article.pk).status, SummaryJob.DONE)
+
+
+"""TextRank 요약 Test"""
+class TextRankTest(TestCase):
+    def test_split_sentences(self):
+        '''문장 나누기'''
+        self.assertEqual(split_sentences("첫 문장이다. 둘째 문장?\n셋째"), ["첫 문장이다.", "둘째 문장?", "셋째"])
+
+    def test_central_sentences(self):
+        '''다른 문장과 많이 겹치는 문장을 원래 순서대로 선택'''
+        text = (
+            "삼성전자가 새 반도체 공장을 짓는다. 오늘 점심은 김밥이었다. "
+            "반도체 공장 건설에는 10조원이 투입된다. 삼성전자는 반도체 공장에서 내년부터 생산한다."
+        )
+        self.assertEqual(
+            summarize(text, 2),
+            "삼성전자가 새 반도체 공장을 짓는다. 삼성전자는 반도체 공장에서 내년부터 생산한다.")
+
+    def test_short_text(self):
+        '''문장 수가 적으면 그대로'''
+        self.assertEqual(summarize("한 문장.", 3), "한 문장.")
+
@@ -0,0 +1,56 @@
+import re
+
+import numpy as np
+
+from article.search import tokenize
+
+
+SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+DAMPING = 0.85
+
+
+def split_sentences(text):
+    '''문장 단위로 나누기 (마침표/물음표/느낌표 뒤 공백, 줄바꿈 기준)'''
+    return [sentence.strip() for sentence in SENTENCE_RE.split(text or "") if len(sentence.strip()) > 1]
+
+
+def get_similarity(sentences):
+    '''문장별 글자 바이그램 빈도 벡터의 코사인 유사도 행렬'''
+    terms = [tokenize(sentence) for sentence in sentences]
+    vocabulary = {term: index for index, term in enumerate({term for words in terms for term in words})}
+    counts = np.zeros((len(sentences), max(len(vocabulary), 1)))
+    for row, words in enumerate(terms):
+        for term in words:
+            counts[row, vocabulary[term]] += 1
+
+    norms = np.linalg.norm(counts, axis=1, keepdims=True)
+    vectors = np.divide(counts, norms, out=np.zeros_like(counts), where=norms > 0)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+
+def rank_sentences(similarity, iterations=50, tolerance=1e-6):
+    '''유사도 그래프에서 PageRank 점수 계산'''
+    size = len(similarity)
+    totals = similarity.sum(axis=1, keepdims=True)
+    # 다른 문장과 겹치는 단어가 없는 문장은 모든 문장으로 균등하게 이동
+    transition = np.divide(similarity, totals, out=np.full_like(similarity, 1 / size), where=totals > 0)
+    scores = np.full(size, 1 / size)
+    for _ in range(iterations):
+        updated = (1 - DAMPING) / size + DAMPING * transition.T @ scores
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text, count=3):
+    '''TextRank 로 중요한 문장 count 개를 원래 순서대로 뽑아 요약'''
+    sentences = split_sentences(text)
+    if len(sentences) <= count:
+        return " ".join(sentences)
+    scores = rank_sentences(get_similarity(sentences))
+    # 점수가 같으면 앞 문장 우선
+    top = sorted(np.argsort(-scores, kind="stable")[:count])
+    return " ".join(sentences[index] for index in top)
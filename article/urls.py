@@ -16,6 +16,7 @@ urlpatterns = [
     path('scrap/<int:user_id>', views.ScrapListView.as_view(),name='scrap_view_article'),  # 북마크 한 게시글
     path('<int:article_id>/scrap/', views.ScrapView.as_view(),name='scrap_view'),  # 북마크 기능
     path("search/", views.ArticleSearchView.as_view(), name="article_search"), # 검색 기능
+    path("autocomplete/", views.ArticleAutocompleteView.as_view(), name="article_autocomplete"), # 제목 자동완성
     path("<int:article_id>/reaction/", views.ArticleReactionView.as_view(),name="article_reaction"),
     # 카테고리 url
     path("<str:category>/", views.ArticleView.as_view(), name="category_view"),
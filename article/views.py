@@ -1,8 +1,10 @@
+import hashlib
 from rest_framework.views import APIView
 from rest_framework.generics import get_object_or_404
+from django.http import Http404
 from rest_framework import status
 from rest_framework.response import Response
-from article.models import Article, Comment, CommentReaction, User
+from article.models import Article, Comment, CommentReaction, DailyBestArticle, User
 from article.serializers import (
     HomeSerializer,
     ArticleSerializer,
@@ -14,14 +16,21 @@ from article.serializers import (
 )
 
 from rest_framework import permissions
-from rest_framework import generics, filters
-from .summary import summary, SummaryThread
+from .summary import enqueue_summary
+from .pagination import CursorPagination
+from .cache import home_cache, invalidate_home_cache
+from .search import search_articles
+from .autocomplete import title_index
+from nuriggun.querybudget import query_budget
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 # ======== 메인페이지 관련 import =========
-from rest_framework.pagination import LimitOffsetPagination
-from django.db.models import Count
+from django.db.models import Case, F, When
+from django.db import transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 # ========= 메인페이지 view =========
-class HomePagination(LimitOffsetPagination):
+class HomePagination(CursorPagination):
     default_limit = 4
 
     def get_limit(self, request):
@@ -32,31 +41,48 @@ class HomePagination(LimitOffsetPagination):
             return 1
         else:
             return self.default_limit  
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get("order", None)
+        if ordering == "main":
+            return ("-comments_count", "-id")
+        elif ordering == "best":
+            return ("-reaction_total", "-article_id")
+        else:
+            return self.ordering
     
 class HomeView(APIView):
     '''홈-게시글'''
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = HomePagination
 
+    @home_cache
+    @query_budget(10)
     def get(self, request):
         ordering = request.query_params.get("order", None)
         if ordering == "sub":
-            articles = Article.objects.order_by("-created_at")
+            articles = Article.objects.all()
         elif ordering == "main":
-            articles = Article.objects.annotate(
-                comments_count=Count("comment")
-            ).order_by("-comments_count")
+            articles = Article.objects.all()
         elif ordering == "best":
-            today = timezone.localtime(timezone.now())
-            start = today.replace(hour=0, minute=0, second=0, microsecond=0) 
-            
-            articles = Article.objects.filter(created_at__gte=start).annotate(
-                reaction_count=Count("great") + Count("sad") + Count("good") + Count("angry") + Count("subsequent")
-            ).order_by("-reaction_count")
+            # 오늘 날짜 순위표를 인덱스 순서대로 조회
+            ranks = DailyBestArticle.objects.filter(
+                date=timezone.localdate()
+            ).select_related("article").prefetch_related(
+                *[f"article__{field}" for field in Article.REACTIONS], "article__scrap"
+            )
+
+            paginator = self.pagination_class()
+            paginated_ranks = paginator.paginate_queryset(ranks, request)
+
+            serializer = HomeSerializer([rank.article for rank in paginated_ranks], many=True)
+            return paginator.get_paginated_response(serializer.data)
 
         elif ordering is None:
             articles = Article.objects.all()
 
+        articles = articles.prefetch_related(*Article.REACTIONS, "scrap")
+
         paginator = self.pagination_class()
         paginated_articles = paginator.paginate_queryset(articles, request)
 
@@ -66,25 +92,30 @@ class HomeView(APIView):
 
 class ArticleView(APIView): 
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CursorPagination
 
+    @query_budget(3)
     def get(self, request, category=None):
         '''게시글 목록'''
         if category:
             articles = Article.objects.filter(category=category)
         else:
             articles = Article.objects.all()
+        articles = articles.select_related("user", "summary_job")
 
-        serializer = ArticleSerializer(articles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = self.pagination_class()
+        paginated_articles = paginator.paginate_queryset(articles, request)
+
+        serializer = ArticleSerializer(paginated_articles, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         '''게시글 작성'''
         serializer = ArticleCreateSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
-            content = serializer.validated_data["content"]
-            thread = SummaryThread(content)
-            thread.start()
+            with transaction.atomic():
+                article = serializer.save(user=request.user)
+                enqueue_summary(article)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -92,19 +123,54 @@ class ArticleView(APIView):
 class ArticleListView(APIView):
     '''게시글 리스트 보기'''
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]  
+    pagination_class = CursorPagination
     
+    @query_budget(3)
     def get(self, request, user_id):  
-        articles = Article.objects.filter(user_id=user_id).order_by('-created_at')
-        serializer = ArticleListSerializer(articles, many=True)
+        articles = Article.objects.filter(user_id=user_id).select_related("user")
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = self.pagination_class()
+        paginated_articles = paginator.paginate_queryset(articles, request)
+
+        serializer = ArticleListSerializer(paginated_articles, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
+# ========= 조건부 GET (ETag / Last-Modified) =========
+def get_article_state(request, article_id):
+    '''ETag, Last-Modified 계산용 게시글 상태 : 요청당 인덱스 조회 한 번'''
+    if not hasattr(request, "article_state"):
+        request.article_state = Article.objects.filter(id=article_id).values(
+            "updated_at", "change_count", "activity_at").first()
+    return request.article_state
+
+def article_etag(request, article_id, **kwargs):
+    state = get_article_state(request, article_id)
+    if state is None:
+        return None
+    return f"article-{article_id}-{state['updated_at'].timestamp()}-{state['change_count']}"
+
+def comment_list_etag(request, article_id, **kwargs):
+    etag = article_etag(request, article_id)
+    if etag is None:
+        return None
+    # 쿼리스트링이 다르면 다른 응답이므로 ETag 에 포함
+    query = hashlib.md5(request.META.get("QUERY_STRING", "").encode()).hexdigest()[:8]
+    return f"comments-{etag}-{query}"
+
+def article_last_modified(request, article_id, **kwargs):
+    state = get_article_state(request, article_id)
+    if state is None:
+        return None
+    return max(filter(None, (state["updated_at"], state["activity_at"])))
+
 class ArticleDetailView(APIView):
     '''게시글 상세페이지'''
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    @method_decorator(condition(etag_func=article_etag, last_modified_func=article_last_modified))
+    @query_budget(4)
     def get(self, request, article_id):
-        article = get_object_or_404(Article, id=article_id)
+        article = get_object_or_404(Article.objects.select_related("user", "summary_job"), id=article_id)
         serializer = ArticleSerializer(article)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -115,7 +181,12 @@ class ArticleDetailView(APIView):
                 article, data=request.data, partial=True
             )
             if serializer.is_valid():
-                serializer.save()
+                content = article.content
+                with transaction.atomic():
+                    article = serializer.save()
+                    # 내용이 바뀌면 요약 다시 하기
+                    if article.content != content:
+                        enqueue_summary(article)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -149,6 +220,8 @@ class ScrapView(APIView):
     
 class ScrapListView(APIView):
     '''게시글 스크랩 리스트'''
+    pagination_class = CursorPagination
+
     def post(self, request, article_id):
         '''게시글 스크랩하기'''
         article = get_object_or_404(Article, id=article_id)
@@ -159,62 +232,163 @@ class ScrapListView(APIView):
             article.scrap.add(request.user)
             return Response('스크랩', status=status.HTTP_200_OK)    
 
+    @query_budget(4)
     def get(self, request, user_id):
         '''스크랩 한 게시글 보기'''
         user = get_object_or_404(User, pk=user_id)
-        articles = Article.objects.filter(scrap=user)
-        serializer = ArticleListSerializer(articles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        articles = Article.objects.filter(scrap=user).select_related("user")
+
+        paginator = self.pagination_class()
+        paginated_articles = paginator.paginate_queryset(articles, request)
+
+        serializer = ArticleListSerializer(paginated_articles, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+def get_count_change(field, delta):
+    '''개수 컬럼 증감 : 개수가 채워지기 전의 반응을 취소해도 0 아래로 내려가지 않음'''
+    # MySQL unsigned 컬럼은 계산 중에 음수가 되어도 오류라서 Greatest 대신 조건식 사용
+    if delta > 0:
+        return F(field) + delta
+    return Case(When(**{f"{field}__gt": 0}, then=F(field) - 1), default=0)
 
 class ArticleReactionView(APIView):
     '''게시글 좋아요 5종 반응'''
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, article_id):
-        try:
-            article = get_object_or_404(Article, id=article_id)
-        except Article.DoesNotExist:
-            return Response({"error": "게시글이 없습니다."}, status=404)
-
         reaction = request.data.get('reaction')
 
-        if reaction in ['great', 'sad', 'angry', 'good', 'subsequent']:
+        with transaction.atomic():
+            # 같은 게시글에 대한 동시 반응은 게시글 행 잠금으로 순서대로 처리
+            article = get_object_or_404(Article.objects.select_for_update(), id=article_id)
+
+            if reaction not in Article.REACTIONS:
+                return Response({"error": "유효하지 않은 반응 타입입니다."}, status=status.HTTP_400_BAD_REQUEST)
+
             reaction_field = getattr(article, reaction) 
 
-            if request.user in reaction_field.all():
+            if reaction_field.filter(pk=request.user.pk).exists():
                 # 사용자가 이미 반응을 한 상태이므로 반응을 취소
                 reaction_field.remove(request.user)
-                return Response({"message": "반응을 취소했습니다."}, status=status.HTTP_200_OK)
+                delta = -1
             else:
                 # 사용자가 반응을 하지 않은 상태이므로 반응을 추가
                 reaction_field.add(request.user)
-                return Response({"message": "반응을 눌렀습니다."}, status=status.HTTP_201_CREATED)
+                delta = 1
+
+            # M2M 변경과 같은 트랜잭션에서 반응 개수 컬럼 갱신
+            Article.objects.filter(pk=article.pk).update(**{
+                f"{reaction}_count": get_count_change(f"{reaction}_count", delta),
+                "reaction_total": get_count_change("reaction_total", delta),
+                "change_count": F("change_count") + 1,
+                "activity_at": timezone.now(),
+            })
+
+            # 오늘의 HOT뉴스 순위표도 함께 갱신
+            date = timezone.localdate(article.created_at)
+            updated = DailyBestArticle.objects.filter(date=date, article=article).update(
+                reaction_total=get_count_change("reaction_total", delta))
+            if not updated:
+                DailyBestArticle.objects.create(
+                    date=date,
+                    article=article,
+                    reaction_total=Article.objects.values_list("reaction_total", flat=True).get(pk=article.pk),
+                )
+
+            invalidate_home_cache()
+
+        # 잠근 행에서 읽은 값 기준 절대값 + 버전으로 반영 (다시 적용되어도 두 번 더해지지 않음)
+        title_index.set_score(
+            article.pk,
+            max(article.reaction_total + delta, 0),
+            article.change_count + 1,
+        )
+
+        if delta < 0:
+            return Response({"message": "반응을 취소했습니다."}, status=status.HTTP_200_OK)
         else:
-            return Response({"error": "유효하지 않은 반응 타입입니다."}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"message": "반응을 눌렀습니다."}, status=status.HTTP_201_CREATED)
+
+class ArticleSearchView(APIView):
+    '''검색 기능 : 바이그램 역색인 + BM25 순위'''
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get("search", "")
+        category = request.query_params.get("category")
+
+        try:
+            start_date = self.get_date(request, "start_date")
+            end_date = self.get_date(request, "end_date")
+            limit = max(1, min(int(request.query_params.get("limit", self.default_limit)), self.max_limit))
+        except ValueError:
+            return Response({"error": "검색 조건이 올바르지 않습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        article_ids = search_articles(
+            query, category=category, start_date=start_date, end_date=end_date, limit=limit)
+        articles = Article.objects.in_bulk(article_ids)
+
+        serializer = ArticleSearchSerializer(
+            [articles[pk] for pk in article_ids if pk in articles], many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def get_date(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(name)
+        return date
+
+class ArticleAutocompleteView(APIView):
+    '''제목 자동완성 : 메모리의 정렬된 제목 목록에서 접두어 검색'''
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+
+        suggestions = title_index.suggest(query, limit)
+        return Response(suggestions, status=status.HTTP_200_OK)
 
-class ArticleSearchView(generics.ListCreateAPIView):
-    '''검색 기능'''
-    search_fields = ["title", "content","id",]
-    filter_backends = (filters.SearchFilter,)
-    queryset = Article.objects.all()
-    serializer_class = ArticleSearchSerializer
+class CommentPagination(CursorPagination):
+    ordering = ("-comment_created_at", "-id")
 
 class CommentView(APIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CommentPagination
 
+    @method_decorator(condition(etag_func=comment_list_etag, last_modified_func=article_last_modified))
+    @query_budget(2)
     def get(self, request, article_id):
-        '''댓글 보기'''
-        article = get_object_or_404(Article, id=article_id)
-        comments = article.comment.all()
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        '''댓글 보기 : (comment_created_at, id) 커서로 최신순 페이지 조회'''
+        # 게시글 존재 여부는 ETag 계산 때 조회한 상태로 확인
+        if get_article_state(request, article_id) is None:
+            raise Http404
+        comments = Comment.objects.filter(article_id=article_id).select_related("user").only(
+            *Comment.LIST_FIELDS, "user__id", "user__nickname", "user__profile_img")
+
+        paginator = self.pagination_class()
+        paginated_comments = paginator.paginate_queryset(comments, request)
+
+        serializer = CommentSerializer(paginated_comments, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     def post(self, request, article_id):
         '''댓글 작성'''
         serializer = CommentCreateSerializer(data=request.data)
         if serializer.is_valid():
             request.user.save()
-            serializer.save(user=request.user, article_id=article_id)
+            with transaction.atomic():
+                # 댓글 저장과 게시글 댓글 수 증가를 함께 커밋
+                serializer.save(user=request.user, article_id=article_id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -237,7 +411,8 @@ class CommentView(APIView):
         '''댓글 삭제'''
         comment = get_object_or_404(Comment, id=comment_id)
         if request.user == comment.user:
-            comment.delete()
+            with transaction.atomic():
+                comment.delete()
             return Response({"message": "댓글을 삭제하였습니다."}, status=status.HTTP_200_OK)
         else:
             return Response(
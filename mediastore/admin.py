@@ -0,0 +1,4 @@
+from django.contrib import admin
+from mediastore.models import MediaBlob
+
+admin.site.register(MediaBlob)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MediastoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mediastore'
+
+    def ready(self):
+        from mediastore.signals import connect_media_signals
+        connect_media_signals()
@@ -0,0 +1,8 @@
+from django.core.management import call_command
+
+from scheduler.registry import register
+
+
+@register("mediastore.collect_media", hour=5, minute=0)
+def collect_media():
+    call_command("collect_media")
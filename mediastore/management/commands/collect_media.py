@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from mediastore.models import MediaBlob
+
+
+class Command(BaseCommand):
+    help = "참조 수가 0 인 채로 유예 시간이 지난 미디어 파일을 삭제합니다."
+
+    def handle(self, *args, **options):
+        deadline = timezone.now() - timedelta(seconds=settings.MEDIA_BLOB_GRACE_SECONDS)
+        count = 0
+        names = MediaBlob.objects.filter(ref_count=0, released_at__lt=deadline).values_list("name", flat=True)
+        for name in names.iterator():
+            with transaction.atomic():
+                # 그 사이 다시 참조된 파일은 건너뜀
+                blob = MediaBlob.objects.select_for_update().filter(name=name, ref_count=0).first()
+                if blob is None:
+                    continue
+                default_storage.delete_blob(name)
+                blob.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"미디어 파일 {count}개를 삭제했습니다."))
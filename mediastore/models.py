@@ -0,0 +1,47 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class MediaBlob(models.Model):
+    '''내용 해시 경로로 한 번만 저장된 미디어 파일과 참조 수'''
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def lock(cls, name, digest, size):
+        '''행 잠금 (없으면 참조 수 0 으로 생성) : 트랜잭션 안에서 호출
+
+        collect_media 와 같은 행을 잠그므로, 잠금을 잡은 동안에는 파일이 지워지지 않음.
+        '''
+        blob = cls.objects.select_for_update().filter(name=name).first()
+        if blob is not None:
+            return blob
+        try:
+            with transaction.atomic():
+                return cls.objects.create(name=name, digest=digest, size=size)
+        except IntegrityError:
+            # 같은 파일이 동시에 올라온 경우
+            return cls.objects.select_for_update().get(name=name)
+
+    @classmethod
+    def acquire(cls, name, digest, size, write=None):
+        '''참조 수 증가 : write 가 있으면 같은 잠금 안에서 호출해 파일이 있는지 확인/기록'''
+        with transaction.atomic():
+            blob = cls.lock(name, digest, size)
+            if write is not None:
+                write()
+            cls.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+
+    @classmethod
+    def release(cls, name):
+        '''참조 수 감소 : 0 이 된 파일은 collect_media 명령이 유예 시간 후 삭제'''
+        cls.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1, released_at=timezone.now())
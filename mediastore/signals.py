@@ -0,0 +1,69 @@
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+from mediastore.storage import ContentAddressedStorage
+
+
+def get_blob_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def release_on_commit(storage, names):
+    for name in names:
+        transaction.on_commit(lambda name=name: storage.delete(name))
+
+
+def media_names_remember(sender, instance, **kwargs):
+    '''불러온 시점의 파일 이름 기억 (지연 로딩된 필드는 제외)'''
+    instance._media_names = {
+        field.attname: getattr(instance.__dict__[field.attname], "name", instance.__dict__[field.attname])
+        for field in sender._media_fields if field.attname in instance.__dict__
+    }
+
+
+def media_uploads_mark(sender, instance, **kwargs):
+    '''이번 저장에서 새로 올라가는 파일 필드 표시'''
+    instance._media_uploads = {
+        field.attname for field in sender._media_fields
+        if getattr(instance, field.attname) and not getattr(instance, field.attname)._committed
+    }
+
+
+def media_replaced_release(sender, instance, created, **kwargs):
+    '''파일이 바뀌었으면 예전 파일의 참조 수 감소'''
+    remembered = getattr(instance, "_media_names", {})
+    uploads = getattr(instance, "_media_uploads", set())
+    for field in sender._media_fields:
+        old = remembered.get(field.attname)
+        new = getattr(instance, field.attname).name
+        # 같은 내용을 다시 올린 경우에도 저장하면서 참조 수가 늘었으므로 하나 줄임
+        if not created and ContentAddressedStorage.is_blob(old) and (old != new or field.attname in uploads):
+            release_on_commit(field.storage, [old])
+        remembered[field.attname] = new
+    instance._media_names = remembered
+    instance._media_uploads = set()
+
+
+def media_deleted_release(sender, instance, **kwargs):
+    '''삭제된 행이 참조하던 파일의 참조 수 감소'''
+    for field in sender._media_fields:
+        name = getattr(instance, field.attname).name
+        if ContentAddressedStorage.is_blob(name):
+            release_on_commit(field.storage, [name])
+
+
+def connect_media_signals():
+    '''내용 주소 스토리지를 쓰는 FileField 가 있는 모든 모델에 참조 수 시그널 연결'''
+    for model in apps.get_models():
+        fields = get_blob_fields(model)
+        if not fields:
+            continue
+        model._media_fields = fields
+        post_init.connect(media_names_remember, sender=model, weak=False)
+        pre_save.connect(media_uploads_mark, sender=model, weak=False)
+        post_save.connect(media_replaced_release, sender=model, weak=False)
+        post_delete.connect(media_deleted_release, sender=model, weak=False)
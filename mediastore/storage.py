@@ -0,0 +1,71 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    '''업로드를 디스크에 쓰면서 sha256 을 계산해 cas/<해시> 경로에 한 번만 저장하는 스토리지
+
+    저장할 때마다 MediaBlob 참조 수가 1 늘고, delete() 는 파일을 지우는 대신 참조 수를 줄임.
+    '''
+    prefix = "cas/"
+
+    @classmethod
+    def is_blob(cls, name):
+        return bool(name) and name.startswith(cls.prefix)
+
+    def get_blob_name(self, digest, ext):
+        return f"{self.prefix}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def get_available_name(self, name, max_length=None):
+        # 실제 경로는 내용 해시로 정해지므로 이름 충돌을 피할 필요가 없음
+        return name
+
+    def _save(self, name, content):
+        from mediastore.models import MediaBlob
+
+        ext = os.path.splitext(name)[1].lower()
+        os.makedirs(self.location, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.location, prefix=".upload-")
+        try:
+            digest = hashlib.sha256()
+            size = 0
+            with os.fdopen(fd, "wb") as temp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+                    size += len(chunk)
+
+            digest = digest.hexdigest()
+            name = self.get_blob_name(digest, ext)
+            path = self.path(name)
+
+            def write():
+                if os.path.exists(path):
+                    # 이미 같은 내용이 저장되어 있음
+                    os.remove(temp_path)
+                else:
+                    # 처음 저장하거나, collect_media 가 지운 파일이면 다시 기록
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                    os.replace(temp_path, path)
+
+            MediaBlob.acquire(name, digest, size, write)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def delete(self, name):
+        if self.is_blob(name):
+            from mediastore.models import MediaBlob
+            MediaBlob.release(name)
+        else:
+            super().delete(name)
+
+    def delete_blob(self, name):
+        '''참조가 없는 파일 실제 삭제 (collect_media 명령에서 사용)'''
+        super().delete(name)
@@ -0,0 +1,112 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from article.models import Article
+from mediastore.models import MediaBlob
+from user.models import User
+
+
+# 변형 이미지는 프로세스 풀 없이 바로 생성
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_VARIANT_SYNC=True)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('1@1.111','1234')
+
+    def get_file(self, color=(255, 0, 0)):
+        '''색이 같으면 내용도 같은 jpeg'''
+        buffer = BytesIO()
+        Image.new("RGB", (40, 20), color).save(buffer, "jpeg")
+        return SimpleUploadedFile("Photo.JPG", buffer.getvalue(), content_type="image/jpeg")
+
+    def test_same_content_stored_once(self):
+        '''같은 내용은 같은 경로에 한 번만 저장, 참조 수 증가'''
+        first = default_storage.save("a.jpg", self.get_file())
+        second = default_storage.save("b.jpg", self.get_file())
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("cas/") and first.endswith(".jpg"))
+        self.assertEqual(MediaBlob.objects.get(name=first).ref_count, 2)
+        self.assertEqual(len(os.listdir(os.path.dirname(default_storage.path(first)))), 1)
+
+    def test_delete_releases_reference(self):
+        '''게시글 삭제 시 커밋 후 참조 수 감소'''
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="title", content="content", user=self.user, image=self.get_file())
+        name = article.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            article.delete()
+        blob = MediaBlob.objects.get(name=name)
+        self.assertEqual(blob.ref_count, 0)
+        self.assertTrue(default_storage.exists(name))
+
+    def test_replace_releases_old_file(self):
+        '''프로필 이미지를 바꾸면 예전 파일 참조 수 감소'''
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_img = self.get_file((0, 0, 255))
+            self.user.save()
+        old = self.user.profile_img.name
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_img = self.get_file((0, 255, 0))
+            self.user.save()
+        self.assertEqual(MediaBlob.objects.get(name=old).ref_count, 0)
+        self.assertEqual(MediaBlob.objects.get(name=self.user.profile_img.name).ref_count, 1)
+
+    @override_settings(DEBUG=True)
+    def test_immutable_cache_header(self):
+        '''내용 해시 경로 파일은 immutable 캐시'''
+        name = default_storage.save("a.jpg", self.get_file())
+        response = self.client.get(f"/media/{name}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_media_not_served_without_debug(self):
+        '''DEBUG 가 아니면 미디어 파일은 웹 서버가 제공'''
+        name = default_storage.save("a.jpg", self.get_file())
+        self.assertEqual(self.client.get(f"/media/{name}").status_code, 404)
+
+    def test_missing_file_rewritten(self):
+        '''참조 행은 있는데 파일이 지워진 경우 다시 기록'''
+        name = default_storage.save("a.jpg", self.get_file())
+        default_storage.delete_blob(name)
+        self.assertEqual(default_storage.save("b.jpg", self.get_file()), name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).ref_count, 2)
+
+    def test_collect_media(self):
+        '''참조 수 0 이고 유예 시간이 지난 파일만 삭제'''
+        name = default_storage.save("a.jpg", self.get_file())
+        default_storage.delete(name)
+        call_command("collect_media", stdout=StringIO())
+        self.assertTrue(default_storage.exists(name))
+
+        MediaBlob.objects.filter(name=name).update(released_at=timezone.now() - timedelta(days=2))
+        call_command("collect_media", stdout=StringIO())
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_stale_save_keeps_variants(self):
+        '''변형 이미지가 기록되기 전의 인스턴스를 다시 저장해도 변형 이미지 컬럼과 참조 수 유지'''
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_img = self.get_file((0, 0, 255))
+            self.user.save()
+        # 변형 이미지는 커밋 후 update 로 기록되어 메모리의 인스턴스에는 없음
+        self.assertFalse(self.user.profile_img_thumbnail)
+        thumbnail = User.objects.get(pk=self.user.pk).profile_img_thumbnail.name
+        self.assertTrue(thumbnail)
+        ref_count = MediaBlob.objects.get(name=thumbnail).ref_count
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.nickname = "stale"
+            self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_img_thumbnail.name, thumbnail)
+        self.assertEqual(MediaBlob.objects.get(name=thumbnail).ref_count, ref_count)
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.http import Http404
+from django.views.static import serve
+
+from mediastore.storage import ContentAddressedStorage
+
+
+def serve_media(request, path):
+    '''개발 서버용 미디어 파일 제공 : 내용 해시 경로의 파일은 내용이 바뀌지 않으므로 immutable 로 캐시
+
+    static() 과 같이 DEBUG 일 때만 제공. 운영에서는 웹 서버(nginx)가 MEDIA_ROOT 를 직접 제공.
+    '''
+    if not settings.DEBUG:
+        raise Http404
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if ContentAddressedStorage.is_blob(path):
+        response["Cache-Control"] = f"public, max-age={settings.MEDIA_BLOB_MAX_AGE}, immutable"
+    return response
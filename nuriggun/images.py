@@ -0,0 +1,141 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def render_variants(source, sizes, quality):
+    '''(프로세스 풀에서 실행) 원본 이미지 -> (가로, 세로, {변형 이름: webp bytes})'''
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        variants = {}
+        for name, size in sizes.items():
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.LANCZOS)
+            buffer = BytesIO()
+            variant.save(buffer, "WEBP", quality=quality, method=4)
+            variants[name] = buffer.getvalue()
+    return width, height, variants
+
+
+def get_executor():
+    '''이미지 변환용 프로세스 풀 (처음 쓸 때 생성)'''
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_executor():
+    '''대기 중인 변환 작업과 콜백이 끝날 때까지 기다린 뒤 풀 종료'''
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def get_variant_fields(field_name):
+    '''원본 필드 이름 -> 가로/세로, 변형 이미지 필드 이름'''
+    return {
+        "width": f"{field_name}_width",
+        "height": f"{field_name}_height",
+        **{name: f"{field_name}_{name}" for name in settings.IMAGE_VARIANT_SIZES},
+    }
+
+
+def mark_image_upload(instance, field_name):
+    '''pre_save 에서 호출 : 새로 올라온 파일이면 저장 후 변형 이미지를 만들도록 표시'''
+    image = getattr(instance, field_name)
+    if image and not image._committed:
+        instance._image_uploads = getattr(instance, "_image_uploads", set()) | {field_name}
+
+
+def keep_image_variants(instance, field_name, update_fields=None):
+    '''pre_save 에서 호출 : 이미 있는 행을 통째로 저장하면 변형 이미지 컬럼은 DB 값을 그대로 씀
+
+    변형 이미지는 커밋 후 update 로 기록되므로, 그 전에 불러온 인스턴스를 저장하면 예전 값으로 덮어써서
+    새 변형 파일의 참조가 남고 이미 참조를 줄인 파일을 다시 가리키게 됨.
+    '''
+    if instance._state.adding or instance.pk is None or update_fields is not None:
+        return
+    fields = list(get_variant_fields(field_name).values())
+    current = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+    if current is None:
+        return
+    remembered = getattr(instance, "_media_names", None)
+    for field, value in current.items():
+        setattr(instance, field, value)
+        # DB 값 그대로라 mediastore 시그널이 참조 수를 바꾸지 않도록 불러온 이름도 맞춤
+        if remembered is not None and field in remembered:
+            remembered[field] = value
+
+
+def schedule_image_variants(instance, field_name):
+    '''post_save 에서 호출 : 새로 올라온 파일이면 커밋 후 변형 이미지 생성'''
+    uploads = getattr(instance, "_image_uploads", set())
+    if field_name not in uploads:
+        return
+    uploads.discard(field_name)
+    model, pk, name = type(instance), instance.pk, getattr(instance, field_name).name
+    transaction.on_commit(lambda: submit_image_variants(model, pk, field_name, name))
+
+
+def submit_image_variants(model, pk, field_name, name):
+    storage = model._meta.get_field(field_name).storage
+    args = (storage.path(name), settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_QUALITY)
+    if settings.IMAGE_VARIANT_SYNC:
+        save_image_variants(model, pk, field_name, name, render_variants(*args))
+        return
+    future = get_executor().submit(render_variants, *args)
+    future.add_done_callback(partial(on_variants_done, model, pk, field_name, name))
+
+
+def on_variants_done(model, pk, field_name, name, future):
+    '''프로세스 풀 결과 콜백 (풀 관리 스레드에서 실행)'''
+    try:
+        save_image_variants(model, pk, field_name, name, future.result())
+    except Exception:
+        logger.exception("변형 이미지 생성 실패 %s %s %s", model.__name__, pk, name)
+    finally:
+        connections.close_all()
+
+
+def save_image_variants(model, pk, field_name, name, result):
+    '''변형 이미지 파일 저장 후 크기와 파일 이름을 DB 에 기록'''
+    width, height, variants = result
+    storage = model._meta.get_field(field_name).storage
+    fields = get_variant_fields(field_name)
+    stem = os.path.splitext(name)[0]
+
+    previous = model.objects.filter(pk=pk).values(*(fields[variant] for variant in variants)).first() or {}
+    values = {fields["width"]: width, fields["height"]: height}
+    for variant, data in variants.items():
+        values[fields[variant]] = storage.save(f"{stem}.{variant}.webp", ContentFile(data))
+
+    # 그 사이 이미지가 다시 바뀌었으면 결과를 버림 (save 대신 update 라서 시그널도 타지 않음)
+    if not model.objects.filter(pk=pk, **{field_name: name}).update(**values):
+        previous = {fields[variant]: values[fields[variant]] for variant in variants}
+    for old in previous.values():
+        if old:
+            storage.delete(old)
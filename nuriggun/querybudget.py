@@ -0,0 +1,82 @@
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+def get_query_shape(sql):
+    '''파라미터만 다른 쿼리를 같은 모양으로 묶기 위해 값 자리를 ? 로 바꿈'''
+    sql = IN_LIST_RE.sub("IN (?)", sql)
+    sql = STRING_RE.sub("?", sql)
+    return NUMBER_RE.sub("?", sql)
+
+
+def get_repeated_queries(queries, threshold=None):
+    '''같은 모양으로 threshold 번 이상 반복된 쿼리 (N+1 의심)'''
+    if threshold is None:
+        threshold = settings.QUERY_REPEAT_THRESHOLD
+    shapes = Counter(get_query_shape(sql) for sql in queries)
+    return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+def query_budget(limit):
+    '''뷰 클래스나 메소드에 요청당 최대 쿼리 수를 선언하는 데코레이터'''
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def get_view_budget(view_func, method):
+    view_class = getattr(view_func, "view_class", None)
+    if view_class is None:
+        return getattr(view_func, "query_budget", None)
+    handler = getattr(view_class, method.lower(), None)
+    return getattr(handler, "query_budget", getattr(view_class, "query_budget", None))
+
+
+class QueryRecorder:
+    '''execute_wrapper 로 실행되는 SQL 기록'''
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    '''요청마다 SQL 을 기록해서 쿼리 예산 초과와 반복 쿼리(N+1)를 경고'''
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        count = len(recorder.queries)
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and count > budget:
+            logger.warning("쿼리 예산 초과 %s %s : %d > %d", request.method, request.path, count, budget)
+        for shape, repeat in get_repeated_queries(recorder.queries):
+            logger.warning("반복 쿼리 의심(N+1) %s %s : %d회 %s", request.method, request.path, repeat, shape)
+
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(count)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_view_budget(view_func, request.method)
@@ -36,6 +36,8 @@ INSTALLED_APPS = [
     'user',
     'article',
     'weather',
+    'mediastore',
+    'scheduler',
     'allauth',
     'allauth.account',
     'allauth.socialaccount',
@@ -60,8 +62,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'nuriggun.querybudget.QueryBudgetMiddleware',
 ]
 
+# 같은 모양의 쿼리가 이 횟수 이상 반복되면 N+1 로 경고
+QUERY_REPEAT_THRESHOLD = 5
+
 ROOT_URLCONF = 'nuriggun.urls'
 
 TEMPLATES = [
@@ -86,6 +92,30 @@ WSGI_APPLICATION = 'nuriggun.wsgi.application'
 
 DATABASES = my_settings.DATABASES
 
+# 메인페이지 응답 캐시 (LocMemCache / FileBasedCache 등 장고 캐시 백엔드 사용)
+# shared : 웹 워커와 run_scheduler 프로세스가 함께 보는 캐시 (manage.py createcachetable 로 테이블 생성)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'nuriggun_cache',
+    },
+}
+HOME_CACHE_ALIAS = 'default'
+HOME_CACHE_TIMEOUT = 60  # 초
+# 캐시 세대 번호는 모든 워커가 같이 보도록 공용 캐시에 저장, 워커는 이 간격마다 다시 확인
+HOME_GENERATION_CACHE_ALIAS = 'shared'
+HOME_GENERATION_CHECK_SECONDS = 2
+
+# 제목 자동완성 목록을 다시 만드는 주기 (다른 워커의 변경 반영)
+AUTOCOMPLETE_REFRESH_SECONDS = 600
+# 접두어별로 캐시하는 반응 수 상위 게시글 수 (자동완성 최대 개수)
+AUTOCOMPLETE_TOP_K = 20
+# 한 글자 검색어를 바이그램으로 넓힐 때 함께 찾는 최대 바이그램 수
+SEARCH_PREFIX_TERMS = 20
+
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -118,6 +148,20 @@ STATIC_URL = 'static/'
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
 
+# 업로드 파일은 내용 해시 경로에 한 번만 저장 (mediastore)
+STORAGES = {
+    "default": {"BACKEND": "mediastore.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_BLOB_MAX_AGE = 60 * 60 * 24 * 365     # 내용 해시 경로 파일의 브라우저 캐시 기간
+MEDIA_BLOB_GRACE_SECONDS = 60 * 60 * 24     # 참조 수 0 이 된 뒤 실제 삭제까지 유예 시간
+
+# 업로드 이미지의 변형(webp) 크기 : 긴 변 기준 px, 이름은 모델의 <필드>_<이름> 필드와 맞춤
+IMAGE_VARIANT_SIZES = {"thumbnail": 400, "webp": 1280}
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_VARIANT_SYNC = False  # True 면 프로세스 풀 없이 바로 생성 (테스트용)
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -210,10 +254,62 @@ EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER") # 발신할 이메일
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD") # 발신할 메일의 비밀번호
 EMAIL_USE_TLS = True # TLS 보안 방법
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+EMAIL_BATCH_SIZE = 100 # 새 글 알림 메일을 SMTP 연결 하나로 한 번에 보내는 개수
+DIGEST_MAX_ARTICLES = 50 # 모아보내기 메일 한 통에 싣는 최대 게시글 수
 
 
 #소셜 로그인 관련
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',    
     'allauth.account.auth_backends.AuthenticationBackend',
-]
\ No newline at end of file
+]
+
+# 게시글 요약 (OpenAI)
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "https://api.openai.com/v1")
+SUMMARY_ENGINE = "text-davinci-003"
+# 카테고리별 요약 엔진 : "llm" (TextRank 요약을 바로 채우고 LLM 요약으로 교체) / "textrank" (로컬 요약만)
+SUMMARY_DEFAULT_ENGINE = "llm"
+SUMMARY_CATEGORY_ENGINES = {}        # 예) {"날씨": "textrank"}
+SUMMARY_TEXTRANK_SENTENCES = 3
+SUMMARY_TIMEOUT = 60                 # 요청 하나의 제한 시간(초)
+SUMMARY_WORKERS = 4                  # 동시에 실행하는 요약 작업 수 (공용 작업 실행기 안에서)
+SUMMARY_MAX_CONCURRENCY = 2          # 모든 워커를 합쳐 동시에 요약하는(OpenAI 로 보내는) 작업 수
+SUMMARY_MAX_ATTEMPTS = 5
+SUMMARY_RETRY_BASE_SECONDS = 10      # 재시도 대기 : 10, 20, 40 ... 초
+SUMMARY_RETRY_MAX_SECONDS = 600
+SUMMARY_POLL_SECONDS = 5             # 재시도/재시작 후 남은 작업 확인 주기
+SUMMARY_STALE_SECONDS = 300          # 요약 중인 채로 이 시간이 지나면 다시 실행
+SUMMARY_CACHE_MAX_ENTRIES = 10000    # 내용 해시별 요약 캐시 최대 개수
+
+
+# 백그라운드 작업 실행기 (nuriggun.tasks)
+TASK_WORKERS = 8                     # 작업 스레드 수
+TASK_QUEUE_SIZE = 100                # 실행 대기 작업 수 제한
+TASK_SUBMIT_TIMEOUT = 5              # 대기열이 가득 찼을 때 기다리는 시간(초), 넘으면 요청 스레드에서 실행
+TASK_EAGER = False                   # True 면 등록 즉시 그 자리에서 실행 (테스트용)
+
+
+# 기상청 초단기실황 수집 (weather.collector)
+WEATHER_API_URL = "https://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getUltraSrtNcst"
+WEATHER_API_KEY = os.environ.get("WEATHER_API_KEY")
+WEATHER_VERIFY_SSL = False           # 기존 requests.get(verify=False) 와 동일
+WEATHER_TIMEOUT = 10                 # 요청 하나의 제한 시간(초)
+WEATHER_CONCURRENCY = 8              # 동시에 보내는 요청 수
+WEATHER_MAX_RETRIES = 3
+WEATHER_RETRY_BASE_SECONDS = 1       # 재시도 대기 : 1, 2, 4 ... 초 (지터 포함)
+WEATHER_FORECAST_URL = "https://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getVilageFcst"
+WEATHER_FORECAST_ROWS = 1500         # 단기예보 발표분 하나의 항목 수 (3일치 약 1000개)
+WEATHER_SNAPSHOT_CACHE_ALIAS = 'shared'   # 지역별 최신 날씨 스냅샷 (weather.snapshot), 수집은 run_scheduler 프로세스에서 함
+WEATHER_SNAPSHOT_TIMEOUT = 30 * 60        # 초, 수집 주기(2시간)보다 짧게 : 갱신이 빠져도 오래된 날씨를 계속 주지 않음
+WEATHER_GRID_BUCKET_SIZE = 16        # 최근접 지역 색인 구역 크기 (격자 수, 1격자 = 5km)
+WEATHER_GRID_INDEX_REFRESH_SECONDS = 600  # 다른 워커의 지역 변경 반영 주기
+WEATHER_NEARBY_MAX_KM = 50           # 이보다 멀면 근처 지역 없음
+WEATHER_RETENTION_CHUNK_SIZE = 1000  # 원본/요약 삭제를 나눠서 하는 단위 (weather.retention)
+WEATHER_HOURLY_RETENTION_DAYS = 90   # 시간별 요약 보관 기간, 일별 요약은 계속 보관
+
+
+# 주기 작업 (scheduler 앱, run_scheduler 명령으로 실행)
+SCHEDULER_POLL_SECONDS = 30          # 다음 작업 확인 최대 간격(초)
+SCHEDULER_LEASE_SECONDS = 5 * 60     # 작업 실행 권한 유지 시간(초), 실행 중에는 1/3 마다 연장하고 노드가 멈추면 이 시간 뒤 다른 노드가 가져감
+SCHEDULER_HISTORY_DAYS = 30          # 실행 기록 보관 기간
@@ -0,0 +1,103 @@
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class TaskExecutor:
+    '''프로세스 공용 백그라운드 작업 실행기 : 크기가 정해진 스레드 풀 + 대기열
+
+    대기열이 가득 차면 TASK_SUBMIT_TIMEOUT 초까지 기다리고, 그래도 자리가 없으면
+    요청한 스레드에서 바로 실행 (작업을 버리지 않고 생산자 쪽 속도를 늦춤).
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pool = None
+        self.slots = None
+        self.counters = {"submitted": 0, "completed": 0, "failed": 0, "caller_runs": 0, "running": 0}
+        self.total_seconds = 0.0
+
+    def start(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=settings.TASK_WORKERS, thread_name_prefix="task")
+                # 실행 중 + 대기 중인 작업 수 제한
+                self.slots = threading.BoundedSemaphore(settings.TASK_WORKERS + settings.TASK_QUEUE_SIZE)
+            return self.pool
+
+    def count(self, name, delta=1):
+        with self.lock:
+            self.counters[name] += delta
+
+    def submit(self, func, *args, **kwargs):
+        '''작업 등록 : 테스트용 동기 모드(TASK_EAGER)에서는 바로 실행'''
+        self.count("submitted")
+        if settings.TASK_EAGER:
+            self.run(func, args, kwargs)
+            return
+        pool = self.start()
+        if not self.slots.acquire(timeout=settings.TASK_SUBMIT_TIMEOUT):
+            logger.warning("작업 대기열이 가득 차서 요청 스레드에서 실행 : %s", getattr(func, "__qualname__", func))
+            self.count("caller_runs")
+            self.run(func, args, kwargs)
+            return
+        try:
+            pool.submit(self.run_slot, func, args, kwargs)
+        except RuntimeError:
+            # 종료 중이면 요청 스레드에서 실행
+            self.slots.release()
+            self.run(func, args, kwargs)
+
+    def submit_on_commit(self, func, *args, **kwargs):
+        '''현재 트랜잭션이 커밋된 뒤 작업 등록 (롤백되면 실행하지 않음)'''
+        transaction.on_commit(lambda: self.submit(func, *args, **kwargs))
+
+    def run_slot(self, func, args, kwargs):
+        try:
+            self.run(func, args, kwargs)
+        finally:
+            self.slots.release()
+            # 풀 스레드의 DB 연결은 작업마다 정리
+            connections.close_all()
+
+    def run(self, func, args, kwargs):
+        self.count("running")
+        started = time.monotonic()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            self.count("failed")
+            logger.exception("백그라운드 작업 실패 : %s", getattr(func, "__qualname__", func))
+        else:
+            self.count("completed")
+        finally:
+            with self.lock:
+                self.counters["running"] -= 1
+                self.total_seconds += time.monotonic() - started
+
+    def metrics(self):
+        '''작업 수, 실패 수, 대기 중인 작업 수, 평균 실행 시간'''
+        with self.lock:
+            metrics = dict(self.counters)
+            finished = metrics["completed"] + metrics["failed"]
+            metrics["average_seconds"] = self.total_seconds / finished if finished else 0.0
+        metrics["queued"] = self.pool._work_queue.qsize() if self.pool is not None else 0
+        return metrics
+
+    def shutdown(self, wait=True):
+        '''대기 중인 작업까지 마치고 종료'''
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+tasks = TaskExecutor()
+atexit.register(tasks.shutdown)
@@ -0,0 +1,34 @@
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from nuriggun.querybudget import get_repeated_queries, get_view_budget
+
+
+class QueryBudgetTestMixin:
+    '''테스트 헬퍼 : 엔드포인트가 쿼리 예산을 지키고, 데이터가 늘어도 쿼리 수가 늘지 않는지 확인'''
+
+    def count_queries(self, url, method="get", **extra):
+        with CaptureQueriesContext(connections["default"]) as context:
+            response = getattr(self.client, method)(url, **extra)
+        self.assertLess(response.status_code, 400, response)
+        return [query["sql"] for query in context.captured_queries]
+
+    def assertQueryBudget(self, url, budget=None, grow=None, method="get", **extra):
+        if budget is None:
+            budget = get_view_budget(resolve(url.split("?")[0]).func, method)
+        queries = self.count_queries(url, method, **extra)
+        if budget is not None:
+            self.assertLessEqual(
+                len(queries), budget,
+                f"{url} 쿼리 {len(queries)}개가 예산 {budget}개를 넘었습니다.\n" + "\n".join(queries))
+
+        if grow is not None:
+            # 데이터를 더 만든 뒤에도 쿼리 수가 같아야 함
+            grow()
+            grown = self.count_queries(url, method, **extra)
+            repeated = get_repeated_queries(grown, threshold=2)
+            self.assertEqual(
+                len(grown), len(queries),
+                f"{url} 행 수가 늘자 쿼리가 {len(queries)}개에서 {len(grown)}개로 늘었습니다.\n"
+                + "\n".join(f"{count}회 : {shape}" for shape, count in repeated))
@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from mediastore.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,7 +25,5 @@ urlpatterns = [
     path('article/', include('article.urls')),
     path('accounts/', include('allauth.urls')),
     path('weather/', include('weather.urls')),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name="media"),
 ]
-
-urlpatterns += static(settings.MEDIA_URL,
-                      document_root=settings.MEDIA_ROOT)
\ No newline at end of file
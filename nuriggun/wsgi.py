@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nuriggun.settings')
 
 application = get_wsgi_application()
+
+# 자동완성 제목 목록은 워커 메모리에 보관 : 첫 요청이 만들기를 기다리지 않도록 워커가 뜰 때 백그라운드에서 미리 만듦
+# (AppConfig.ready 는 manage.py migrate 등 모든 명령에서도 실행되어 DB 접근이 안전하지 않으므로 웹 워커 시작점에서만)
+from article.autocomplete import title_index  # noqa: E402
+
+title_index.warm()
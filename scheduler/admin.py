@@ -0,0 +1,5 @@
+from django.contrib import admin
+from scheduler.models import JobRun, PeriodicJob
+
+admin.site.register(PeriodicJob)
+admin.site.register(JobRun)
@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from scheduler.models import JobRun
+from scheduler.registry import register
+
+
+@register("scheduler.prune_runs", hour=4, minute=0)
+def prune_runs():
+    '''오래된 실행 기록 삭제'''
+    deadline = timezone.now() - timedelta(days=settings.SCHEDULER_HISTORY_DAYS)
+    JobRun.objects.filter(started_at__lt=deadline).delete()
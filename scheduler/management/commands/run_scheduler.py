@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from scheduler.runner import run_due_jobs, run_forever
+
+
+class Command(BaseCommand):
+    help = "등록된 주기 작업(각 앱의 jobs.py)을 실행합니다. 여러 노드에서 띄워도 작업마다 한 곳에서만 실행됩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="실행할 때가 된 작업만 실행하고 종료")
+
+    def handle(self, *args, **options):
+        if not options["once"]:
+            run_forever()
+            return
+        for run in run_due_jobs():
+            self.stdout.write(f"{run.job.name} : {run.status} ({run.duration:.2f}초)")
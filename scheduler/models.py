@@ -0,0 +1,47 @@
+from django.db import models
+
+
+class PeriodicJob(models.Model):
+    '''등록된 주기 작업의 다음 실행 시각과 실행 권한(lease)
+
+    여러 노드에서 run_scheduler 를 띄워도 lease 를 먼저 잡은 한 곳에서만 실행됨.
+    '''
+    name = models.CharField(max_length=100, unique=True)
+    schedule = models.CharField(max_length=200, blank=True)
+    enabled = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(db_index=True)
+    lease_owner = models.CharField(max_length=200, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True)  # 초
+    last_status = models.CharField(max_length=10, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class JobRun(models.Model):
+    '''주기 작업 실행 기록'''
+    SUCCESS = "success"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (SUCCESS, "성공"),
+        (FAILED, "실패"),
+    ]
+
+    job = models.ForeignKey(PeriodicJob, on_delete=models.CASCADE, related_name="runs")
+    owner = models.CharField(max_length=200)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration = models.FloatField()  # 초
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "-started_at"], name="job_run_recent_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} : {self.started_at} {self.status}"
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+from apscheduler.triggers.cron import CronTrigger
+
+
+class Job:
+    '''주기 작업 : 이름, 실행할 함수, cron 주기'''
+    def __init__(self, name, func, cron, lease_seconds=None):
+        self.name = name
+        self.func = func
+        self.cron = cron
+        self.schedule = " ".join(f"{key}={value}" for key, value in sorted(cron.items()))
+        self.trigger = CronTrigger(timezone=settings.TIME_ZONE, **cron)
+        self.lease_seconds = lease_seconds or settings.SCHEDULER_LEASE_SECONDS
+
+    def get_next_run(self, now):
+        '''now 이후 다음 실행 시각 (밀린 실행은 한 번으로 합침)'''
+        return self.trigger.get_next_fire_time(None, now)
+
+
+jobs = {}
+
+
+def register(name, lease_seconds=None, **cron):
+    '''주기 작업 등록 데코레이터 : cron 인자는 APScheduler CronTrigger 와 같음 (hour="0,2", minute=0 ...)'''
+    def decorator(func):
+        jobs[name] = Job(name, func, cron, lease_seconds)
+        return func
+    return decorator
+
+
+def autodiscover():
+    '''각 앱의 jobs.py 를 불러와서 작업 등록'''
+    autodiscover_modules("jobs")
+    return jobs
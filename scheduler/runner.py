@@ -0,0 +1,150 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from scheduler.models import JobRun, PeriodicJob
+from scheduler.registry import autodiscover
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def sync_jobs(registry, now):
+    '''등록된 작업의 행 생성, 주기가 바뀐 작업은 다음 실행 시각 다시 계산'''
+    existing = {job.name: job for job in PeriodicJob.objects.filter(name__in=registry)}
+    for name, job in registry.items():
+        row = existing.get(name)
+        if row is None:
+            PeriodicJob.objects.get_or_create(
+                name=name, defaults={"schedule": job.schedule, "next_run_at": job.get_next_run(now)})
+        elif row.schedule != job.schedule:
+            PeriodicJob.objects.filter(pk=row.pk).update(schedule=job.schedule, next_run_at=job.get_next_run(now))
+
+
+def claim_job(job, owner, now):
+    '''실행 시각이 됐고 다른 노드가 lease 를 잡고 있지 않으면 lease 획득 (UPDATE 한 번이라 한 곳만 성공)'''
+    return PeriodicJob.objects.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now),
+        name=job.name, enabled=True, next_run_at__lte=now,
+    ).update(
+        lease_owner=owner,
+        lease_expires_at=now + timedelta(seconds=job.lease_seconds),
+        last_started_at=now,
+    )
+
+
+class LeaseHeartbeat(threading.Thread):
+    '''작업이 도는 동안 lease 를 lease_seconds / 3 마다 연장 : 오래 걸리는 작업을 다른 노드가 가져가지 않음'''
+    def __init__(self, job, owner):
+        super().__init__(name=f"lease-{job.name}", daemon=True)
+        self.job = job
+        self.owner = owner
+        self.stopped = threading.Event()
+
+    def renew(self):
+        return PeriodicJob.objects.filter(name=self.job.name, lease_owner=self.owner).update(
+            lease_expires_at=timezone.now() + timedelta(seconds=self.job.lease_seconds))
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.job.lease_seconds / 3):
+                try:
+                    if not self.renew():
+                        logger.warning("주기 작업 lease 를 잃었습니다 : %s", self.job.name)
+                        return
+                except Exception:
+                    logger.exception("주기 작업 lease 연장 실패 : %s", self.job.name)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job, owner, now=None):
+    '''작업 하나 실행 후 기록 : lease 를 못 잡았으면 None'''
+    now = now or timezone.now()
+    if not claim_job(job, owner, now):
+        return None
+
+    heartbeat = LeaseHeartbeat(job, owner)
+    heartbeat.start()
+    started = time.monotonic()
+    error = ""
+    try:
+        job.func()
+    except Exception as exc:
+        logger.exception("주기 작업 실패 : %s", job.name)
+        error = repr(exc)
+    finally:
+        heartbeat.stop()
+    duration = time.monotonic() - started
+    finished_at = timezone.now()
+    status = JobRun.FAILED if error else JobRun.SUCCESS
+
+    row = PeriodicJob.objects.get(name=job.name)
+    run = JobRun.objects.create(
+        job=row, owner=owner, started_at=now, finished_at=finished_at,
+        duration=duration, status=status, error=error)
+    # lease 가 만료돼서 다른 노드가 가져간 경우에는 그쪽 기록을 덮어쓰지 않음
+    PeriodicJob.objects.filter(pk=row.pk, lease_owner=owner).update(
+        next_run_at=job.get_next_run(max(finished_at, now)),
+        lease_owner="",
+        lease_expires_at=None,
+        last_finished_at=finished_at,
+        last_duration=duration,
+        last_status=status,
+    )
+    return run
+
+
+def run_due_jobs(owner=None, now=None):
+    '''실행 시각이 된 작업을 모두 실행 -> 실행 기록 목록'''
+    registry = autodiscover()
+    owner = owner or get_owner()
+    tick = now or timezone.now()
+    sync_jobs(registry, tick)
+    due = PeriodicJob.objects.filter(name__in=registry, enabled=True, next_run_at__lte=tick).values_list("name", flat=True)
+    runs = []
+    for name in list(due):
+        # lease 만료 시각은 작업마다 실제로 lease 를 잡는 시각 기준 (앞 작업이 오래 걸려도 뒤 작업 lease 가 줄지 않음)
+        run = run_job(registry[name], owner, now)
+        if run is not None:
+            runs.append(run)
+    return runs
+
+
+def get_sleep_seconds(registry, now):
+    '''가장 가까운 다음 실행 시각까지 (최대 SCHEDULER_POLL_SECONDS)'''
+    next_run_at = PeriodicJob.objects.filter(name__in=registry, enabled=True).aggregate(Min("next_run_at"))["next_run_at__min"]
+    if next_run_at is None:
+        return settings.SCHEDULER_POLL_SECONDS
+    return min(max((next_run_at - now).total_seconds(), 0), settings.SCHEDULER_POLL_SECONDS)
+
+
+def run_forever():
+    owner = get_owner()
+    registry = autodiscover()
+    logger.info("스케줄러 시작 %s : %s", owner, ", ".join(sorted(registry)))
+    while True:
+        close_old_connections()
+        try:
+            run_due_jobs(owner)
+            seconds = get_sleep_seconds(registry, timezone.now())
+        except Exception:
+            logger.exception("스케줄러 실행 실패")
+            seconds = settings.SCHEDULER_POLL_SECONDS
+        time.sleep(seconds)
@@ -0,0 +1,133 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from scheduler import registry
+from scheduler.models import JobRun, PeriodicJob
+from scheduler.runner import LeaseHeartbeat, claim_job, run_due_jobs, run_job
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        # 실제 작업(날씨 수집 등)은 불러오기만 하고 테스트용 작업으로 바꿔치기
+        self.registered = dict(registry.autodiscover())
+        patcher = mock.patch.dict(registry.jobs, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+        registry.register("test.job", minute="*/5")(lambda: self.calls.append(1))
+        self.job = registry.jobs["test.job"]
+
+    def make_due(self, name="test.job"):
+        run_due_jobs()
+        PeriodicJob.objects.filter(name=name).update(next_run_at=timezone.now() - timedelta(seconds=1))
+
+    def test_registered_jobs(self):
+        '''각 앱의 jobs.py 에서 등록'''
+        self.assertTrue({"weather.collect", "weather.retention", "user.digest_hourly", "mediastore.collect_media"} <= set(self.registered))
+
+    def test_not_due(self):
+        '''처음 등록되면 다음 주기까지 대기'''
+        self.assertEqual(run_due_jobs(), [])
+        self.assertEqual(self.calls, [])
+        job = PeriodicJob.objects.get(name="test.job")
+        self.assertGreater(job.next_run_at, timezone.now())
+
+    def test_run_due_job(self):
+        '''실행 후 기록 남기고 다음 실행 시각 계산, lease 해제'''
+        self.make_due()
+        runs = run_due_jobs(owner="node-a")
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([run.status for run in runs], [JobRun.SUCCESS])
+        job = PeriodicJob.objects.get(name="test.job")
+        self.assertGreater(job.next_run_at, timezone.now())
+        self.assertEqual((job.lease_owner, job.lease_expires_at, job.last_status), ("", None, JobRun.SUCCESS))
+        self.assertIsNotNone(job.last_duration)
+
+        # 같은 주기 안에서는 다시 실행하지 않음
+        run_due_jobs(owner="node-b")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_lease(self):
+        '''다른 노드가 lease 를 잡고 있으면 실행하지 않고, 만료되면 가져감'''
+        self.make_due()
+        now = timezone.now()
+        self.assertEqual(claim_job(self.job, "node-a", now), 1)
+        self.assertIsNone(run_job(self.job, "node-b", now))
+        self.assertEqual(self.calls, [])
+
+        later = now + timedelta(seconds=self.job.lease_seconds + 1)
+        run = run_job(self.job, "node-b", later)
+        self.assertEqual(run.owner, "node-b")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_heartbeat_renews_lease(self):
+        '''실행 중에는 lease 를 연장, 다른 노드가 가져간 lease 는 건드리지 않음'''
+        self.make_due()
+        claim_job(self.job, "node-a", timezone.now())
+        PeriodicJob.objects.filter(name="test.job").update(lease_expires_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(LeaseHeartbeat(self.job, "node-a").renew(), 1)
+        job = PeriodicJob.objects.get(name="test.job")
+        self.assertGreater(job.lease_expires_at, timezone.now() + timedelta(seconds=self.job.lease_seconds - 5))
+        self.assertEqual(LeaseHeartbeat(self.job, "node-b").renew(), 0)
+
+    def test_heartbeat_while_running(self):
+        '''작업이 lease 보다 오래 걸려도 heartbeat 가 주기적으로 연장'''
+        renewed = threading.Event()
+        registry.register("test.slow", lease_seconds=0.03, minute="*/5")(lambda: renewed.wait(5))
+        self.make_due("test.slow")
+        with mock.patch.object(LeaseHeartbeat, "renew", side_effect=lambda: renewed.set() or 1) as renew:
+            runs = run_due_jobs()
+        self.assertTrue(renew.called)
+        self.assertEqual([run.status for run in runs], [JobRun.SUCCESS])
+
+    def test_lease_per_job(self):
+        '''lease 만료 시각은 작업마다 lease 를 잡는 시각 기준'''
+        registry.register("test.second", minute="*/5")(lambda: None)
+        run_due_jobs()
+        PeriodicJob.objects.update(next_run_at=timezone.now() - timedelta(seconds=1))
+        claimed = {}
+
+        def claim(job, owner, now):
+            claimed[job.name] = now
+            return claim_job(job, owner, now)
+
+        with mock.patch("scheduler.runner.claim_job", side_effect=claim):
+            run_due_jobs()
+        self.assertEqual(set(claimed), {"test.job", "test.second"})
+        self.assertEqual(len(set(claimed.values())), 2)
+
+    def test_failed_job(self):
+        '''실패해도 기록하고 다음 주기에 다시 실행'''
+        def fail():
+            raise ValueError("upstream down")
+        registry.register("test.fail", minute="*/5")(fail)
+        self.make_due("test.fail")
+        with self.assertLogs("scheduler.runner", "ERROR"):
+            run_due_jobs()
+        run = JobRun.objects.get(job__name="test.fail")
+        self.assertEqual(run.status, JobRun.FAILED)
+        self.assertIn("upstream down", run.error)
+        job = PeriodicJob.objects.get(name="test.fail")
+        self.assertEqual(job.last_status, JobRun.FAILED)
+        self.assertGreater(job.next_run_at, timezone.now())
+
+    def test_schedule_change(self):
+        '''주기가 바뀌면 다음 실행 시각 다시 계산'''
+        self.make_due()
+        registry.register("test.job", hour=3, minute=0)(lambda: None)
+        run_due_jobs()
+        job = PeriodicJob.objects.get(name="test.job")
+        self.assertEqual(job.schedule, "hour=3 minute=0")
+        self.assertEqual(timezone.localtime(job.next_run_at).hour, 3)
+
+    def test_command_once(self):
+        self.make_due()
+        out = StringIO()
+        call_command("run_scheduler", "--once", stdout=out)
+        self.assertIn("test.job : success", out.getvalue())
@@ -0,0 +1,14 @@
+from scheduler.registry import register
+
+from user.models import EmailNotificationSettings
+from user.notifications import send_digests
+
+
+@register("user.digest_hourly", minute=0)
+def send_hourly_digests():
+    send_digests(EmailNotificationSettings.HOURLY)
+
+
+@register("user.digest_daily", hour=8, minute=0)
+def send_daily_digests():
+    send_digests(EmailNotificationSettings.DAILY)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from user.models import EmailNotificationSettings
+from user.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = "모아 받기를 선택한 구독자에게 쌓인 새 글 알림을 메일 한 통으로 보냅니다. (hourly 는 매시간, daily 는 하루 한 번 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("digest", choices=[EmailNotificationSettings.HOURLY, EmailNotificationSettings.DAILY])
+
+    def handle(self, *args, **options):
+        count = send_digests(options["digest"])
+        self.stdout.write(self.style.SUCCESS(f"알림 메일 {count}통을 보냈습니다."))
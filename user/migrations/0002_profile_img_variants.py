@@ -0,0 +1,33 @@
+# Generated by Django 4.2.2 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_img_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_img_thumbnail',
+            field=models.ImageField(blank=True, editable=False, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_img_webp',
+            field=models.ImageField(blank=True, editable=False, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_img_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.2 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_profile_img_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailnotificationsettings',
+            name='digest',
+            field=models.CharField(choices=[('immediate', '바로'), ('hourly', '1시간마다 모아서'), ('daily', '하루에 한 번 모아서')], default='immediate', max_length=10, verbose_name='새 글 알림 주기'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0001_initial'),
+        ('user', '0003_email_notification_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='article.article')),
+                ('subscriber', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'pendingnotification',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pendingnotification',
+            constraint=models.UniqueConstraint(fields=('subscriber', 'article'), name='unique_pending_notification'),
+        ),
+    ]
@@ -51,6 +51,12 @@ class User(AbstractBaseUser):
     created_at = models.DateTimeField("생성일",auto_now_add=True)
     updated_at = models.DateTimeField("수정일",auto_now=True)
     report_count = models.PositiveIntegerField(default=0)
+
+    # 프로필 변형 이미지 (업로드 후 프로세스 풀에서 생성)
+    profile_img_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_img_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_img_thumbnail = models.ImageField(max_length=255, blank=True, editable=False)
+    profile_img_webp = models.ImageField(max_length=255, blank=True, editable=False)
     objects = UserManager()
 
     USERNAME_FIELD = "email"
@@ -109,8 +115,31 @@ class Report(models.Model):
 
 # 이메일 알림 동의
 class EmailNotificationSettings(models.Model):
+    IMMEDIATE = "immediate"
+    HOURLY = "hourly"
+    DAILY = "daily"
+    DIGESTS = (
+        (IMMEDIATE, "바로"),
+        (HOURLY, "1시간마다 모아서"),
+        (DAILY, "하루에 한 번 모아서"),
+    )
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     email_notification = models.BooleanField("이메일 알림 동의", default=False)
+    digest = models.CharField("새 글 알림 주기", max_length=10, choices=DIGESTS, default=IMMEDIATE)
 
     def __str__(self):
-        return str(self.user.email)
\ No newline at end of file
+        return str(self.user.email)
+
+
+# 모아서 보낼 새 글 알림 (구독자, 게시글) : 다음 알림 메일을 보낼 때 삭제
+class PendingNotification(models.Model):
+    class Meta:
+        db_table = "pendingnotification"
+        constraints = [
+            models.UniqueConstraint(fields=["subscriber", "article"], name="unique_pending_notification"),
+        ]
+
+    subscriber = models.ForeignKey(User, on_delete=models.CASCADE, related_name="pending_notifications")
+    article = models.ForeignKey("article.Article", on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
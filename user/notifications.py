@@ -0,0 +1,132 @@
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from article.models import Article
+from user.models import EmailNotificationSettings, PendingNotification, User
+
+
+ARTICLE_URL = "http://127.0.0.1:5500/article/detail.html?article_id={}"  # (test)
+# ARTICLE_URL = "https://teamnuri.xyz/article/detail.html?article_id={}"  # (배포용)
+
+
+class EmailBatch:
+    '''메일을 EMAIL_BATCH_SIZE 개씩 모아 SMTP 연결 하나로 전송'''
+    def __init__(self, on_sent=None):
+        self.connection = get_connection()
+        self.messages = []
+        self.on_sent = on_sent
+        self.payloads = []
+        self.count = 0
+
+    def add(self, message, payload=None):
+        message.connection = self.connection
+        self.messages.append(message)
+        self.payloads.append(payload)
+        if len(self.messages) >= settings.EMAIL_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.messages:
+            # 처음 보낼 때 연결을 열어 두면 send_messages 가 묶음마다 새로 열고 닫지 않음
+            self.connection.open()
+            self.connection.send_messages(self.messages)
+            self.count += len(self.messages)
+            if self.on_sent is not None:
+                self.on_sent(self.payloads)
+        self.messages = []
+        self.payloads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.connection.close()
+
+
+def get_notification_recipients(author_id):
+    '''작성자를 구독하면서 이메일 알림에 동의한 유저 (id, 이메일, 알림 주기) : 조인 쿼리 한 번'''
+    return (
+        User.objects.filter(subscribe=author_id, emailnotificationsettings__email_notification=True)
+        .values_list("id", "email", "emailnotificationsettings__digest")
+        .distinct()
+        .iterator(chunk_size=settings.EMAIL_BATCH_SIZE)
+    )
+
+
+def send_article_notifications(article_id):
+    '''새 글 알림 : 바로 받는 구독자에게는 배치로 전송, 모아 받는 구독자는 대기 테이블에 기록'''
+    article = Article.objects.select_related("user").filter(pk=article_id).first()
+    if article is None:
+        return
+    nickname = article.user.nickname
+    subject = "{}님이 새로운 게시글을 작성하였습니다.".format(nickname)
+    message = "{}님이 새로운 게시글을 작성하였습니다. \n\n확인하기 → {}".format(nickname, ARTICLE_URL.format(article.pk))
+
+    # 모아 받는 구독자 알림을 먼저 기록 : 바로 보내는 메일 전송이 실패해도 남도록 SMTP 와 분리
+    seen = set()
+    pending = []
+    immediate = []
+    for subscriber_id, to_email, digest in get_notification_recipients(article.user_id):
+        # 설정이 여러 개인 유저는 한 번만
+        if subscriber_id in seen:
+            continue
+        seen.add(subscriber_id)
+        if digest == EmailNotificationSettings.IMMEDIATE:
+            immediate.append(to_email)
+            continue
+        pending.append(PendingNotification(subscriber_id=subscriber_id, article_id=article.pk))
+        if len(pending) >= settings.EMAIL_BATCH_SIZE:
+            PendingNotification.objects.bulk_create(pending, ignore_conflicts=True)
+            pending = []
+    if pending:
+        PendingNotification.objects.bulk_create(pending, ignore_conflicts=True)
+
+    with EmailBatch() as batch:
+        for to_email in immediate:
+            batch.add(EmailMessage(subject=subject, body=message, to=[to_email]))
+
+
+def render_digest(rows):
+    '''구독자 한 명의 모인 알림 -> 메일 제목, 본문'''
+    lines = [
+        "- {}님 : {}\n  확인하기 → {}".format(nickname, title, ARTICLE_URL.format(article_id))
+        for _, _, _, article_id, title, nickname in rows[:settings.DIGEST_MAX_ARTICLES]
+    ]
+    if len(rows) > settings.DIGEST_MAX_ARTICLES:
+        lines.append("외 {}개".format(len(rows) - settings.DIGEST_MAX_ARTICLES))
+    subject = "[Nurriggun] 구독 중인 기자의 새 글 {}개".format(len(rows))
+    message = "구독 중인 기자가 새로운 게시글을 작성하였습니다.\n\n" + "\n".join(lines)
+    return subject, message
+
+
+def send_digests(digest):
+    '''digest 주기로 받는 구독자마다 모인 알림을 메일 한 통으로 전송하고, 보낸 알림은 삭제'''
+    opted_in = EmailNotificationSettings.objects.filter(email_notification=True)
+    # 알림을 끈 구독자의 알림은 버림
+    PendingNotification.objects.exclude(subscriber_id__in=opted_in.values("user_id")).delete()
+
+    # 주기를 '바로' 로 바꾼 구독자의 남은 알림도 함께 전송
+    subscribers = opted_in.filter(digest__in=[digest, EmailNotificationSettings.IMMEDIATE]).values("user_id")
+    rows = (
+        PendingNotification.objects.filter(subscriber_id__in=subscribers)
+        .order_by("subscriber_id", "id")
+        .values_list("id", "subscriber_id", "subscriber__email", "article_id", "article__title", "article__user__nickname")
+        .iterator(chunk_size=settings.EMAIL_BATCH_SIZE)
+    )
+
+    def delete_sent(payloads):
+        # 보낸 메일의 알림만 삭제 (전송 중 실패하면 다음 실행 때 다시 전송)
+        PendingNotification.objects.filter(id__in=[pk for ids in payloads for pk in ids]).delete()
+
+    with EmailBatch(on_sent=delete_sent) as batch:
+        for _, group in groupby(rows, key=lambda row: row[1]):
+            group = list(group)
+            subject, message = render_digest(group)
+            batch.add(EmailMessage(subject=subject, body=message, to=[group[0][2]]), [row[0] for row in group])
+    return batch.count
@@ -5,7 +5,7 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.conf import settings
 from .models import Message
-import threading
+from nuriggun.tasks import tasks
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
@@ -70,7 +70,8 @@ class Util:
         )
         html_content = render_to_string(template_name, {'auth_url': data['auth_url']})
         email.attach_alternative(html_content, "text/html")
-        EmailThread(email).start()
+        # 비동기전송 : 회원가입 시 이메일전송으로 인한 지연현상이 없어짐
+        tasks.submit_on_commit(email.send)
 
     @staticmethod
     def send_signup_email(user, auth_url):
@@ -94,15 +95,6 @@ class Util:
         }
         Util.send_email(reset_message, 'password_reset_template.html')
 
-class EmailThread(threading.Thread):
-    '''비동기전송 : 회원가입 시 이메일전송으로 인한 지연현상이 없어짐'''
-    def __init__(self, email):
-        self.email = email
-        threading.Thread.__init__(self)
-
-    def run(self):
-        self.email.send()
-
 # 회원가입(이메일인증)  
 class UserCreateSerializer(serializers.ModelSerializer):
     '''회원가입'''
@@ -335,7 +327,8 @@ class HomeUserListSerializer(serializers.ModelSerializer):
     '''메인페이지 용 유저리스트 시리얼라이저'''
     class Meta:
         model = User
-        fields = ['pk', 'email', 'nickname', 'subscribe', 'profile_img']
+        fields = ['pk', 'email', 'nickname', 'subscribe', 'profile_img', 'profile_img_thumbnail',
+                  'profile_img_webp', 'profile_img_width', 'profile_img_height']
 
 
 """이메일 알림 동의 시리얼라이저"""
@@ -1,46 +1,40 @@
-from django.core.mail import EmailMessage
-import threading
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, pre_save, post_save
 from django.dispatch import receiver
 from article.models import Article
-from user.models import EmailNotificationSettings
+from article.cache import invalidate_home_cache
+from user.models import User
+from nuriggun.images import keep_image_variants, mark_image_upload, schedule_image_variants
+from nuriggun.tasks import tasks
+from user.notifications import send_article_notifications
 
 
-class sendEmail:
-    @staticmethod
-    def send_email(subject, message, to_email):
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            to=[to_email],
-        )
-        EmailThread(email).start()
+@receiver(post_save, sender=Article)
+def article_post_email_send(sender, instance, created, **kwargs):
+    '''새 글이 커밋된 뒤 구독자에게 알림 메일 전송'''
+    if created:
+        tasks.submit_on_commit(send_article_notifications, instance.pk)
 
 
-class EmailThread(threading.Thread):
-    def __init__(self, email):
-        self.email = email
-        threading.Thread.__init__(self)
+@receiver(post_save, sender=User)
+def home_user_list_cache_invalidate(sender, **kwargs):
+    '''유저 정보가 바뀌면 메인페이지 유저리스트 캐시 무효화'''
+    invalidate_home_cache()
 
-    def run(self):
-        self.email.send()
 
-@receiver(post_save, sender=Article)
-def article_post_email_send(sender, instance, created, **kwargs):
-    if created:
-        subject = "{}님이 새로운 게시글을 작성하였습니다.".format(instance.user.nickname)
+@receiver(m2m_changed, sender=User.subscribe.through)
+def home_subscribe_cache_invalidate(sender, action, **kwargs):
+    '''구독/구독 취소 시 메인페이지 캐시 무효화 (구독 피드, 유저리스트의 구독 목록)'''
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_home_cache()
 
-        message = "{}님이 새로운 게시글을 작성하였습니다. \n\n확인하기 → http://127.0.0.1:5500/article/detail.html?article_id={}".format(
-            instance.user.nickname, instance.pk)  # 이메일 내용 (test)
 
-        # message = "{}님이 새로운 게시글을 작성하였습니다. \n\n확인하기 → https://teamnuri.xyz/article/detail.html?article_id={}".format(instance.user.nickname, instance.pk) # 이메일 내용 (배포용)
+@receiver(pre_save, sender=User)
+def profile_img_upload(sender, instance, update_fields=None, **kwargs):
+    mark_image_upload(instance, "profile_img")
+    keep_image_variants(instance, "profile_img", update_fields)
 
-        author = instance.user  # 글 작성자
-        subscribers = author.subscribes.all()  # 글 작성자를 구독한 유저
-        email_notification_ok = EmailNotificationSettings.objects.filter(
-            email_notification=True)
 
-        for subscriber in subscribers:
-            if subscriber.email in email_notification_ok.values_list('user__email', flat=True):
-                to_email = subscriber.email
-                sendEmail.send_email(subject, message, to_email)
+@receiver(post_save, sender=User)
+def profile_img_variants(sender, instance, **kwargs):
+    '''새 프로필 이미지가 올라오면 커밋 후 썸네일/webp 생성'''
+    schedule_image_variants(instance, "profile_img")
@@ -8,6 +8,20 @@ from django.contrib.auth import get_user_model
 from django.test.client import MULTIPART_CONTENT, encode_multipart, BOUNDARY
 from PIL import Image
 import tempfile
+from nuriggun.testing import QueryBudgetTestMixin
+from user.models import EmailNotificationSettings, PendingNotification
+from user.notifications import send_article_notifications, send_digests
+from django.core.management import call_command
+from io import StringIO
+from article.models import Article
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import override_settings
+from nuriggun.tasks import TaskExecutor
+from article.cache import get_home_generation
+from unittest import mock
+import threading
+import smtplib
 
 # 회원가입 TEST
 class SignUpViewTest(APITestCase):
@@ -1027,3 +1041,249 @@ class HomeUserListViewTest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data), 12)
+
+    def test_shuffled_per_request(self):
+        '''후보 id 만 캐시하고 순서는 요청마다 섞음'''
+        url = reverse('home_user_list_view')
+        self.client.get(url)
+        with mock.patch("user.views.random.sample", side_effect=lambda ids, count: sorted(ids)[:count]) as sample:
+            with self.assertNumQueries(2):
+                first = self.client.get(url)
+        # 전체를 섞지 않고 한 페이지 수만 뽑음
+        self.assertEqual(sample.call_args.args[1], 12)
+        self.assertEqual([data["pk"] for data in first.data],
+                         sorted(User.objects.values_list("pk", flat=True))[:12])
+        # 후보보다 많이 요청하면 전체
+        response = self.client.get(url, {"limit": 1000})
+        self.assertEqual(len(response.data), User.objects.filter(is_active=True).count())
+
+    def test_subscribe_bumps_generation(self):
+        '''구독하면 메인페이지 캐시 세대 번호가 바뀜'''
+        subscriber, writer = User.objects.all()[:2]
+        generation = get_home_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            subscriber.subscribe.add(writer)
+        self.assertGreater(get_home_generation(), generation)
+
+
+# 쿼리 예산 TEST
+class UserQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@test.test', password='abc123qw!', is_active=True)
+        self.client.force_authenticate(user=self.user)
+
+    def grow(self):
+        for i in range(3):
+            other = User.objects.create_user(
+                email=f'test{i}@budget.test', password='abc123qw!', is_active=True)
+            self.user.subscribe.add(other)
+            Message.objects.create(sender=other, receiver=self.user, title="title", content="content")
+
+    def test_subscribe_list_budget_100(self):
+        '''구독 리스트 : 구독이 늘어도 쿼리 수 일정'''
+        url = reverse("subscribe_view", kwargs={"user_id": self.user.id})
+        self.assertQueryBudget(url, grow=self.grow)
+
+    def test_message_inbox_budget_101(self):
+        '''받은 쪽지함 : 쪽지가 늘어도 쿼리 수 일정'''
+        self.assertQueryBudget(reverse("message_inbox_view"), grow=self.grow)
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    '''SMTP 백엔드처럼 열려 있지 않으면 send_messages 마다 연결을 열고 닫으면서 횟수를 기록'''
+    opens = closes = 0
+    batches = []
+
+    @classmethod
+    def reset(cls):
+        cls.opens = cls.closes = 0
+        cls.batches = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection is not None:
+            return False
+        self.connection = object()
+        type(self).opens += 1
+        return True
+
+    def close(self):
+        if self.connection is not None:
+            self.connection = None
+            type(self).closes += 1
+
+    def send_messages(self, messages):
+        created = self.open()
+        try:
+            type(self).batches.append(len(messages))
+            return super().send_messages(messages)
+        finally:
+            if created:
+                self.close()
+
+
+# 새 글 알림 메일 TEST
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend", EMAIL_BATCH_SIZE=2)
+class ArticleNotificationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author@test.test', '1234', nickname='author')
+        for i in range(5):
+            subscriber = User.objects.create_user(f'{i}@test.test', '1234')
+            subscriber.subscribe.add(cls.author)
+            EmailNotificationSettings.objects.create(user=subscriber, email_notification=i != 0)
+        User.objects.create_user('other@test.test', '1234')
+        EmailNotificationSettings.objects.create(user=User.objects.get(email='1@test.test'), email_notification=True)
+
+    @override_settings(TASK_EAGER=True)
+    def test_send_after_commit(self):
+        '''게시글이 커밋된 뒤에 전송'''
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(title="title", content="content", user=self.author)
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_recipients_single_query(self):
+        '''구독자 수와 관계없이 쿼리 2번, 동의한 구독자에게 한 번씩'''
+        article = Article.objects.create(title="title", content="content", user=self.author)
+        mail.outbox = []
+        with self.assertNumQueries(2):
+            send_article_notifications(article.pk)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'{i}@test.test' for i in range(1, 5)])
+
+    @override_settings(EMAIL_BACKEND="user.tests.CountingEmailBackend")
+    def test_batches_on_one_connection(self):
+        '''EMAIL_BATCH_SIZE 개씩 나눠서 연결 하나로 전송'''
+        article = Article.objects.create(title="title", content="content", user=self.author)
+        CountingEmailBackend.reset()
+        send_article_notifications(article.pk)
+        self.assertEqual(CountingEmailBackend.batches, [2, 2])
+        self.assertEqual((CountingEmailBackend.opens, CountingEmailBackend.closes), (1, 1))
+
+
+# 백그라운드 작업 실행기 TEST
+class TaskExecutorTest(APITestCase):
+    @override_settings(TASK_EAGER=True)
+    def test_eager_and_metrics(self):
+        '''동기 모드는 바로 실행, 실패는 기록만 하고 넘어감'''
+        executor = TaskExecutor()
+        results = []
+        executor.submit(results.append, 1)
+        executor.submit(lambda: 1 / 0)
+        self.assertEqual(results, [1])
+        metrics = executor.metrics()
+        self.assertEqual((metrics["submitted"], metrics["completed"], metrics["failed"]), (2, 1, 1))
+
+    @override_settings(TASK_EAGER=True)
+    def test_on_commit(self):
+        '''커밋된 뒤에만 실행'''
+        executor = TaskExecutor()
+        results = []
+        with self.captureOnCommitCallbacks(execute=True):
+            executor.submit_on_commit(results.append, 1)
+            self.assertEqual(results, [])
+        self.assertEqual(results, [1])
+
+    @override_settings(TASK_WORKERS=1, TASK_QUEUE_SIZE=0, TASK_SUBMIT_TIMEOUT=0)
+    def test_backpressure(self):
+        '''자리가 없으면 요청한 스레드에서 실행'''
+        executor = TaskExecutor()
+        self.addCleanup(executor.shutdown)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        executor.submit(block)
+        started.wait(5)
+        threads = []
+        executor.submit(lambda: threads.append(threading.current_thread()))
+        release.set()
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(executor.metrics()["caller_runs"], 1)
+
+
+# 새 글 알림 모아보내기 TEST
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class NotificationDigestTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author@test.test', '1234', nickname='author')
+        cls.hourly = User.objects.create_user('hourly@test.test', '1234')
+        cls.daily = User.objects.create_user('daily@test.test', '1234')
+        cls.immediate = User.objects.create_user('now@test.test', '1234')
+        for user, digest in ((cls.hourly, "hourly"), (cls.daily, "daily"), (cls.immediate, "immediate")):
+            user.subscribe.add(cls.author)
+            EmailNotificationSettings.objects.create(user=user, email_notification=True, digest=digest)
+
+    def publish(self, count):
+        for i in range(count):
+            article = Article.objects.create(title=f"제목{i}", content="content", user=self.author)
+            send_article_notifications(article.pk)
+
+    def test_pending_instead_of_email(self):
+        '''모아 받는 구독자는 글마다 메일 대신 대기 테이블에 기록'''
+        self.publish(3)
+        self.assertEqual([message.to for message in mail.outbox], [['now@test.test']] * 3)
+        self.assertEqual(PendingNotification.objects.filter(subscriber=self.hourly).count(), 3)
+        self.assertEqual(PendingNotification.objects.filter(subscriber=self.daily).count(), 3)
+
+    def test_pending_kept_when_smtp_fails(self):
+        '''바로 보내는 메일 전송이 실패해도 모아 받는 구독자 알림은 기록'''
+        with mock.patch.object(locmem.EmailBackend, "send_messages", side_effect=smtplib.SMTPException("down")):
+            with self.assertRaises(smtplib.SMTPException):
+                self.publish(1)
+        self.assertEqual(PendingNotification.objects.filter(subscriber=self.hourly).count(), 1)
+        self.assertEqual(PendingNotification.objects.filter(subscriber=self.daily).count(), 1)
+
+    def test_one_email_per_window(self):
+        '''주기마다 구독자당 메일 한 통, 보낸 알림은 삭제'''
+        self.publish(3)
+        mail.outbox = []
+        self.assertEqual(send_digests("hourly"), 1)
+        self.assertEqual(mail.outbox[0].to, ['hourly@test.test'])
+        self.assertIn("새 글 3개", mail.outbox[0].subject)
+        self.assertIn("제목2", mail.outbox[0].body)
+        self.assertFalse(PendingNotification.objects.filter(subscriber=self.hourly).exists())
+        self.assertEqual(PendingNotification.objects.filter(subscriber=self.daily).count(), 3)
+
+        call_command("send_notification_digests", "daily", stdout=StringIO())
+        self.assertEqual(mail.outbox[1].to, ['daily@test.test'])
+        self.assertFalse(PendingNotification.objects.exists())
+
+    @override_settings(EMAIL_BACKEND="user.tests.CountingEmailBackend", EMAIL_BATCH_SIZE=1)
+    def test_digests_on_one_connection(self):
+        '''모아 보내기도 여러 묶음을 연결 하나로 전송'''
+        for i in range(3):
+            user = User.objects.create_user(f'hourly{i}@test.test', '1234')
+            user.subscribe.add(self.author)
+            EmailNotificationSettings.objects.create(user=user, email_notification=True, digest="hourly")
+        self.publish(2)
+        CountingEmailBackend.reset()
+        self.assertEqual(send_digests("hourly"), 4)
+        self.assertEqual(CountingEmailBackend.batches, [1, 1, 1, 1])
+        self.assertEqual((CountingEmailBackend.opens, CountingEmailBackend.closes), (1, 1))
+
+    def test_opted_out_dropped(self):
+        '''알림을 끈 구독자의 알림은 보내지 않고 삭제'''
+        self.publish(1)
+        EmailNotificationSettings.objects.filter(user=self.daily).update(email_notification=False)
+        mail.outbox = []
+        send_digests("daily")
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(PendingNotification.objects.filter(subscriber=self.daily).exists())
+
+    def test_change_digest(self):
+        '''알림 주기 변경'''
+        self.client.force_authenticate(user=self.hourly)
+        response = self.client.patch(reverse('email_notification'), {"digest": "daily"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(EmailNotificationSettings.objects.get(user=self.hourly).digest, "daily")
+        response = self.client.patch(reverse('email_notification'), {"digest": "weekly"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
@@ -47,12 +47,14 @@ from django.http import QueryDict
 
 # HOME import
 from rest_framework.pagination import LimitOffsetPagination
-from django.db.models.functions import Random
+import random
+from article.cache import get_home_value
+from nuriggun.querybudget import query_budget
 
 # 메일보내기
 
 from django.core.mail import EmailMessage
-import threading
+from nuriggun.tasks import tasks
 from django.conf import settings
 
 
@@ -210,9 +212,10 @@ class SubscribeView(APIView):
         else:
             return Response("자신을 구독 할 수 없습니다.", status=status.HTTP_403_FORBIDDEN)
 
+    @query_budget(4)
     def get(self, request, user_id):
         '''구독 리스트'''
-        subscribes = User.objects.filter(id=user_id)
+        subscribes = User.objects.filter(id=user_id).prefetch_related("subscribe")
         subscribes_serializer = SubscribeSerializer(subscribes, many=True)
         return Response(
             {
@@ -227,9 +230,10 @@ class MessageInboxView(APIView):
     """ 받은 쪽지함 """
     permission_classes = [IsAuthenticated]
 
+    @query_budget(5)
     def get(self, request):
         user = self.request.user
-        messages = Message.objects.filter(receiver=user).order_by('-timestamp')
+        messages = Message.objects.filter(receiver=user).select_related("sender", "receiver").order_by('-timestamp')
         received_messages_count = messages.count()
         unread_count = messages.filter(is_read=False).count()
         serializer = MessageDetailSerializer(messages, many=True)
@@ -244,9 +248,10 @@ class MessageSentView(APIView):
     """ 보낸 쪽지함 """
     permission_classes = [IsAuthenticated]
 
+    @query_budget(3)
     def get(self, request):
         user = self.request.user
-        messages = Message.objects.filter(sender=user)
+        messages = Message.objects.filter(sender=user).select_related("sender", "receiver")
         serializer = MessageDetailSerializer(messages, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -277,7 +282,7 @@ class MessageView(APIView):
 class MessageDetailView(APIView):
     def get(self, request, message_id):
         """ 쪽지 상세보기 """
-        message = get_object_or_404(Message, id=message_id)
+        message = get_object_or_404(Message.objects.select_related("sender", "receiver"), id=message_id)
 
         if request.user.is_authenticated:
             user = request.user.email
@@ -438,34 +443,32 @@ class HomeUserListView(APIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = HomeUserPagination
 
+    @query_budget(4)
     def get(self, request):
-        users = User.objects.filter(is_active=True).order_by(Random())
+        # 후보(활성 유저 id)만 캐시하고 순서는 요청마다 새로 섞음
+        user_ids = get_home_value(
+            "users", lambda: list(User.objects.filter(is_active=True).values_list("id", flat=True)))
 
-        paginator = self.pagination_class()
-        paginated_users = paginator.paginate_queryset(users, request)
+        # 요청마다 새로 뽑으므로 offset 없이 한 페이지(limit)에 필요한 수만 뽑음
+        limit = self.pagination_class().get_limit(request)
+        page = random.sample(user_ids, min(limit, len(user_ids)))
+        users = User.objects.prefetch_related("subscribe").in_bulk(page)
 
-        serializer = HomeUserListSerializer(paginated_users, many=True)
+        serializer = HomeUserListSerializer([users[pk] for pk in page if pk in users], many=True)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 # 신고 알림
 
 
-class EmailThread(threading.Thread):
-    def __init__(self, subject, message, to_email):
-        self.subject = subject
-        self.message = message
-        self.to_email = to_email
-        threading.Thread.__init__(self)
-
-    def run(self):
-        email = EmailMessage(
-            subject=self.subject,
-            body=self.message,
-            to=[self.to_email],
-            from_email=settings.DEFAULT_FROM_EMAIL,
-        )
-        email.send()
+def send_email(subject, message, to_email):
+    email = EmailMessage(
+        subject=subject,
+        body=message,
+        to=[to_email],
+        from_email=settings.DEFAULT_FROM_EMAIL,
+    )
+    email.send()
 
 # 신고
 
@@ -506,8 +509,7 @@ class ReportView(APIView):
             message = f"안녕하세요, {reported_user.nickname}님!\n\n계정이 정지되었습니다.\n문의 사항이 있으신 경우, 홈페이지의 '문의하기' 채팅을 이용해 주세요."
             to_email = reported_user.email
 
-            email = EmailThread(subject, message, to_email)
-            email.start()
+            tasks.submit_on_commit(send_email, subject, message, to_email)
 
             return Response('정지된 악질 유저입니다.', status=status.HTTP_200_OK)
 
@@ -535,3 +537,15 @@ class EmailNotificationView(APIView):
             return Response("이메일 알림에 동의하셨습니다", status=status.HTTP_200_OK)
         else:
             return Response("이메일 알림을 취소하셨습니다", status=status.HTTP_205_RESET_CONTENT)
+
+    def patch(self, request):
+        '''새 글 알림 주기 변경 (immediate / hourly / daily)'''
+        email_notification_settings = get_object_or_404(
+            EmailNotificationSettings, user=request.user)
+        serializer = EmailNotificationSerializer(
+            email_notification_settings, data={"digest": request.data.get("digest")}, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        else:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -5,3 +5,5 @@ class WeatherConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'weather'
 
+    def ready(self):
+        import weather.signals
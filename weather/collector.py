@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from urllib.parse import unquote
+
+import aiohttp
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import WeatherCity, WeatherData, WeatherResponse
+from .retention import get_hour
+from .snapshot import get_latest_weather, refresh_weather_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+# 변경 확인에 쓰는 필드 -> 결과 키
+FIELDS = {
+    "temp": "tmp",
+    "humidity": "hum",
+    "rain": "rain",
+    "sky": "sky",
+}
+
+# 초단기실황 카테고리 -> 결과 키
+CATEGORIES = {
+    "T1H": "tmp",   # 기온
+    "REH": "hum",   # 습도
+    "PTY": "sky",   # 강수타입: 없음(0), 비(1), 비/눈(2), 눈(3), 빗방울(5), 빗방울눈날림(6), 눈날림(7)
+    "RN1": "rain",  # 1시간 동안 강수량
+}
+
+
+class WeatherAPIError(Exception):
+    pass
+
+
+def get_base_datetime(now=None):
+    '''초단기실황 발표 기준 (매시 30분, 한 시간 전 발표분 사용) -> (base_date, base_time)'''
+    now = timezone.localtime(now)
+    base = now - timedelta(hours=1)
+    return base.strftime("%Y%m%d"), base.strftime("%H") + "30"
+
+
+def get_params(nx, ny, now=None):
+    base_date, base_time = get_base_datetime(now)
+    return {
+        "serviceKey": unquote(settings.WEATHER_API_KEY or "", "UTF-8"),
+        "base_date": base_date,
+        "base_time": base_time,
+        "nx": nx,
+        "ny": ny,
+        "dataType": "json",
+        "numOfRows": "1000",
+    }
+
+
+def parse_items(payload):
+    '''응답 JSON -> {"tmp", "hum", "sky", "rain"}'''
+    try:
+        items = payload["response"]["body"]["items"]["item"]
+    except (KeyError, TypeError):
+        raise WeatherAPIError(f"응답 형식 오류 : {str(payload)[:200]}")
+    weather_data = {}
+    for item in items:
+        key = CATEGORIES.get(item.get("category"))
+        if key is not None:
+            weather_data[key] = item.get("obsrValue")
+    return weather_data
+
+
+def get_backoff(attempt):
+    '''재시도 대기 시간 : 지수 백오프 + 지터'''
+    return settings.WEATHER_RETRY_BASE_SECONDS * 2 ** attempt * random.uniform(0.5, 1.0)
+
+
+async def fetch_json(session, semaphore, url, params, parse, label):
+    '''API 요청 하나 (실패하면 백오프 후 재시도, 끝내 실패하면 None)'''
+    for attempt in range(settings.WEATHER_MAX_RETRIES):
+        try:
+            # 동시에 보내는 요청 수 제한
+            async with semaphore:
+                async with session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    # 공공데이터포털은 오류를 XML 이나 text/html 로 주기도 함
+                    payload = await response.json(content_type=None)
+            return parse(payload)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, WeatherAPIError) as error:
+            logger.warning("날씨 조회 실패 %s (%d회) : %r", label, attempt + 1, error)
+        if attempt + 1 < settings.WEATHER_MAX_RETRIES:
+            await asyncio.sleep(get_backoff(attempt))
+    logger.error("최대 재시도 횟수를 초과했습니다. %s", label)
+    return None
+
+
+def get_session():
+    '''연결을 공유하는 세션과 동시 요청 수 제한'''
+    timeout = aiohttp.ClientTimeout(total=settings.WEATHER_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=settings.WEATHER_CONCURRENCY, ssl=None if settings.WEATHER_VERIFY_SSL else False)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout), asyncio.Semaphore(settings.WEATHER_CONCURRENCY)
+
+
+async def fetch_weather(session, semaphore, nx, ny, now=None):
+    '''격자 하나의 초단기실황 조회'''
+    return await fetch_json(
+        session, semaphore, settings.WEATHER_API_URL, get_params(nx, ny, now), parse_items, f"nx={nx} ny={ny}")
+
+
+async def fetch_all(grids, now=None):
+    '''여러 격자를 연결을 공유하는 세션 하나로 동시에 조회 -> 격자 순서대로 날씨 또는 None'''
+    session, semaphore = get_session()
+    async with session:
+        return await asyncio.gather(*(fetch_weather(session, semaphore, nx, ny, now) for nx, ny in grids))
+
+
+def load_grids(grids, now=None):
+    '''격자별 날씨 -> {(nx, ny): 날씨 또는 None}
+
+    같은 격자는 한 번만, 저장된 응답(WeatherResponse)이 있는 격자는 조회하지 않음.
+    '''
+    base_date, base_time = get_base_datetime(now)
+    grids = list(dict.fromkeys(grids))
+    cached = {
+        (response.nx, response.ny): response.data
+        for response in WeatherResponse.objects.filter(base_date=base_date, base_time=base_time)
+    }
+    results = {grid: cached[grid] for grid in grids if grid in cached}
+
+    missing = [grid for grid in grids if grid not in cached]
+    if missing:
+        fetched = asyncio.run(fetch_all(missing, now))
+        results.update(zip(missing, fetched))
+        # 실패한 격자는 저장하지 않음 : 다음 수집 때 다시 조회
+        WeatherResponse.objects.bulk_create([
+            WeatherResponse(nx=nx, ny=ny, base_date=base_date, base_time=base_time, data=data)
+            for (nx, ny), data in zip(missing, fetched) if data is not None
+        ], ignore_conflicts=True)
+    return results
+
+
+def get_values(weather_data):
+    '''응답 값(문자열) -> WeatherData 필드 값'''
+    return {
+        field: WeatherData._meta.get_field(field).to_python(weather_data.get(key))
+        for field, key in FIELDS.items()
+    }
+
+
+def collect_weather(now=None):
+    '''모든 지역 날씨를 조회해서 직전 관측과 달라졌거나 시간이 바뀐 지역만 bulk_create 한 번으로 저장 후 스냅샷 갱신'''
+    cities = list(WeatherCity.objects.all())
+    if not cities:
+        logger.info("지역정보가 없습니다.")
+        return []
+
+    results = load_grids([(city.nx, city.ny) for city in cities], now)
+    previous = {weather.city_id: weather for weather in get_latest_weather()}
+    # 행의 timestamp 는 저장 시각(auto_now)이므로 같은 기준으로 비교
+    hour = get_hour(timezone.now())
+
+    rows = []
+    unchanged = []
+    for city in cities:
+        weather_data = results[(city.nx, city.ny)]
+        if weather_data is None:
+            logger.warning("%s지역 날씨 데이터를 불러오는 데 실패했습니다.", city)
+            continue
+        values = get_values(weather_data)
+        last = previous.get(city.pk)
+        if (last is not None and get_hour(last.timestamp) == hour
+                and {field: getattr(last, field) for field in FIELDS} == values):
+            # 같은 시간 안에서 값이 그대로면 행을 늘리지 않고 직전 행의 관측 수만 늘림
+            # (시간이 바뀌면 새 행 : 관측 수가 항상 그 행의 시간에 속하도록)
+            unchanged.append(last.pk)
+            continue
+        rows.append(WeatherData(city=city, **values))
+    if unchanged:
+        WeatherData.objects.filter(pk__in=unchanged).update(samples=F("samples") + 1)
+    if not rows:
+        return []
+    created = WeatherData.objects.bulk_create(rows)
+    # bulk_create 는 시그널이 없으므로 직접 갱신
+    refresh_weather_snapshot()
+    return created
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from datetime import timedelta
+from io import BytesIO
+from urllib.parse import unquote
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .collector import WeatherAPIError, fetch_json, get_session
+from .models import WeatherCity, WeatherForecast
+from .retention import parse_rain
+
+
+logger = logging.getLogger(__name__)
+
+# 단기예보 카테고리 -> 응답 키 (배열 행 순서)
+VARIABLES = {
+    "TMP": "temp",              # 1시간 기온
+    "REH": "humidity",          # 습도
+    "POP": "rain_probability",  # 강수확률
+    "PCP": "rain",              # 1시간 강수량(mm)
+    "SKY": "sky",               # 하늘상태: 맑음(1), 구름많음(3), 흐림(4)
+    "PTY": "rain_type",         # 강수형태
+    "WSD": "wind_speed",        # 풍속(m/s)
+}
+
+# 하루 8번 발표 (02, 05, ..., 23시), 발표 후 10분 뒤부터 조회 가능
+BASE_HOURS = (2, 5, 8, 11, 14, 17, 20, 23)
+HOUR = np.timedelta64(1, "h")
+
+
+def get_forecast_base(now=None):
+    '''지금 조회할 수 있는 가장 최근 단기예보 발표 시각'''
+    now = timezone.localtime(now) - timedelta(minutes=10)
+    hours = [hour for hour in BASE_HOURS if hour <= now.hour]
+    if not hours:
+        return (now - timedelta(days=1)).replace(hour=BASE_HOURS[-1], minute=0, second=0, microsecond=0)
+    return now.replace(hour=hours[-1], minute=0, second=0, microsecond=0)
+
+
+def get_forecast_params(nx, ny, base):
+    return {
+        "serviceKey": unquote(settings.WEATHER_API_KEY or "", "UTF-8"),
+        "base_date": base.strftime("%Y%m%d"),
+        "base_time": base.strftime("%H%M"),
+        "nx": nx,
+        "ny": ny,
+        "dataType": "json",
+        "numOfRows": str(settings.WEATHER_FORECAST_ROWS),
+    }
+
+
+def parse_forecast(payload):
+    try:
+        return payload["response"]["body"]["items"]["item"]
+    except (KeyError, TypeError):
+        raise WeatherAPIError(f"응답 형식 오류 : {str(payload)[:200]}")
+
+
+def to_utc64(value):
+    '''aware datetime -> UTC datetime64[m]'''
+    return np.datetime64(value.astimezone(timezone.utc).replace(tzinfo=None), "m")
+
+
+def parse_times(dates, times):
+    '''"20230701", "1500" 배열 -> 한국 시간 datetime64[h] 배열'''
+    day = dates.astype(np.int64)
+    years = (day // 10000 - 1970).astype("datetime64[Y]")
+    months = (day // 100 % 100 - 1).astype("timedelta64[M]")
+    days = (day % 100 - 1).astype("timedelta64[D]")
+    hours = (times.astype(np.int64) // 100).astype("timedelta64[h]")
+    return (years + months).astype("datetime64[D]") + days + hours
+
+
+def encode_forecast(items):
+    '''예보 항목 목록 -> (첫 예보 시각, 시간 수, np.save bytes)'''
+    items = [item for item in items if item.get("category") in VARIABLES]
+    if not items:
+        raise WeatherAPIError("예보 항목이 없습니다.")
+    categories = np.array([item["category"] for item in items])
+    local_times = parse_times(
+        np.array([item["fcstDate"] for item in items]), np.array([item["fcstTime"] for item in items]))
+    raw = np.array([str(item["fcstValue"]) for item in items])
+
+    values = np.full(len(items), np.nan, dtype=np.float32)
+    is_rain = categories == "PCP"
+    values[~is_rain] = raw[~is_rain].astype(np.float32)
+    values[is_rain] = [parse_rain(value) for value in raw[is_rain]]
+    # 기상청 결측값 (-999 등)
+    values[np.abs(values) >= 900] = np.nan
+
+    first = local_times.min()
+    hours = int((local_times.max() - first) / HOUR) + 1
+    # 카테고리 -> 배열 행 번호
+    names = np.array(list(VARIABLES))
+    sorter = np.argsort(names)
+    rows = sorter[np.searchsorted(names, categories, sorter=sorter)]
+    table = np.full((len(VARIABLES), hours), np.nan, dtype=np.float32)
+    table[rows, ((local_times - first) / HOUR).astype(np.int64)] = values
+
+    start = timezone.make_aware(first.astype("datetime64[m]").item())
+    buffer = BytesIO()
+    np.save(buffer, table, allow_pickle=False)
+    return start, hours, buffer.getvalue()
+
+
+def decode_forecast(forecast):
+    '''저장된 예보 -> {"times": [...], "temp": [...], ...} (값이 없는 시간은 None)'''
+    table = np.load(BytesIO(bytes(forecast.values)), allow_pickle=False)
+    times = to_utc64(forecast.start) + np.arange(forecast.hours) * HOUR
+    data = {"times": np.datetime_as_string(times, unit="m", timezone="UTC").tolist()}
+    # 소수 첫째 자리까지 (float32 오차 제거)
+    series = np.round(table.astype(np.float64), 1).astype(object)
+    series[np.isnan(table)] = None
+    for name, row in zip(forecast.variables.split(","), series):
+        data[VARIABLES.get(name, name)] = row.tolist()
+    return data
+
+
+async def fetch_forecasts(grids, base):
+    session, semaphore = get_session()
+    async with session:
+        return await asyncio.gather(*(
+            fetch_json(session, semaphore, settings.WEATHER_FORECAST_URL, get_forecast_params(nx, ny, base),
+                       parse_forecast, f"forecast nx={nx} ny={ny}")
+            for nx, ny in grids
+        ))
+
+
+def collect_forecasts(now=None):
+    '''모든 지역 격자의 최신 단기예보를 격자마다 한 행으로 저장 (이미 저장한 발표분은 조회하지 않음)'''
+    base = get_forecast_base(now)
+    grids = list(dict.fromkeys(WeatherCity.objects.values_list("nx", "ny")))
+    existing = set(WeatherForecast.objects.filter(base=base).values_list("nx", "ny"))
+    missing = [grid for grid in grids if grid not in existing]
+    if not missing:
+        return []
+
+    forecasts = []
+    for (nx, ny), items in zip(missing, asyncio.run(fetch_forecasts(missing, base))):
+        if items is None:
+            logger.warning("단기예보를 불러오는 데 실패했습니다. nx=%s ny=%s", nx, ny)
+            continue
+        try:
+            start, hours, values = encode_forecast(items)
+        except (KeyError, ValueError, WeatherAPIError):
+            logger.exception("단기예보 변환 실패 nx=%s ny=%s", nx, ny)
+            continue
+        forecasts.append(WeatherForecast(
+            nx=nx, ny=ny, base=base, start=start, hours=hours, variables=",".join(VARIABLES), values=values))
+    return WeatherForecast.objects.bulk_create(forecasts, ignore_conflicts=True)
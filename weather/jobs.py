@@ -0,0 +1,11 @@
+from scheduler.registry import register
+
+from .forecast import collect_forecasts
+from .views import delete_weather, save_weather
+
+
+# 초단기실황은 매시 갱신되지만 지역이 많아 2시간마다 수집
+register("weather.collect", hour="0,2,4,6,8,10,12,14,16,18,20,22", minute=0)(save_weather)
+register("weather.retention", hour=13, minute=0)(delete_weather)
+# 단기예보는 02시부터 3시간마다 발표, 10분 뒤부터 조회 가능
+register("weather.forecast", hour="2,5,8,11,14,17,20,23", minute=15)(collect_forecasts)
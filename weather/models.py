@@ -16,10 +16,85 @@ class WeatherData(models.Model):
     humidity = models.IntegerField(blank=True, null=True) # 습도
     rain = models.CharField(max_length=20, blank=True, null=True) # 한시간 강수량
     sky = models.IntegerField(blank=True, null=True) # 하늘 상태
+    samples = models.PositiveIntegerField(default=1) # 같은 시간 안에서 값이 그대로여서 이 행으로 대신한 수집 횟수 (요약 시 관측 수)
+
+    class Meta:
+        indexes = [
+            # 지역별 최신 날씨 조회 (weather.snapshot)
+            models.Index(fields=["city", "-timestamp"], name="weather_city_latest_idx"),
+        ]
 
     def __str__(self):
         korea_timestamp = timezone.localtime(self.timestamp)
 
         city_name = self.city.city if self.city else "Unknown City"
 
-        return f"{city_name} : {korea_timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
\ No newline at end of file
+        return f"{city_name} : {korea_timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+
+class WeatherResponse(models.Model):
+    '''격자, 발표 시각별 초단기실황 응답 : 같은 발표분은 바뀌지 않으므로 재시작해도 다시 조회하지 않음'''
+    nx = models.IntegerField()
+    ny = models.IntegerField()
+    base_date = models.CharField(max_length=8)
+    base_time = models.CharField(max_length=4)
+    data = models.JSONField() # {"tmp", "hum", "sky", "rain"}
+    fetched_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["base_date", "base_time", "nx", "ny"], name="unique_weather_response"),
+        ]
+
+    def __str__(self):
+        return f"({self.nx}, {self.ny}) : {self.base_date} {self.base_time}"
+
+
+class WeatherForecast(models.Model):
+    '''격자별 단기예보 발표분 하나 : 변수별 시간 순서 값을 float32 배열 하나로 묶어 저장 (weather.forecast)'''
+    nx = models.IntegerField()
+    ny = models.IntegerField()
+    base = models.DateTimeField() # 발표 시각
+    start = models.DateTimeField() # 첫 예보 시각, 이후 1시간 간격
+    hours = models.PositiveSmallIntegerField()
+    variables = models.CharField(max_length=200) # 배열 행 순서 (쉼표로 구분)
+    values = models.BinaryField() # np.save 형식 (변수 수 x hours)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["nx", "ny", "base"], name="unique_weather_forecast"),
+        ]
+        indexes = [
+            models.Index(fields=["nx", "ny", "-base"], name="weather_forecast_latest_idx"),
+        ]
+
+    def __str__(self):
+        return f"({self.nx}, {self.ny}) : {timezone.localtime(self.base).strftime('%Y-%m-%d %H:%M')}"
+
+
+class WeatherRollup(models.Model):
+    '''지역별 시간/일 단위 날씨 요약 : 원본(WeatherData)은 요약 후 삭제'''
+    HOUR = "hour"
+    DAY = "day"
+    PERIOD_CHOICES = [
+        (HOUR, "시간"),
+        (DAY, "일"),
+    ]
+
+    city = models.ForeignKey(WeatherCity, on_delete=models.CASCADE, related_name="rollups")
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    start = models.DateTimeField() # 구간 시작 (한국 시간 기준 정시/자정)
+    samples = models.PositiveIntegerField(default=0) # 요약한 관측 수
+    temp_min = models.FloatField(blank=True, null=True)
+    temp_max = models.FloatField(blank=True, null=True)
+    temp_avg = models.FloatField(blank=True, null=True)
+    humidity_avg = models.FloatField(blank=True, null=True)
+    rain_total = models.FloatField(default=0) # 강수량 합계(mm)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["city", "period", "start"], name="unique_weather_rollup"),
+        ]
+
+    def __str__(self):
+        return f"{self.city} {self.period} : {timezone.localtime(self.start).strftime('%Y-%m-%d %H:%M')}"
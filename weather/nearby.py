@@ -0,0 +1,134 @@
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from .models import WeatherCity
+
+
+# 기상청 격자 (Lambert Conformal Conic) : 지구 반경, 격자 간격(km), 표준위도, 기준점
+RE = 6371.00877
+GRID = 5.0
+SLAT1 = 30.0
+SLAT2 = 60.0
+OLON = 126.0
+OLAT = 38.0
+XO = 43
+YO = 136
+
+DEGRAD = math.pi / 180.0
+_re = RE / GRID
+_slat1, _slat2, _olon, _olat = SLAT1 * DEGRAD, SLAT2 * DEGRAD, OLON * DEGRAD, OLAT * DEGRAD
+SN = math.log(math.cos(_slat1) / math.cos(_slat2)) / math.log(
+    math.tan(math.pi * 0.25 + _slat2 * 0.5) / math.tan(math.pi * 0.25 + _slat1 * 0.5))
+SF = math.tan(math.pi * 0.25 + _slat1 * 0.5) ** SN * math.cos(_slat1) / SN
+RO = _re * SF / math.tan(math.pi * 0.25 + _olat * 0.5) ** SN
+
+
+def to_grid(lat, lon):
+    '''위경도(배열 가능) -> 격자 좌표 (반올림 전 실수, nx = floor(x + 0.5))'''
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    ra = _re * SF / np.tan(math.pi * 0.25 + lat * DEGRAD * 0.5) ** SN
+    theta = lon * DEGRAD - _olon
+    theta = np.where(theta > math.pi, theta - 2 * math.pi, theta)
+    theta = np.where(theta < -math.pi, theta + 2 * math.pi, theta)
+    theta = theta * SN
+    x = ra * np.sin(theta) + XO
+    y = RO - ra * np.cos(theta) + YO
+    return x, y
+
+
+def to_grid_cell(lat, lon):
+    '''위경도(배열 가능) -> 기상청 격자 번호 (nx, ny)'''
+    x, y = to_grid(lat, lon)
+    return np.floor(x + 0.5).astype(np.int64), np.floor(y + 0.5).astype(np.int64)
+
+
+class GridIndex:
+    '''지역 격자 좌표를 일정 크기 구역(bucket)으로 나눈 최근접 검색 색인 (워커 프로세스마다 메모리에 보관)'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.names = []
+        self.points = np.empty((0, 2), dtype=np.float64)
+        self.buckets = {}   # (bx, by) -> 지역 번호 배열
+        self.bounds = None  # 구역 번호 범위 (최소 bx, by, 최대 bx, by)
+        self.built_at = None
+
+    def build(self):
+        cities = list(WeatherCity.objects.filter(nx__isnull=False, ny__isnull=False).values_list("id", "nx", "ny", "city"))
+        rows = np.array([city[:3] for city in cities], dtype=np.int64).reshape(-1, 3)
+        size = settings.WEATHER_GRID_BUCKET_SIZE
+        keys = np.floor_divide(rows[:, 1:], size)
+        buckets = {}
+        if len(rows):
+            # 같은 구역끼리 묶음
+            unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+            order = np.argsort(inverse.ravel(), kind="stable")
+            bounds = np.searchsorted(inverse.ravel()[order], np.arange(len(unique) + 1))
+            for index, (bx, by) in enumerate(unique.tolist()):
+                buckets[(bx, by)] = order[bounds[index]:bounds[index + 1]]
+            bounds = (*keys.min(axis=0).tolist(), *keys.max(axis=0).tolist())
+        else:
+            bounds = None
+        with self.lock:
+            self.ids = rows[:, 0]
+            self.names = [city[3] for city in cities]
+            self.points = rows[:, 1:].astype(np.float64)
+            self.buckets = buckets
+            self.bounds = bounds
+            self.built_at = time.monotonic()
+
+    def ensure_built(self):
+        '''처음 사용할 때 만들고, 다른 워커의 변경을 반영하도록 주기적으로 다시 만듦'''
+        if self.built_at is None or time.monotonic() - self.built_at > settings.WEATHER_GRID_INDEX_REFRESH_SECONDS:
+            self.build()
+
+    def invalidate(self):
+        with self.lock:
+            self.built_at = None
+
+    def get_ring(self, bx, by, ring):
+        '''(bx, by) 에서 체비쇼프 거리가 ring 인 구역들의 지역 번호'''
+        if ring == 0:
+            cells = [(bx, by)]
+        else:
+            cells = [(bx + dx, by + dy) for dx in range(-ring, ring + 1) for dy in (-ring, ring)]
+            cells += [(bx + dx, by + dy) for dx in (-ring, ring) for dy in range(-ring + 1, ring)]
+        found = [self.buckets[cell] for cell in cells if cell in self.buckets]
+        return np.concatenate(found) if found else None
+
+    def nearest(self, x, y, max_distance=math.inf):
+        '''격자 좌표 (x, y) 에서 max_distance 안의 가장 가까운 지역 -> (지역 id, 지역 이름, 격자 거리) 또는 None'''
+        self.ensure_built()
+        with self.lock:
+            if self.bounds is None:
+                return None
+            size = settings.WEATHER_GRID_BUCKET_SIZE
+            bx, by = math.floor(x / size), math.floor(y / size)
+            min_bx, min_by, max_bx, max_by = self.bounds
+            # 이 바깥으로는 구역이 없음
+            last_ring = max(bx - min_bx, max_bx - bx, by - min_by, max_by - by)
+            best, best_distance = None, math.inf
+            for ring in range(last_ring + 1):
+                if (ring - 1) * size > max_distance:
+                    break
+                candidates = self.get_ring(bx, by, ring)
+                if candidates is not None:
+                    distances = np.hypot(self.points[candidates, 0] - x, self.points[candidates, 1] - y)
+                    index = int(np.argmin(distances))
+                    if distances[index] < best_distance:
+                        best, best_distance = int(candidates[index]), float(distances[index])
+                # 다음 바깥 구역들은 적어도 ring * size 만큼 떨어져 있음
+                if best is not None and best_distance <= ring * size:
+                    break
+            if best is None or best_distance > max_distance:
+                return None
+            return int(self.ids[best]), self.names[best], best_distance
+
+
+grid_index = GridIndex()
@@ -0,0 +1,161 @@
+import logging
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import WeatherData, WeatherForecast, WeatherResponse, WeatherRollup
+from .snapshot import get_latest_weather
+
+
+logger = logging.getLogger(__name__)
+
+RAIN_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_rain(value):
+    '''1시간 강수량 문자열(강수없음, 1.0mm 미만, 30.0~50.0mm ...) -> mm'''
+    if value is None:
+        return 0.0
+    value = str(value)
+    match = RAIN_RE.search(value)
+    if match is None or "미만" in value:
+        return 0.0
+    return float(match.group())
+
+
+class Bucket:
+    '''구간 하나의 집계 (최소, 최대, 평균, 합계)'''
+    def __init__(self):
+        self.samples = 0
+        self.temp_min = None
+        self.temp_max = None
+        self.temp_sum = 0.0
+        self.temp_count = 0
+        self.humidity_sum = 0.0
+        self.humidity_count = 0
+        self.rain_total = 0.0
+
+    def add(self, samples, temp_min, temp_max, temp_sum, temp_count, humidity_sum, humidity_count, rain):
+        self.samples += samples
+        if temp_count:
+            self.temp_min = temp_min if self.temp_min is None else min(self.temp_min, temp_min)
+            self.temp_max = temp_max if self.temp_max is None else max(self.temp_max, temp_max)
+            self.temp_sum += temp_sum
+            self.temp_count += temp_count
+        self.humidity_sum += humidity_sum
+        self.humidity_count += humidity_count
+        self.rain_total += rain
+
+    def add_observation(self, temp, humidity, rain, samples=1):
+        # 값이 그대로여서 저장을 건너뛴 같은 시간의 수집도 관측 수로 셈 (WeatherData.samples)
+        self.add(samples, temp, temp, (temp or 0.0) * samples, samples if temp is not None else 0,
+                 (humidity or 0.0) * samples, samples if humidity is not None else 0, parse_rain(rain) * samples)
+
+    def add_rollup(self, rollup):
+        # 평균은 관측 수로 가중 (시간별 요약 -> 일별 요약)
+        has_temp = rollup.temp_avg is not None
+        has_humidity = rollup.humidity_avg is not None
+        self.add(rollup.samples, rollup.temp_min, rollup.temp_max,
+                 rollup.temp_avg * rollup.samples if has_temp else 0.0, rollup.samples if has_temp else 0,
+                 rollup.humidity_avg * rollup.samples if has_humidity else 0.0, rollup.samples if has_humidity else 0,
+                 rollup.rain_total)
+
+    def to_rollup(self, city_id, period, start):
+        return WeatherRollup(
+            city_id=city_id,
+            period=period,
+            start=start,
+            samples=self.samples,
+            temp_min=self.temp_min,
+            temp_max=self.temp_max,
+            temp_avg=self.temp_sum / self.temp_count if self.temp_count else None,
+            humidity_avg=self.humidity_sum / self.humidity_count if self.humidity_count else None,
+            rain_total=self.rain_total,
+        )
+
+
+def get_hour(timestamp):
+    return timezone.localtime(timestamp).replace(minute=0, second=0, microsecond=0)
+
+
+def get_day(timestamp):
+    return timezone.localtime(timestamp).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def rollup_hours(cutoff):
+    '''cutoff 이전 원본을 시간별로 요약 -> 새로 요약한 (지역, 날짜) 목록
+
+    이미 요약한 시간은 건너뜀 : 요약 후 삭제 도중 멈췄다가 다시 실행해도 두 번 더하지 않음.
+    '''
+    buckets = defaultdict(Bucket)
+    rows = (
+        WeatherData.objects.filter(city__isnull=False, timestamp__lt=cutoff)
+        .values_list("city_id", "timestamp", "temp", "humidity", "rain", "samples")
+    )
+    for city_id, timestamp, temp, humidity, rain, samples in rows.iterator(chunk_size=settings.WEATHER_RETENTION_CHUNK_SIZE):
+        buckets[(city_id, get_hour(timestamp))].add_observation(temp, humidity, rain, samples)
+    if not buckets:
+        return set()
+
+    existing = set(
+        WeatherRollup.objects.filter(
+            period=WeatherRollup.HOUR, start__lt=cutoff, start__gte=min(start for _, start in buckets))
+        .values_list("city_id", "start")
+    )
+    rollups = [
+        bucket.to_rollup(city_id, WeatherRollup.HOUR, start)
+        for (city_id, start), bucket in buckets.items()
+        if (city_id, start) not in existing
+    ]
+    WeatherRollup.objects.bulk_create(rollups, batch_size=settings.WEATHER_RETENTION_CHUNK_SIZE, ignore_conflicts=True)
+    return {(rollup.city_id, get_day(rollup.start)) for rollup in rollups}
+
+
+def rollup_days(days):
+    '''시간별 요약으로 일별 요약을 다시 계산'''
+    for city_id, day in days:
+        bucket = Bucket()
+        hours = WeatherRollup.objects.filter(
+            city_id=city_id, period=WeatherRollup.HOUR, start__gte=day, start__lt=day + timedelta(days=1))
+        for rollup in hours:
+            bucket.add_rollup(rollup)
+        daily = bucket.to_rollup(city_id, WeatherRollup.DAY, day)
+        WeatherRollup.objects.update_or_create(
+            city_id=city_id, period=WeatherRollup.DAY, start=day,
+            defaults={field: getattr(daily, field) for field in (
+                "samples", "temp_min", "temp_max", "temp_avg", "humidity_avg", "rain_total")},
+        )
+
+
+def delete_in_chunks(queryset):
+    '''기본키 순서로 WEATHER_RETENTION_CHUNK_SIZE 개씩 삭제 (테이블을 오래 잠그지 않음)'''
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:settings.WEATHER_RETENTION_CHUNK_SIZE])
+        if not pks:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+
+def compact_weather(now=None):
+    '''어제 혹은 어제보다 이전 원본을 시간/일별로 요약한 뒤 삭제, 오래된 시간별 요약, 저장된 응답과 예보도 삭제'''
+    cutoff = get_day(now or timezone.now())
+    with transaction.atomic():
+        days = rollup_hours(cutoff)
+        rollup_days(days)
+    # 지역별 최신 관측은 수집이 멈춰도 현재 날씨(WeatherView)에 남도록 지우지 않음 (이미 요약했으므로 다시 더하지 않음)
+    latest = list(get_latest_weather().values_list("pk", flat=True))
+    raw_deleted = delete_in_chunks(WeatherData.objects.filter(timestamp__lt=cutoff).exclude(pk__in=latest))
+
+    hourly_cutoff = cutoff - timedelta(days=settings.WEATHER_HOURLY_RETENTION_DAYS)
+    hourly_deleted = delete_in_chunks(
+        WeatherRollup.objects.filter(period=WeatherRollup.HOUR, start__lt=hourly_cutoff))
+    # 지난 발표분 응답과 예보는 다시 쓰지 않음
+    delete_in_chunks(WeatherResponse.objects.filter(fetched_at__lt=cutoff))
+    delete_in_chunks(WeatherForecast.objects.filter(base__lt=cutoff))
+    logger.info("날씨 요약 %d일, 원본 %d개, 시간별 요약 %d개 삭제", len(days), raw_deleted, hourly_deleted)
+    return raw_deleted
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import WeatherCity, WeatherData
+from .models import WeatherCity, WeatherData, WeatherRollup
 
 class WeatherCitySerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,4 +12,10 @@ class WeatherDataSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = WeatherData
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['samples']
+
+
+class WeatherRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WeatherRollup
+        fields = ['period', 'start', 'samples', 'temp_min', 'temp_max', 'temp_avg', 'humidity_avg', 'rain_total']
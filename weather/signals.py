@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from weather.models import WeatherCity, WeatherData
+from weather.nearby import grid_index
+from weather.snapshot import invalidate_weather_snapshot
+
+
+@receiver([post_save, post_delete], sender=WeatherData)
+@receiver([post_save, post_delete], sender=WeatherCity)
+def weather_snapshot_invalidate(sender, **kwargs):
+    '''관리자 페이지 등에서 날씨, 지역이 바뀌면 스냅샷 삭제 (수집은 bulk_create 후 직접 갱신)'''
+    invalidate_weather_snapshot()
+
+
+@receiver([post_save, post_delete], sender=WeatherCity)
+def grid_index_invalidate(sender, **kwargs):
+    '''지역이 바뀌면 다음 검색 때 최근접 색인을 다시 만듦'''
+    grid_index.invalidate()
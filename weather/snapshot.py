@@ -0,0 +1,62 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import WeatherData
+from .serializers import WeatherDataSerializer
+
+
+SNAPSHOT_KEY = "weather:snapshot"
+
+
+def get_snapshot_cache():
+    return caches[settings.WEATHER_SNAPSHOT_CACHE_ALIAS]
+
+
+def get_latest_weather():
+    '''지역별 최신 날씨 : (city, -timestamp) 인덱스로 쿼리 한 번'''
+    latest = (
+        WeatherData.objects.filter(city=OuterRef("city"))
+        .order_by("-timestamp", "-id")
+        .values("id")[:1]
+    )
+    return (
+        WeatherData.objects.filter(city__isnull=False, id=Subquery(latest))
+        .select_related("city")
+        .order_by("city_id")
+    )
+
+
+def build_weather_snapshot():
+    '''직렬화까지 끝낸 응답 본문과 ETag'''
+    data = WeatherDataSerializer(get_latest_weather(), many=True).data
+    body = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+    etag = hashlib.sha1(body).hexdigest()
+    return {"body": body, "etag": etag}
+
+
+def refresh_weather_snapshot():
+    '''스냅샷을 새로 만들어 캐시에 저장 (수집 직후 호출)'''
+    snapshot = build_weather_snapshot()
+    get_snapshot_cache().set(SNAPSHOT_KEY, snapshot, settings.WEATHER_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def get_weather_snapshot():
+    '''캐시된 스냅샷, 없으면 새로 만듦'''
+    snapshot = get_snapshot_cache().get(SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = refresh_weather_snapshot()
+    return snapshot
+
+
+def invalidate_weather_snapshot():
+    '''지금 한 번, 커밋 후 한 번 더 삭제 : 커밋 전에 다시 채워진 스냅샷도 버림'''
+    cache = get_snapshot_cache()
+    cache.delete(SNAPSHOT_KEY)
+    transaction.on_commit(lambda: cache.delete(SNAPSHOT_KEY))
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from weather.collector import collect_weather, get_base_datetime
+from weather.models import WeatherCity, WeatherData, WeatherResponse
+from weather.snapshot import get_weather_snapshot
+
+
+class StubKMAServer:
+    '''기상청 초단기실황/단기예보 API 흉내 : nx 별로 실패 횟수를 정할 수 있고 동시 요청 수를 기록'''
+    def __init__(self, delay=0):
+        self.failures = {}
+        self.temp = "25.5"
+        self.forecast_items = []
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                with server.lock:
+                    server.requests.append(params)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    failing = server.failures.get(params["nx"], 0) > 0
+                    if failing:
+                        server.failures[params["nx"]] -= 1
+                time.sleep(delay)
+                with server.lock:
+                    server.in_flight -= 1
+
+                if failing:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                items = server.forecast_items if "getVilageFcst" in self.path else [
+                    {"category": "T1H", "obsrValue": server.temp},
+                    {"category": "REH", "obsrValue": params["nx"]},
+                    {"category": "PTY", "obsrValue": "0"},
+                    {"category": "RN1", "obsrValue": "강수없음"},
+                ]
+                payload = json.dumps({"response": {"body": {"items": {"item": items}}}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/getUltraSrtNcst"
+        self.forecast_url = f"http://127.0.0.1:{self.httpd.server_port}/getVilageFcst"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@override_settings(WEATHER_RETRY_BASE_SECONDS=0, WEATHER_CONCURRENCY=2, WEATHER_MAX_RETRIES=3)
+class WeatherCollectorTest(TestCase):
+    def setUp(self):
+        for i in range(5):
+            WeatherCity.objects.create(city=f"city{i}", nx=60 + i, ny=127)
+
+    def start_server(self, delay=0):
+        server = StubKMAServer(delay)
+        self.addCleanup(server.close)
+        settings = override_settings(WEATHER_API_URL=server.url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        return server
+
+    def test_collect_all_cities(self):
+        '''모든 지역을 조회해서 한 번에 저장 (지역, 저장된 응답, 직전 관측, 응답 저장, 날씨 저장, 스냅샷 쿼리)'''
+        self.start_server()
+        with CaptureQueriesContext(connection) as context:
+            collect_weather()
+        # 공용 캐시(스냅샷 저장) 쿼리 제외
+        queries = [query for query in context.captured_queries if '"weather_' in query["sql"]]
+        self.assertEqual(len(queries), 6)
+        self.assertEqual(WeatherData.objects.count(), 5)
+        weather = WeatherData.objects.get(city__city="city3")
+        self.assertEqual((weather.temp, weather.humidity, weather.rain, weather.sky), (25.5, 63, "강수없음", 0))
+
+    def test_refresh_snapshot(self):
+        '''수집 후 스냅샷 갱신 (bulk_create 는 시그널이 없음)'''
+        self.start_server()
+        self.assertEqual(get_weather_snapshot()["body"], b"[]")
+        collect_weather()
+        self.assertEqual(len(json.loads(get_weather_snapshot()["body"])), 5)
+
+    def test_bounded_concurrency(self):
+        '''동시 요청 수는 WEATHER_CONCURRENCY 이하'''
+        server = self.start_server(delay=0.1)
+        collect_weather()
+        self.assertEqual(len(server.requests), 5)
+        self.assertLessEqual(server.max_in_flight, 2)
+
+    def test_retry(self):
+        '''실패하면 재시도, 끝내 실패한 지역만 빠짐'''
+        server = self.start_server()
+        server.failures = {"60": 2, "61": 3}
+        collect_weather()
+        self.assertEqual(sum(request["nx"] == "60" for request in server.requests), 3)
+        self.assertEqual(
+            sorted(WeatherData.objects.values_list("city__city", flat=True)),
+            ["city0", "city2", "city3", "city4"])
+
+    def test_shared_grid(self):
+        '''같은 격자의 지역은 한 번만 조회'''
+        server = self.start_server()
+        WeatherCity.objects.create(city="same grid", nx=60, ny=127)
+        collect_weather()
+        self.assertEqual(len(server.requests), 5)
+        self.assertEqual(WeatherData.objects.count(), 6)
+        self.assertEqual(WeatherData.objects.get(city__city="same grid").humidity, 60)
+
+    def test_response_cache(self):
+        '''같은 발표분은 저장된 응답 사용, 다음 발표분은 다시 조회'''
+        server = self.start_server()
+        now = timezone.now()
+        collect_weather(now)
+        self.assertEqual(WeatherResponse.objects.count(), 5)
+        collect_weather(now)
+        self.assertEqual(len(server.requests), 5)
+        collect_weather(now + timedelta(hours=1))
+        self.assertEqual(len(server.requests), 10)
+
+    def test_skip_unchanged(self):
+        '''직전 관측과 값이 같으면 저장하지 않음'''
+        server = self.start_server()
+        now = timezone.now()
+        self.assertEqual(len(collect_weather(now)), 5)
+        self.assertEqual(collect_weather(now + timedelta(hours=1)), [])
+        # 건너뛴 수집은 직전 행의 관측 수로 남음
+        self.assertEqual(set(WeatherData.objects.values_list("samples", flat=True)), {2})
+        server.temp = "26.0"
+        self.assertEqual(len(collect_weather(now + timedelta(hours=2))), 5)
+        self.assertEqual(WeatherData.objects.count(), 10)
+
+    def test_unchanged_new_hour(self):
+        '''값이 그대로여도 시간이 바뀌면 새 행 : 관측 수는 그 행의 시간에만 속함'''
+        self.start_server()
+        now = timezone.now()
+        collect_weather(now)
+        WeatherData.objects.update(timestamp=now - timedelta(hours=1))
+        self.assertEqual(len(collect_weather(now + timedelta(hours=1))), 5)
+        self.assertEqual(set(WeatherData.objects.values_list("samples", flat=True)), {1})
+
+    def test_base_datetime(self):
+        '''한 시간 전 30분 발표분, 자정에는 전날 23시 30분'''
+        midnight = timezone.make_aware(datetime(2023, 7, 1, 0, 10))
+        self.assertEqual(get_base_datetime(midnight), ("20230630", "2330"))
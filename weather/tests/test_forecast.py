@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from weather.forecast import VARIABLES, collect_forecasts, decode_forecast, encode_forecast, get_forecast_base
+from weather.models import WeatherCity, WeatherForecast
+from weather.tests.test_collector import StubKMAServer
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def make_items(hours=3):
+    '''2023-07-01 15시부터 hours 시간치 예보 항목'''
+    items = []
+    for hour in range(hours):
+        when = datetime(2023, 7, 1, 15) + timedelta(hours=hour)
+        date, time = when.strftime("%Y%m%d"), when.strftime("%H%M")
+        items += [
+            {"category": "TMP", "fcstDate": date, "fcstTime": time, "fcstValue": str(25 + hour)},
+            {"category": "REH", "fcstDate": date, "fcstTime": time, "fcstValue": "60"},
+            {"category": "PCP", "fcstDate": date, "fcstTime": time, "fcstValue": "1.5mm" if hour else "강수없음"},
+            {"category": "WSD", "fcstDate": date, "fcstTime": time, "fcstValue": "2.3"},
+            # 저장하지 않는 카테고리
+            {"category": "VEC", "fcstDate": date, "fcstTime": time, "fcstValue": "180"},
+        ]
+    # 하루 한 번만 오는 항목이나 빠진 시간은 None
+    items.append({"category": "POP", "fcstDate": "20230701", "fcstTime": "1600", "fcstValue": "30"})
+    return items
+
+
+class WeatherForecastTest(TestCase):
+    def test_forecast_base(self):
+        '''02시부터 3시간 간격 발표, 10분 뒤부터 조회'''
+        self.assertEqual(get_forecast_base(local(2023, 7, 1, 14, 5)), local(2023, 7, 1, 11))
+        self.assertEqual(get_forecast_base(local(2023, 7, 1, 14, 10)), local(2023, 7, 1, 14))
+        self.assertEqual(get_forecast_base(local(2023, 7, 1, 1, 0)), local(2023, 6, 30, 23))
+
+    def test_encode_decode(self):
+        start, hours, values = encode_forecast(make_items())
+        self.assertEqual((start, hours), (local(2023, 7, 1, 15), 3))
+        forecast = WeatherForecast(start=start, hours=hours, variables=",".join(VARIABLES), values=values)
+        data = decode_forecast(forecast)
+        self.assertEqual(data["times"], ["2023-07-01T06:00Z", "2023-07-01T07:00Z", "2023-07-01T08:00Z"])
+        self.assertEqual(data["temp"], [25, 26, 27])
+        self.assertEqual(data["rain"], [0, 1.5, 1.5])
+        self.assertEqual(data["wind_speed"], [2.3, 2.3, 2.3])
+        self.assertEqual(data["rain_probability"], [None, 30, None])
+        self.assertEqual(data["sky"], [None, None, None])
+
+
+@override_settings(WEATHER_RETRY_BASE_SECONDS=0, WEATHER_MAX_RETRIES=1)
+class CollectForecastTest(TestCase):
+    def setUp(self):
+        WeatherCity.objects.create(city="서울", nx=60, ny=127)
+        WeatherCity.objects.create(city="서울 중구", nx=60, ny=127)
+        WeatherCity.objects.create(city="세종", nx=66, ny=103)
+        self.server = StubKMAServer()
+        self.addCleanup(self.server.close)
+        self.server.forecast_items = make_items(72)
+        settings = override_settings(WEATHER_FORECAST_URL=self.server.forecast_url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_collect_once_per_grid(self):
+        '''격자마다 한 행, 같은 발표분은 다시 조회하지 않음'''
+        now = local(2023, 7, 1, 14, 30)
+        self.assertEqual(len(collect_forecasts(now)), 2)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[0]["base_time"], "1400")
+        forecast = WeatherForecast.objects.get(nx=60, ny=127)
+        self.assertEqual((forecast.base, forecast.hours), (local(2023, 7, 1, 14), 72))
+
+        self.assertEqual(collect_forecasts(now), [])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_failed_grid(self):
+        self.server.failures = {"66": 1}
+        collect_forecasts(local(2023, 7, 1, 14, 30))
+        self.assertEqual(list(WeatherForecast.objects.values_list("nx", flat=True)), [60])
+
+
+class WeatherForecastViewTest(APITestCase):
+    def setUp(self):
+        WeatherCity.objects.create(city="서울", nx=60, ny=127)
+        start, hours, values = encode_forecast(make_items())
+        for base in (local(2023, 7, 1, 11), local(2023, 7, 1, 14)):
+            WeatherForecast.objects.create(
+                nx=60, ny=127, base=base, start=start, hours=hours, variables=",".join(VARIABLES), values=values)
+
+    def test_forecast_view(self):
+        '''지역 격자를 찾은 뒤 최신 발표분 한 행만 조회'''
+        url = reverse('weather_forecast_view')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"city": "서울"})
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("EXISTS", queries[1]["sql"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["base"], local(2023, 7, 1, 14))
+        self.assertEqual(response.data["temp"], [25, 26, 27])
+
+        response = self.client.get(url, {"city": "서울"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_city(self):
+        response = self.client.get(reverse('weather_forecast_view'), {"city": "부산"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_city(self):
+        '''지역이 없으면 이름이 비어 있는 지역과 맞추지 않고 400'''
+        WeatherCity.objects.create(city=None, nx=60, ny=127)
+        url = reverse('weather_forecast_view')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {"city": ""}).status_code, 400)
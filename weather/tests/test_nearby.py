@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from weather.models import WeatherCity, WeatherData
+from weather.nearby import GridIndex, to_grid, to_grid_cell
+
+
+class GridConversionTest(TestCase):
+    def test_to_grid_cell(self):
+        '''기상청 격자 변환 (서울, 세종, 부산, 제주)'''
+        nx, ny = to_grid_cell([37.5665, 36.4800, 35.1796, 33.4996], [126.9780, 127.2890, 129.0756, 126.5312])
+        self.assertEqual(list(zip(nx.tolist(), ny.tolist())), [(60, 127), (66, 103), (98, 76), (53, 38)])
+
+    def test_scalar(self):
+        x, y = to_grid(37.5665, 126.9780)
+        self.assertEqual((int(np.floor(x + 0.5)), int(np.floor(y + 0.5))), (60, 127))
+
+
+@override_settings(WEATHER_GRID_BUCKET_SIZE=4)
+class GridIndexTest(TestCase):
+    def test_matches_brute_force(self):
+        '''구역 색인 결과가 전체 비교와 같음'''
+        rng = random.Random(0)
+        points = {(rng.randint(20, 140), rng.randint(10, 150)) for _ in range(300)}
+        WeatherCity.objects.bulk_create([WeatherCity(city=f"{nx},{ny}", nx=nx, ny=ny) for nx, ny in points])
+        cities = list(WeatherCity.objects.values_list("id", "nx", "ny"))
+        index = GridIndex()
+        for _ in range(200):
+            x, y = rng.uniform(0, 160), rng.uniform(0, 160)
+            city_id, name, distance = index.nearest(x, y)
+            expected = min(((nx - x) ** 2 + (ny - y) ** 2) ** 0.5 for _, nx, ny in cities)
+            self.assertAlmostEqual(distance, expected)
+
+    def test_max_distance(self):
+        WeatherCity.objects.create(city="서울", nx=60, ny=127)
+        index = GridIndex()
+        self.assertIsNone(index.nearest(100, 50, max_distance=10))
+        self.assertEqual(index.nearest(61, 127, max_distance=10)[1], "서울")
+
+    def test_empty(self):
+        self.assertIsNone(GridIndex().nearest(60, 127))
+
+
+class WeatherNearbyViewTest(APITestCase):
+    def setUp(self):
+        self.seoul = WeatherCity.objects.create(city="서울", nx=60, ny=127)
+        self.sejong = WeatherCity.objects.create(city="세종", nx=66, ny=103)
+        WeatherData.objects.create(city=self.seoul, temp=31, humidity=57, rain="강수없음", sky=0)
+        self.latest = WeatherData.objects.create(city=self.seoul, temp=29, humidity=60, rain="강수없음", sky=0)
+
+    def test_nearby(self):
+        url = reverse('weather_nearby_view')
+        response = self.client.get(url, {"lat": 37.55, "lon": 126.99})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["city"], response.data["weather"]["id"]), ("서울", self.latest.id))
+
+        response = self.client.get(url, {"lat": 36.5, "lon": 127.3})
+        self.assertEqual(response.data["city"], "세종")
+        self.assertIsNone(response.data["weather"])
+
+    def test_city_change(self):
+        '''지역이 추가되면 색인 다시 만듦'''
+        url = reverse('weather_nearby_view')
+        self.client.get(url, {"lat": 35.18, "lon": 129.08})
+        WeatherCity.objects.create(city="부산", nx=98, ny=76)
+        response = self.client.get(url, {"lat": 35.18, "lon": 129.08})
+        self.assertEqual(response.data["city"], "부산")
+
+    def test_invalid(self):
+        url = reverse('weather_nearby_view')
+        self.assertEqual(self.client.get(url, {"lat": "abc", "lon": 127}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"lat": 37.5}).status_code, 400)
+        # 서비스 지역 밖
+        self.assertEqual(self.client.get(url, {"lat": 35.68, "lon": 139.69}).status_code, 404)
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from weather.models import WeatherCity, WeatherData, WeatherResponse, WeatherRollup
+from weather.retention import compact_weather, parse_rain
+from weather.views import delete_weather
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def add_weather(city, timestamp, temp, humidity, rain="강수없음"):
+    weather = WeatherData.objects.create(city=city, temp=temp, humidity=humidity, rain=rain, sky=0)
+    # timestamp 는 auto_now 라서 저장 후 변경
+    WeatherData.objects.filter(pk=weather.pk).update(timestamp=timestamp)
+    return weather
+
+
+@override_settings(WEATHER_RETENTION_CHUNK_SIZE=2)
+class WeatherRetentionTest(TestCase):
+    def setUp(self):
+        self.seoul = WeatherCity.objects.create(city="서울", nx=60, ny=127)
+        self.now = local(2023, 7, 3, 13, 0)
+        add_weather(self.seoul, local(2023, 7, 1, 10, 5), 25, 60, "1.5")
+        add_weather(self.seoul, local(2023, 7, 1, 10, 40), 27, 70, "2.5mm")
+        add_weather(self.seoul, local(2023, 7, 1, 14, 0), 31, 50, "1mm 미만")
+        add_weather(self.seoul, local(2023, 7, 2, 0, 0), 20, 90)
+        self.today = add_weather(self.seoul, local(2023, 7, 3, 9, 0), 22, 80)
+
+    def test_parse_rain(self):
+        self.assertEqual([parse_rain(value) for value in ("강수없음", "0", "3.0mm", "1mm 미만", "30.0~50.0mm", None)],
+                         [0.0, 0.0, 3.0, 0.0, 30.0, 0.0])
+
+    def test_rollup_and_delete(self):
+        '''어제 이전 원본은 시간/일별로 요약 후 삭제, 오늘 원본은 유지'''
+        self.assertEqual(compact_weather(self.now), 4)
+        self.assertEqual(list(WeatherData.objects.values_list("pk", flat=True)), [self.today.pk])
+
+        hour = WeatherRollup.objects.get(period=WeatherRollup.HOUR, start=local(2023, 7, 1, 10))
+        self.assertEqual((hour.samples, hour.temp_min, hour.temp_max, hour.temp_avg, hour.humidity_avg, hour.rain_total),
+                         (2, 25, 27, 26, 65, 4.0))
+        day = WeatherRollup.objects.get(period=WeatherRollup.DAY, start=local(2023, 7, 1))
+        self.assertEqual((day.samples, day.temp_min, day.temp_max, day.temp_avg, day.rain_total),
+                         (3, 25, 31, 27.666666666666668, 4.0))
+        self.assertEqual(WeatherRollup.objects.filter(period=WeatherRollup.DAY).count(), 2)
+
+    def test_unchanged_samples_counted(self):
+        '''값이 그대로여서 건너뛴 수집도 관측 수와 강수량 합계에 포함'''
+        WeatherData.objects.filter(timestamp=local(2023, 7, 1, 10, 40)).update(samples=3)
+        compact_weather(self.now)
+        hour = WeatherRollup.objects.get(period=WeatherRollup.HOUR, start=local(2023, 7, 1, 10))
+        self.assertEqual((hour.samples, hour.temp_avg, hour.humidity_avg, hour.rain_total),
+                         (4, 26.5, 67.5, 9.0))
+        day = WeatherRollup.objects.get(period=WeatherRollup.DAY, start=local(2023, 7, 1))
+        self.assertEqual((day.samples, day.rain_total), (5, 9.0))
+
+    def test_keep_latest_observation(self):
+        '''수집이 멈춘 지역의 최신 관측은 지우지 않고, 다시 요약해도 두 번 더하지 않음'''
+        busan = WeatherCity.objects.create(city="부산", nx=98, ny=76)
+        old = add_weather(busan, local(2023, 7, 1, 10, 0), 28, 70)
+        latest = add_weather(busan, local(2023, 7, 1, 11, 0), 29, 75)
+        compact_weather(self.now)
+        self.assertEqual(list(WeatherData.objects.filter(city=busan).values_list("pk", flat=True)), [latest.pk])
+        self.assertFalse(WeatherData.objects.filter(pk=old.pk).exists())
+        compact_weather(self.now)
+        day = WeatherRollup.objects.get(city=busan, period=WeatherRollup.DAY, start=local(2023, 7, 1))
+        self.assertEqual(day.samples, 2)
+        response = self.client.get(reverse("weather_view"))
+        self.assertIn("부산", [data["city"] for data in response.json()])
+
+    def test_rerun_does_not_double_count(self):
+        '''요약 후 삭제 전에 멈췄다가 다시 실행해도 같은 결과'''
+        compact_weather(self.now)
+        add_weather(self.seoul, local(2023, 7, 1, 10, 50), 29, 80)
+        compact_weather(self.now)
+        hour = WeatherRollup.objects.get(period=WeatherRollup.HOUR, start=local(2023, 7, 1, 10))
+        self.assertEqual(hour.samples, 2)
+        self.assertFalse(WeatherData.objects.filter(timestamp__lt=local(2023, 7, 3)).exists())
+
+    def test_delete_old_responses(self):
+        '''지난 발표분 응답 삭제'''
+        old = WeatherResponse.objects.create(nx=60, ny=127, base_date="20230701", base_time="0930", data={})
+        WeatherResponse.objects.filter(pk=old.pk).update(fetched_at=local(2023, 7, 1, 10, 0))
+        current = WeatherResponse.objects.create(nx=60, ny=127, base_date="20230703", base_time="1230", data={})
+        WeatherResponse.objects.filter(pk=current.pk).update(fetched_at=local(2023, 7, 3, 12, 40))
+        compact_weather(self.now)
+        self.assertEqual(list(WeatherResponse.objects.values_list("pk", flat=True)), [current.pk])
+
+    @override_settings(WEATHER_HOURLY_RETENTION_DAYS=1)
+    def test_hourly_retention(self):
+        '''오래된 시간별 요약은 삭제, 일별 요약은 유지'''
+        compact_weather(self.now)
+        self.assertEqual(
+            sorted(timezone.localtime(start).day for start in WeatherRollup.objects.filter(
+                period=WeatherRollup.HOUR).values_list("start", flat=True)),
+            [2])
+        self.assertEqual(WeatherRollup.objects.filter(period=WeatherRollup.DAY).count(), 2)
+
+    def test_delete_weather(self):
+        '''기존 삭제 작업도 요약을 거쳐서 삭제'''
+        WeatherData.objects.filter(pk=self.today.pk).update(timestamp=timezone.now())
+        delete_weather()
+        self.assertEqual(WeatherData.objects.count(), 1)
+        self.assertTrue(WeatherRollup.objects.exists())
+
+
+class WeatherHistoryViewTest(APITestCase):
+    def setUp(self):
+        self.seoul = WeatherCity.objects.create(city="서울", nx=60, ny=127)
+        today = timezone.localdate()
+        for days in range(3):
+            start = timezone.make_aware(datetime.combine(today - timedelta(days=days), datetime.min.time()))
+            WeatherRollup.objects.create(city=self.seoul, period=WeatherRollup.DAY, start=start,
+                                         samples=12, temp_min=20, temp_max=30 + days, temp_avg=25, rain_total=0)
+        WeatherRollup.objects.create(city=self.seoul, period=WeatherRollup.HOUR, start=timezone.now(), samples=1)
+
+    def test_daily_history(self):
+        response = self.client.get(reverse('weather_history_view'), {"city": "서울"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['temp_max'] for row in response.data], [32, 31, 30])
+
+    def test_range(self):
+        today = timezone.localdate()
+        response = self.client.get(reverse('weather_history_view'), {
+            "city": "서울", "start_date": str(today - timedelta(days=1)), "end_date": str(today)})
+        self.assertEqual(len(response.data), 2)
+
+    def test_invalid(self):
+        url = reverse('weather_history_view')
+        self.assertEqual(self.client.get(url, {"city": "서울", "period": "week"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"city": "서울", "start_date": "2020-01-01"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"city": "부산"}).status_code, 404)
@@ -1,5 +1,7 @@
 from rest_framework.test import APITestCase, APIClient
 from weather.models import WeatherCity, WeatherData
+from weather.snapshot import get_snapshot_cache, SNAPSHOT_KEY
+from django.core.cache.backends.locmem import LocMemCache
 from django.urls import reverse
 
 class WeatherViewTest(APITestCase):
@@ -17,17 +19,49 @@ class WeatherViewTest(APITestCase):
         url = reverse('weather_view')
         response = self.client.get(url, format='json')
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_latest_weather(self):
+        '''지역별 가장 최근 날씨'''
+        response = self.client.get(reverse('weather_view'))
+        self.assertEqual(sorted(weather['id'] for weather in response.json()), [self.weather2.id, self.weather3.id])
+        self.assertEqual({weather['city'] for weather in response.json()}, {"서울", "세종"})
+
+    def test_snapshot_without_queries(self):
+        '''두 번째 요청은 날씨 조회 없이 스냅샷(공용 캐시 한 번)으로 응답'''
+        url = reverse('weather_view')
+        first = self.client.get(url)
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+
+    def test_shared_snapshot_cache(self):
+        '''스케줄러 프로세스에서 갱신한 스냅샷을 웹 워커도 보도록 프로세스 공용 캐시 사용'''
+        self.assertNotIsInstance(get_snapshot_cache(), LocMemCache)
+
+    def test_not_modified(self):
+        '''ETag 가 같으면 304'''
+        url = reverse('weather_view')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        WeatherData.objects.create(city=self.city2, temp=20, humidity=70, rain=0, sky=0)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
 
 class WeatherViewNoDataTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
+        # 다른 테스트에서 만든 스냅샷 제거
+        get_snapshot_cache().delete(SNAPSHOT_KEY)
 
     def test_weather_view_no_data(self):
         url = reverse('weather_view')
         response = self.client.get(url, format='json')
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.json()), 0)
 
 # 테스트 실행 명령어
 # python manage.py test weather.tests.test_views -v 3
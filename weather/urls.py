@@ -3,6 +3,9 @@ from weather import views
 
 urlpatterns = [
     path("", views.WeatherView.as_view(), name="weather_view"),
+    path("forecast/", views.WeatherForecastView.as_view(), name="weather_forecast_view"),
+    path("nearby/", views.WeatherNearbyView.as_view(), name="weather_nearby_view"),
+    path("history/", views.WeatherHistoryView.as_view(), name="weather_history_view"),
 ]
 
 
@@ -1,148 +1,152 @@
-import os
-import requests
-from .models import WeatherCity, WeatherData
-from datetime import date, datetime, timedelta
-from urllib.parse import urlencode, quote_plus, unquote
-from .serializers import WeatherDataSerializer
+from .models import WeatherCity, WeatherData, WeatherForecast, WeatherRollup
+from datetime import datetime, time, timedelta
+from .collector import collect_weather, load_grids
+from .snapshot import get_weather_snapshot
+from .retention import compact_weather
+from .forecast import decode_forecast
+from .nearby import GRID, grid_index, to_grid
+from nuriggun.querybudget import query_budget
+from .serializers import WeatherDataSerializer, WeatherRollupSerializer
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
-from apscheduler.schedulers.background import BackgroundScheduler
-import requests
-import time
-
-MAX_RETRIES = 3
+from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 def load_weather(nx, ny):
-    retry_count = 0
-
-    while retry_count < MAX_RETRIES:
-        try:
-            url = "https://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getUltraSrtNcst"
-
-            serviceKey = os.environ.get('WEATHER_API_KEY')
-            serviceKeyDecoded = unquote(serviceKey, 'UTF-8')
-
-            now = datetime.now()
-            today = datetime.today().strftime("%Y%m%d")
-            y = date.today() - timedelta(days=1)
-            yesterday = y.strftime("%Y%m%d")
-
-            pre_hour = (now.hour - 1) if now.hour != 0 else 23
-            if pre_hour < 10:  
-                base_time = "0" + str(pre_hour) + "30"
-            else:
-                base_time = str(pre_hour) + "30"
-
-            if now.hour == 0:
-                base_date = yesterday
-            else:
-                base_date = today
-
-            queryParams = '?' + urlencode({ quote_plus('serviceKey') : serviceKeyDecoded, quote_plus('base_date') : base_date,
-                                            quote_plus('base_time') : base_time, quote_plus('nx') : nx, quote_plus('ny') : ny,
-                                            quote_plus('dataType') : 'json', quote_plus('numOfRows') : '1000'})
-            
-            res = requests.get(url + queryParams, verify=False)
-
-            items = res.json().get('response').get('body').get('items')
-
-            data = dict()
-
-            data['date'] = base_date
-
-            weather_data = dict()
-
-            for item in items['item']:
-                # 기온
-                if item['category'] == 'T1H':
-                    weather_data['tmp'] = item['obsrValue']
-                # 습도
-                if item['category'] == 'REH':
-                    weather_data['hum'] = item['obsrValue']
-                # 강수타입: 없음(0), 비(1), 비/눈(2), 눈(3), 빗방울(5), 빗방울눈날림(6), 눈날림(7)
-                if item['category'] == 'PTY':
-                    weather_data['sky'] = item['obsrValue']
-                # 1시간 동안 강수량
-                if item['category'] == 'RN1':
-                    weather_data['rain'] = item['obsrValue']
-
-            return weather_data
-    
-        except requests.exceptions.RequestException as e:
-            print(f"요청 중 에러 발생 : {e}")
-
-        except ValueError:
-            print(f"데이터를 불러오지 못함 nx={nx}, ny={ny} \n응답 : {res.text}")
-
-        except Exception as e:
-            print(f"알 수 없는 에러 발생: {e}")
-        
-        print(f"에러 발생. {retry_count+1} 번째 재시도합니다.")
-        time.sleep(2)  
-        retry_count += 1
-
-    print(f"최대 재시도 횟수를 초과했습니다. nx={nx}, ny={ny}")
-    return None
+    '''격자 하나의 현재 날씨 (실패하면 None)'''
+    return load_grids([(nx, ny)])[(nx, ny)]
 
 def save_weather():
-    cities = WeatherCity.objects.all()
-
-    if not cities:
-        print("지역정보가 없습니다.")
-        return
-    
-    for city in cities:
-
-        weather_data = load_weather(city.nx, city.ny)
-
-        if weather_data is None:
-            print(f"{city}지역 날씨 데이터를 불러오는 데 실패했습니다.")
-            continue
-
-        try:
-            weather_data_instance = WeatherData.objects.create(
-                city = city,
-                timestamp = datetime.now(),  
-                temp = weather_data['tmp'],
-                humidity = weather_data['hum'],
-                rain = weather_data['rain'],
-                sky = weather_data['sky'],
-            )
-        except UnboundLocalError as e:
-            print("날씨데이터 생성 에러: ", e)
-            continue
-        
-    serializer = WeatherDataSerializer(weather_data_instance)
-    return JsonResponse(serializer.data, safe=False)
+    '''모든 지역 날씨를 동시에 조회해서 저장 (weather.collector)'''
+    return collect_weather()
         
 def delete_weather():
-    '''어제 혹은 어제보다 이전 날씨 데이터 삭제'''
-    today = timezone.localtime(timezone.now())
-    yesterday = today.replace(hour=23, minute=59, second=59, microsecond=0) - timedelta(days=1)
-    WeatherData.objects.filter(timestamp__lte=yesterday).delete()
+    '''어제 혹은 어제보다 이전 날씨 데이터를 시간/일별로 요약한 뒤 삭제 (weather.retention)'''
+    return compact_weather()
 
-def cron_weather():
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(delete_weather, 'cron', hour='13',id='cron_delete_weather')
-    scheduler.add_job(save_weather, 'cron', hour='0,2,4,6,8,10,12,14,16,18,20,22', id='cron_save_weather')
-    scheduler.start()
+def get_snapshot(request):
+    '''ETag 계산과 응답에서 같은 스냅샷을 쓰도록 요청에 보관'''
+    if not hasattr(request, "weather_snapshot"):
+        request.weather_snapshot = get_weather_snapshot()
+    return request.weather_snapshot
 
-cron_weather()
+def weather_etag(request, **kwargs):
+    return get_snapshot(request)["etag"]
 
 class WeatherView(APIView):
-    '''날씨 데이터 DB->클라이언트 전송'''
+    '''날씨 데이터 DB->클라이언트 전송 : 미리 직렬화한 스냅샷을 그대로 응답'''
+    @method_decorator(condition(etag_func=weather_etag))
+    @query_budget(5)
     def get(self, request):
-        cities = WeatherCity.objects.all()
-        weather = []
-        
-        for city in cities:
-            latest_weather = WeatherData.objects.filter(city=city).order_by('-timestamp').first()
+        snapshot = get_snapshot(request)
+        return HttpResponse(snapshot["body"], content_type="application/json")
 
-            if latest_weather is not None:
-                weather.append(latest_weather)
-        
-        serializer = WeatherDataSerializer(weather, many=True)
+class WeatherHistoryView(APIView):
+    '''지역별 날씨 기록 : 시간/일별 요약만 조회 (?city=서울&period=day&start_date=2023-07-01&end_date=2023-07-31)'''
+    default_days = {WeatherRollup.HOUR: 2, WeatherRollup.DAY: 30}
+    max_days = {WeatherRollup.HOUR: 31, WeatherRollup.DAY: 366}
+
+    @query_budget(2)
+    def get(self, request):
+        period = request.query_params.get("period", WeatherRollup.DAY)
+        try:
+            if period not in self.max_days:
+                raise ValueError(period)
+            start_date, end_date = self.get_range(request, period)
+        except ValueError:
+            return Response({"error": "조회 조건이 올바르지 않습니다."}, status=status.HTTP_400_BAD_REQUEST)
+        city = WeatherCity.objects.filter(city=request.query_params.get("city")).first()
+        if city is None:
+            return Response({"error": "지역정보가 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+        start = timezone.make_aware(datetime.combine(start_date, time.min))
+        end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+        rollups = WeatherRollup.objects.filter(
+            city=city, period=period, start__gte=start, start__lt=end).order_by("start")
+        serializer = WeatherRollupSerializer(rollups, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def get_range(self, request, period):
+        end_date = self.get_date(request, "end_date") or timezone.localdate()
+        start_date = self.get_date(request, "start_date") or end_date - timedelta(days=self.default_days[period] - 1)
+        if start_date > end_date or (end_date - start_date).days >= self.max_days[period]:
+            raise ValueError("start_date")
+        return start_date, end_date
+
+    def get_date(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(name)
+        return date
+
+def get_forecast(request, **kwargs):
+    '''지역 격자의 최신 단기예보 : 지역의 격자를 먼저 찾고 (nx, ny, -base) 인덱스로 한 행만 조회'''
+    if not hasattr(request, "weather_forecast"):
+        request.weather_forecast = None
+        name = request.GET.get("city")
+        grid = None
+        if name:
+            grid = WeatherCity.objects.filter(
+                city=name, nx__isnull=False, ny__isnull=False).values_list("nx", "ny").first()
+        if grid is not None:
+            nx, ny = grid
+            request.weather_forecast = WeatherForecast.objects.filter(nx=nx, ny=ny).order_by("-base").first()
+    return request.weather_forecast
+
+def forecast_etag(request, **kwargs):
+    forecast = get_forecast(request)
+    if forecast is None:
+        return None
+    return f"forecast-{forecast.pk}"
+
+class WeatherForecastView(APIView):
+    '''지역별 단기예보 (?city=서울) : 변수별 시간 순서 배열'''
+    @method_decorator(condition(etag_func=forecast_etag))
+    @query_budget(2)
+    def get(self, request):
+        if not request.query_params.get("city"):
+            return Response({"error": "지역을 입력해주세요."}, status=status.HTTP_400_BAD_REQUEST)
+        forecast = get_forecast(request)
+        if forecast is None:
+            return Response({"error": "예보 정보가 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        data = {
+            "city": request.query_params.get("city"),
+            "base": forecast.base,
+            **decode_forecast(forecast),
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+class WeatherNearbyView(APIView):
+    '''위경도에서 가장 가까운 지역의 최근 날씨 (?lat=37.56&lon=126.97)'''
+    @query_budget(1)
+    def get(self, request):
+        try:
+            lat = float(request.query_params["lat"])
+            lon = float(request.query_params["lon"])
+            if not (-90 < lat < 90 and -180 <= lon <= 180):
+                raise ValueError(lat, lon)
+        except (KeyError, ValueError):
+            return Response({"error": "위치 정보가 올바르지 않습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        x, y = to_grid(lat, lon)
+        nearest = grid_index.nearest(float(x), float(y), settings.WEATHER_NEARBY_MAX_KM / GRID)
+        if nearest is None:
+            return Response({"error": "근처에 지역정보가 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        city_id, city, distance = nearest
+
+        weather = WeatherData.objects.select_related("city").filter(city_id=city_id).order_by("-timestamp").first()
+        data = {
+            "city_id": city_id,
+            "city": city,
+            "distance": round(distance * GRID, 1), # km
+            "weather": WeatherDataSerializer(weather).data if weather is not None else None,
+        }
+        return Response(data, status=status.HTTP_200_OK)